@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.utils import timezone
 from django.utils.html import format_html
-from .models import User
+from .models import OutgoingEmail, User
 
 
 @admin.register(User)
@@ -90,3 +91,24 @@ class UserAdmin(BaseUserAdmin):
             f'Successfully unverified {updated} user(s).'
         )
     unverify_selected_users.short_description = "Mark selected users as unverified"
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """
+    Admin interface for the outbound mail queue.
+    """
+    list_display = ['subject', 'to_email', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['to_email', 'subject']
+    ordering = ['-created_at']
+    readonly_fields = ['created_at', 'sent_at', 'last_error']
+    actions = ['retry_selected_emails']
+
+    def retry_selected_emails(self, request, queryset):
+        """Reschedule selected emails for immediate delivery."""
+        updated = queryset.exclude(status='sent').update(
+            status='pending', attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f'{updated} email(s) scheduled for retry.')
+    retry_selected_emails.short_description = 'Retry selected emails'
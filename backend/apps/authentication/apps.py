@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.authentication'
+
+    def ready(self):
+        """
+        Connect signal handlers that invalidate cached users and make
+        profile pictures downloadable.
+        """
+        from apps.core.media import register_media_access
+
+        from . import signals  # noqa: F401
+        from .services import get_profile_picture_access
+
+        register_media_access(get_profile_picture_access)
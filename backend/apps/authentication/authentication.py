@@ -1,10 +1,74 @@
+import logging
+from typing import Any, Dict, NamedTuple, Optional
+
+import jwt
 from rest_framework import authentication
 from rest_framework import exceptions
 from django.contrib.auth import get_user_model
-from .jwt_utils import get_user_from_token
+from .cache import get_user
+from .jwt_utils import decode_jwt_token
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
+_UNSET = object()
+
+
+class JWTAuthResult(NamedTuple):
+    """
+    Outcome of authenticating a bearer token. ``payload`` and ``user`` are
+    None when the token is invalid; ``error`` then says why.
+    """
+    token: str
+    payload: Optional[Dict[str, Any]]
+    user: Optional[User]
+    error: Optional[str] = None
+
+
+def get_bearer_token(request) -> Optional[str]:
+    """
+    Return the bearer token sent with the request, or None.
+    """
+    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+    if not auth_header.startswith('Bearer '):
+        return None
+    return auth_header.split(' ')[1]
+
+
+def authenticate_request(request) -> Optional[JWTAuthResult]:
+    """
+    Decode the bearer token of a request and load its user.
+
+    The result is memoized on the underlying ``HttpRequest``, so the
+    middleware and the DRF authentication class share a single token decode
+    and user lookup per request.
+
+    Returns:
+        JWTAuthResult, or None if no bearer token was sent
+    """
+    request = getattr(request, '_request', request)
+    result = getattr(request, '_jwt_auth', _UNSET)
+    if result is not _UNSET:
+        return result
+
+    token = get_bearer_token(request)
+    if token is None:
+        result = None
+    else:
+        try:
+            payload = decode_jwt_token(token)
+        except jwt.InvalidTokenError as e:
+            result = JWTAuthResult(token, None, None, str(e))
+        else:
+            user_id = payload.get('user_id')
+            user = get_user(user_id) if user_id else None
+            result = JWTAuthResult(token, payload, user, None if user else 'User not found')
+
+    request._jwt_auth = result
+    return result
+
+
 class JWTAuthentication(authentication.BaseAuthentication):
     """
     Custom JWT authentication for Django REST Framework.
@@ -14,27 +78,15 @@ class JWTAuthentication(authentication.BaseAuthentication):
         """
         Authenticate the request and return a two-tuple of (user, token).
         """
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-
-        if not auth_header:
-            return None
-
-        # Check if it's a Bearer token
-        if not auth_header.startswith('Bearer '):
+        result = authenticate_request(request)
+        if result is None:
             return None
 
-        # Extract the token
-        token = auth_header.split(' ')[1]
-
-        try:
-            # Get user from token
-            user = get_user_from_token(token)
-            if user and user.is_active:
-                return (user, token)
-            else:
-                raise exceptions.AuthenticationFailed('Invalid token or user inactive')
-        except Exception as e:
-            raise exceptions.AuthenticationFailed(f'Invalid token: {str(e)}')
+        if result.error and result.payload is None:
+            raise exceptions.AuthenticationFailed(f'Invalid token: {result.error}')
+        if not result.user or not result.user.is_active:
+            raise exceptions.AuthenticationFailed('Invalid token or user inactive')
+        return (result.user, result.token)
 
     def authenticate_header(self, request):
         """
@@ -0,0 +1,68 @@
+"""
+Short-lived cache of the users behind JWT tokens.
+
+Each entry records the version of the user it was built from. Saving or
+deleting a user bumps that version, so a stale entry is never served even if
+its timeout has not elapsed yet. Disabled unless ``JWT_USER_CACHE_TIMEOUT``
+is a positive number of seconds.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+from apps.core.cache import get_versions, invalidate_versions
+from apps.core.metrics import record_cache_access
+
+User = get_user_model()
+
+
+def get_cache_alias():
+    """Return the alias of the cache holding authenticated users."""
+    return getattr(settings, 'JWT_USER_CACHE_ALIAS', 'default')
+
+
+def get_timeout():
+    """Return the user cache timeout in seconds (0 disables caching)."""
+    return getattr(settings, 'JWT_USER_CACHE_TIMEOUT', 0)
+
+
+def _user_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def _version_key(user_id):
+    return f'auth:user-version:{user_id}'
+
+
+def get_user(user_id):
+    """
+    Return the user with ``user_id``, or None if it does not exist.
+
+    The entry and its version stamp are read in a single round trip; the
+    database is only queried on a miss or a version mismatch.
+    """
+    timeout = get_timeout()
+    if not timeout:
+        return User.objects.filter(pk=user_id).first()
+
+    cache = caches[get_cache_alias()]
+    user_key, version_key = _user_key(user_id), _version_key(user_id)
+    found = cache.get_many([user_key, version_key])
+    version = found.get(version_key)
+    entry = found.get(user_key)
+    if version is None:
+        version = get_versions([version_key], get_cache_alias())[0]
+    elif entry is not None and entry[0] == version:
+        record_cache_access('jwt_user', True)
+        return entry[1]
+    record_cache_access('jwt_user', False)
+
+    user = User.objects.filter(pk=user_id).first()
+    if user is not None:
+        cache.set(user_key, (version, user), timeout)
+    return user
+
+
+def invalidate_user(user_id):
+    """Make any cached copy of the user unreachable."""
+    invalidate_versions([_version_key(user_id)], get_cache_alias())
@@ -4,6 +4,7 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from typing import Optional, Dict, Any
+from .cache import get_user
 
 User = get_user_model()
 
@@ -70,11 +71,8 @@ def get_user_from_token(token: str) -> Optional[User]:
         if not user_id:
             return None
 
-        user = User.objects.get(id=user_id)
-        return user
+        return get_user(user_id)
 
-    except User.DoesNotExist:
-        return None
     except jwt.InvalidTokenError:
         return None
 
@@ -0,0 +1,129 @@
+"""
+Durable outbound mail queue.
+
+Requests only insert ``OutgoingEmail`` rows. The ``send_queued_emails``
+worker delivers due rows in batches, each batch over a single connection
+from ``get_connection()``, and reschedules failures with exponential
+backoff until ``MAX_ATTEMPTS`` is reached.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 60,
+    'MAX_RETRY_BACKOFF': 3600,
+}
+
+
+def get_setting(name):
+    """Read an ``EMAIL_QUEUE`` setting, falling back to the defaults."""
+    return getattr(settings, 'EMAIL_QUEUE', {}).get(name, DEFAULTS[name])
+
+
+def enqueue_email(to_email, subject, body, html_body=''):
+    """
+    Queue an email for delivery by the worker.
+
+    Returns:
+        The queued OutgoingEmail
+    """
+    return OutgoingEmail.objects.create(
+        to_email=to_email,
+        subject=subject,
+        body=body,
+        html_body=html_body or '',
+    )
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next attempt after ``attempts`` failures."""
+    delay = get_setting('RETRY_BACKOFF') * 2 ** (attempts - 1)
+    return min(delay, get_setting('MAX_RETRY_BACKOFF'))
+
+
+def build_message(email, mail_connection):
+    """Build the Django email message of a queued row."""
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=settings.EMAIL_HOST_USER or None,
+        to=[email.to_email],
+        connection=mail_connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def _record_failure(email, error, now):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= get_setting('MAX_ATTEMPTS'):
+        email.status = 'failed'
+        logger.error("Giving up on email %s to %s: %s", email.pk, email.to_email, error)
+    else:
+        email.next_attempt_at = now + timedelta(seconds=retry_delay(email.attempts))
+        logger.warning("Email %s to %s failed, retrying: %s", email.pk, email.to_email, error)
+
+
+@transaction.atomic
+def send_queued_emails(batch_size=None):
+    """
+    Deliver one batch of due emails over a single mail connection.
+
+    Rows are locked with ``SKIP LOCKED`` where the database supports it, so
+    several workers can drain the queue concurrently.
+
+    Returns:
+        Tuple of (sent, failed) counts for the batch
+    """
+    batch_size = batch_size or get_setting('BATCH_SIZE')
+    now = timezone.now()
+    due = OutgoingEmail.objects.filter(status='pending', next_attempt_at__lte=now)
+    if connection.features.has_select_for_update_skip_locked:
+        due = due.select_for_update(skip_locked=True)
+    batch = list(due.order_by('next_attempt_at', 'id')[:batch_size])
+    if not batch:
+        return 0, 0
+
+    sent = failed = 0
+    mail_connection = get_connection(fail_silently=False)
+    try:
+        mail_connection.open()
+    except Exception as e:
+        # Server unreachable: the whole batch is retried later
+        for email in batch:
+            _record_failure(email, e, now)
+        failed = len(batch)
+    else:
+        try:
+            for email in batch:
+                try:
+                    build_message(email, mail_connection).send()
+                except Exception as e:
+                    _record_failure(email, e, now)
+                    failed += 1
+                else:
+                    email.status = 'sent'
+                    email.attempts += 1
+                    email.sent_at = timezone.now()
+                    email.last_error = ''
+                    sent += 1
+        finally:
+            mail_connection.close()
+
+    OutgoingEmail.objects.bulk_update(
+        batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+    )
+    return sent, failed
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.authentication.mail import get_setting, send_queued_emails
+
+
+class Command(BaseCommand):
+    """
+    Deliver queued outbound emails.
+    """
+    help = 'Send due emails from the outbound queue, batching them over one SMTP connection.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Emails sent per connection (default: EMAIL_QUEUE BATCH_SIZE).',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling the queue instead of exiting once it is drained.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds to sleep between polls of an empty queue with --loop.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size'] or get_setting('BATCH_SIZE')
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_queued_emails(batch_size)
+            total_sent += sent
+            total_failed += failed
+            if sent + failed:
+                self.stdout.write(f'Sent {sent} email(s), {failed} failed.')
+            if sent + failed < batch_size:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Queue drained: {total_sent} sent, {total_failed} failed.'
+        ))
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from apps.authentication.services import (
+    clear_expired_tokens, delete_stale_unverified_users, get_stale_unverified_users
+)
+
+
+class Command(BaseCommand):
+    """
+    Clear expired one-time tokens and remove stale unverified accounts.
+    """
+    help = 'Clear expired verification/reset tokens and delete stale unverified accounts in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows updated or deleted per statement.',
+        )
+        parser.add_argument(
+            '--unverified-days',
+            type=int,
+            default=30,
+            help='Delete accounts still unverified this many days after joining (0 keeps them).',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0,
+            help='Seconds to sleep between batches to limit load on the database.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many unverified accounts would be deleted.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        days = options['unverified_days']
+
+        if options['dry_run']:
+            stale = get_stale_unverified_users(days).count() if days else 0
+            self.stdout.write(f'{stale} stale unverified account(s) would be deleted.')
+            return
+
+        verification, reset = clear_expired_tokens(batch_size, options['pause'])
+        self.stdout.write(
+            f'Cleared {verification} expired verification token(s) and {reset} reset token(s).'
+        )
+        deleted = delete_stale_unverified_users(days, batch_size, options['pause']) if days else 0
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} stale unverified account(s).'))
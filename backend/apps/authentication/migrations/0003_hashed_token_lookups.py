@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:22
+
+import hashlib
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def hash_outstanding_tokens(apps, schema_editor):
+    """Replace raw tokens still awaiting use with their digest so links keep working."""
+    User = apps.get_model("authentication", "User")
+    for field in ("email_verification_token", "password_reset_token"):
+        batch = []
+        users = User.objects.filter(**{f"{field}__isnull": False}).only("id", field)
+        for user in users.iterator(chunk_size=BATCH_SIZE):
+            token = getattr(user, field)
+            setattr(user, field, hashlib.sha256(token.encode("utf-8")).hexdigest())
+            batch.append(user)
+            if len(batch) >= BATCH_SIZE:
+                User.objects.bulk_update(batch, [field])
+                batch = []
+        if batch:
+            User.objects.bulk_update(batch, [field])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0002_outgoing_email"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="email_verification_expires",
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="user",
+            name="email_verification_token",
+            field=models.CharField(
+                blank=True, db_index=True, max_length=100, null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="user",
+            name="password_reset_expires",
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="user",
+            name="password_reset_token",
+            field=models.CharField(
+                blank=True, db_index=True, max_length=100, null=True
+            ),
+        ),
+        migrations.RunPython(hash_outstanding_tokens, migrations.RunPython.noop),
+    ]
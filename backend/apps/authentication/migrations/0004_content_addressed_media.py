@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:03
+
+import apps.core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0003_hashed_token_lookups"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="profile_picture",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=apps.core.storage.get_media_storage,
+                upload_to="profile_pictures/",
+                verbose_name="Profile Picture",
+            ),
+        ),
+    ]
@@ -1,9 +1,11 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 from django.utils.text import slugify
 from apps.core.models import BaseModel
-from apps.core.utils import generate_verification_token
+from apps.core.storage import get_media_storage
+from apps.core.utils import generate_verification_token, hash_token
 import uuid
 
 
@@ -22,19 +24,22 @@ class User(AbstractUser, BaseModel):
     phone_number = models.CharField(max_length=15, blank=True, null=True, verbose_name='Phone Number')
     profile_picture = models.ImageField(
         upload_to='profile_pictures/',
+        storage=get_media_storage,
         blank=True,
         null=True,
+        db_index=True,  # media access checks look users up by picture
         verbose_name='Profile Picture'
     )
 
     # Email verification fields
     is_email_verified = models.BooleanField(default=False, verbose_name='Email Verified')
-    email_verification_token = models.CharField(max_length=100, blank=True, null=True)
-    email_verification_expires = models.DateTimeField(blank=True, null=True)
+    # Tokens are stored as SHA-256 digests; the raw value only goes out by email
+    email_verification_token = models.CharField(max_length=100, blank=True, null=True, db_index=True)
+    email_verification_expires = models.DateTimeField(blank=True, null=True, db_index=True)
 
     # Password reset fields
-    password_reset_token = models.CharField(max_length=100, blank=True, null=True)
-    password_reset_expires = models.DateTimeField(blank=True, null=True)
+    password_reset_token = models.CharField(max_length=100, blank=True, null=True, db_index=True)
+    password_reset_expires = models.DateTimeField(blank=True, null=True, db_index=True)
 
     # Meta fields
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
@@ -76,14 +81,15 @@ class User(AbstractUser, BaseModel):
     def generate_verification_token(self):
         """Generate a new email verification token."""
         token = generate_verification_token()
-        self.email_verification_token = token
+        self.email_verification_token = hash_token(token)
         self.email_verification_expires = timezone.now() + timezone.timedelta(hours=24)
         self.save(update_fields=['email_verification_token', 'email_verification_expires'])
         return token
 
     def verify_email(self, token):
         """Verify email with the provided token."""
-        if (self.email_verification_token == token and
+        if (token and self.email_verification_token and
+            constant_time_compare(self.email_verification_token, hash_token(token)) and
             self.email_verification_expires and
             self.email_verification_expires > timezone.now()):
             self.is_email_verified = True
@@ -96,14 +102,15 @@ class User(AbstractUser, BaseModel):
     def generate_password_reset_token(self):
         """Generate a new password reset token."""
         token = generate_verification_token()
-        self.password_reset_token = token
+        self.password_reset_token = hash_token(token)
         self.password_reset_expires = timezone.now() + timezone.timedelta(hours=1)
         self.save(update_fields=['password_reset_token', 'password_reset_expires'])
         return token
 
     def verify_password_reset_token(self, token):
         """Verify password reset token."""
-        if (self.password_reset_token == token and
+        if (token and self.password_reset_token and
+            constant_time_compare(self.password_reset_token, hash_token(token)) and
             self.password_reset_expires and
             self.password_reset_expires > timezone.now()):
             return True
@@ -124,3 +131,40 @@ class User(AbstractUser, BaseModel):
     def display_name(self):
         """Get display name for the user."""
         return self.get_full_name() or self.username
+
+
+class OutgoingEmail(models.Model):
+    """
+    Email waiting in the outbound queue.
+
+    Rows are written inside the request and delivered by the
+    ``send_queued_emails`` worker, so slow SMTP servers never block a request.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    to_email = models.EmailField(verbose_name='To')
+    subject = models.CharField(max_length=255, verbose_name='Subject')
+    body = models.TextField(verbose_name='Plain Text Body')
+    html_body = models.TextField(blank=True, verbose_name='HTML Body')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name='Status')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Attempts')
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='Next Attempt At')
+    last_error = models.TextField(blank=True, verbose_name='Last Error')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
+    sent_at = models.DateTimeField(blank=True, null=True, verbose_name='Sent At')
+
+    class Meta:
+        verbose_name = 'Outgoing Email'
+        verbose_name_plural = 'Outgoing Emails'
+        ordering = ['next_attempt_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email}"
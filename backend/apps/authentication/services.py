@@ -1,14 +1,24 @@
+import hashlib
+import logging
 import uuid
+import time
 import datetime
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.cache import cache
 from django.template.loader import render_to_string
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from typing import Optional
+from typing import Optional, Tuple
+from apps.core.utils import hash_token
+from .mail import enqueue_email
+
+logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
+# Seconds a media access decision for a profile picture is cached
+PROFILE_PICTURE_ACCESS_TIMEOUT = 300
+
 def generate_verification_token() -> str:
     """
     Generate a secure verification token using UUID4.
@@ -20,18 +30,18 @@ def generate_verification_token() -> str:
 
 def send_verification_email(user: User) -> bool:
     """
-    Send email verification email to user.
+    Queue the email verification email of a user.
 
     Args:
         user: User instance
 
     Returns:
-        True if email sent successfully, False otherwise
+        True if email queued successfully, False otherwise
     """
     try:
         # Generate verification token
         token = generate_verification_token()
-        user.email_verification_token = token
+        user.email_verification_token = hash_token(token)
         user.email_verification_expires = timezone.now() + timezone.timedelta(hours=24)
         user.save(update_fields=['email_verification_token', 'email_verification_expires'])
 
@@ -48,39 +58,31 @@ def send_verification_email(user: User) -> bool:
         html_message = render_to_string('authentication/email/verification_email.html', context)
         plain_message = render_to_string('authentication/email/verification_email.txt', context)
 
-        # Send email
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=settings.EMAIL_HOST_USER,
-            recipient_list=[user.email],
-            html_message=html_message,
-            fail_silently=False
-        )
+        # Queue email; the send_queued_emails worker delivers it
+        enqueue_email(user.email, subject, plain_message, html_message)
 
-        print(f"📧 Verification email sent to {user.email}")
-        print(f"🔑 Verification token: {token}")
+        logger.info("Verification email queued for user %s", user.pk)
 
         return True
 
-    except Exception as e:
-        print(f"❌ Error sending verification email: {e}")
+    except Exception:
+        logger.exception("Error queueing verification email for user %s", user.pk)
         return False
 
 def send_password_reset_email(user: User) -> bool:
     """
-    Send password reset email to user.
+    Queue the password reset email of a user.
 
     Args:
         user: User instance
 
     Returns:
-        True if email sent successfully, False otherwise
+        True if email queued successfully, False otherwise
     """
     try:
         # Generate password reset token
         token = generate_verification_token()
-        user.password_reset_token = token
+        user.password_reset_token = hash_token(token)
         user.password_reset_expires = timezone.now() + timezone.timedelta(hours=1)
         user.save(update_fields=['password_reset_token', 'password_reset_expires'])
 
@@ -97,23 +99,15 @@ def send_password_reset_email(user: User) -> bool:
         html_message = render_to_string('authentication/email/password_reset_email.html', context)
         plain_message = render_to_string('authentication/email/password_reset_email.txt', context)
 
-        # Send email
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=settings.EMAIL_HOST_USER,
-            recipient_list=[user.email],
-            html_message=html_message,
-            fail_silently=False
-        )
+        # Queue email; the send_queued_emails worker delivers it
+        enqueue_email(user.email, subject, plain_message, html_message)
 
-        print(f"📧 Password reset email sent to {user.email}")
-        print(f"🔑 Reset token: {token}")
+        logger.info("Password reset email queued for user %s", user.pk)
 
         return True
 
-    except Exception as e:
-        print(f"❌ Error sending password reset email: {e}")
+    except Exception:
+        logger.exception("Error queueing password reset email for user %s", user.pk)
         return False
 
 def verify_email_token(token: str) -> Optional[User]:
@@ -126,9 +120,13 @@ def verify_email_token(token: str) -> Optional[User]:
     Returns:
         User instance if valid, None otherwise
     """
+    if not token:
+        return None
+
     try:
+        # Only the digest is stored; the indexed column makes this a point lookup
         user = User.objects.get(
-            email_verification_token=token,
+            email_verification_token=hash_token(token),
             email_verification_expires__gt=timezone.now(),
             is_email_verified=False
         )
@@ -154,9 +152,12 @@ def verify_password_reset_token(token: str) -> Optional[User]:
     Returns:
         User instance if valid, None otherwise
     """
+    if not token:
+        return None
+
     try:
         user = User.objects.get(
-            password_reset_token=token,
+            password_reset_token=hash_token(token),
             password_reset_expires__gt=timezone.now()
         )
         return user
@@ -185,8 +186,8 @@ def reset_user_password(token: str, new_password: str) -> bool:
             user.save()
             return True
         return False
-    except Exception as e:
-        print(f"❌ Error resetting password: {e}")
+    except Exception:
+        logger.exception("Error resetting password")
         return False
 
 def clear_password_reset_token(user: User) -> None:
@@ -199,3 +200,92 @@ def clear_password_reset_token(user: User) -> None:
     user.password_reset_token = None
     user.password_reset_expires = None
     user.save(update_fields=['password_reset_token', 'password_reset_expires'])
+
+def _in_batches(queryset, batch_size: int, action, pause: float = 0):
+    """
+    Apply ``action`` to the primary keys of ``queryset`` in short batches.
+
+    Each batch runs as its own statement, so row locks are only held for one
+    batch at a time.
+
+    Returns:
+        Total number of rows processed
+    """
+    total = 0
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return total
+        total += action(User.objects.filter(pk__in=ids))
+        if len(ids) < batch_size:
+            return total
+        if pause:
+            time.sleep(pause)
+
+def clear_expired_tokens(batch_size: int = 1000, pause: float = 0) -> Tuple[int, int]:
+    """
+    Clear expired email verification and password reset tokens.
+
+    Returns:
+        Tuple of (verification tokens cleared, reset tokens cleared)
+    """
+    now = timezone.now()
+    verification = _in_batches(
+        User.objects.filter(email_verification_expires__lte=now),
+        batch_size,
+        lambda users: users.update(email_verification_token=None, email_verification_expires=None),
+        pause,
+    )
+    reset = _in_batches(
+        User.objects.filter(password_reset_expires__lte=now),
+        batch_size,
+        lambda users: users.update(password_reset_token=None, password_reset_expires=None),
+        pause,
+    )
+    return verification, reset
+
+def get_stale_unverified_users(days: int):
+    """
+    Return accounts that were never verified within ``days`` days of joining.
+
+    Staff accounts and authors of any post are never considered stale.
+    """
+    cutoff = timezone.now() - timezone.timedelta(days=days)
+    return User.objects.filter(
+        is_email_verified=False,
+        is_staff=False,
+        is_superuser=False,
+        created_at__lt=cutoff,
+        posts__isnull=True,
+    )
+
+def delete_stale_unverified_users(days: int, batch_size: int = 1000, pause: float = 0) -> int:
+    """
+    Delete accounts that were never verified within ``days`` days of joining.
+
+    Returns:
+        Number of users deleted
+    """
+    return _in_batches(
+        get_stale_unverified_users(days),
+        batch_size,
+        lambda users: users.delete()[1].get(User._meta.label, 0),
+        pause,
+    )
+
+def get_profile_picture_access(user, name: str) -> Optional[str]:
+    """
+    Media access check (see ``apps.core.media``): profile pictures are
+    public, like the author names they are shown next to.
+
+    Found pictures are cached for ``PROFILE_PICTURE_ACCESS_TIMEOUT``
+    seconds; a replaced picture was public already and its file is
+    released with it. Unreferenced names are not cached.
+    """
+    key = f"auth:profile-picture:{hashlib.sha256(name.encode('utf-8')).hexdigest()}"
+    if cache.get(key):
+        return 'public'
+    if not User.objects.filter(profile_picture=name).exists():
+        return None
+    cache.set(key, True, PROFILE_PICTURE_ACCESS_TIMEOUT)
+    return 'public'
@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import invalidate_user
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop cached copies of a user used by JWT authentication."""
+    invalidate_user(instance.pk)
+
+
+@receiver(pre_save, sender=User)
+def capture_previous_profile_picture(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Remember the stored profile picture so a replaced one can be released."""
+    instance._previous_profile_picture = None
+    if raw or instance.pk is None:
+        return
+    if update_fields is None or 'profile_picture' in update_fields:
+        instance._previous_profile_picture = User.objects.filter(pk=instance.pk).values_list(
+            'profile_picture', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=User)
+def release_replaced_profile_picture(sender, instance, raw=False, **kwargs):
+    """Drop the storage reference held by a replaced profile picture."""
+    old_picture = getattr(instance, '_previous_profile_picture', None)
+    if raw or not old_picture or old_picture == instance.profile_picture.name:
+        return
+    storage = instance.profile_picture.storage
+    transaction.on_commit(lambda: storage.delete(old_picture))
+
+
+@receiver(post_delete, sender=User)
+def release_profile_picture_on_delete(sender, instance, **kwargs):
+    """Drop the storage reference held by a deleted user's profile picture."""
+    if instance.profile_picture:
+        name, storage = instance.profile_picture.name, instance.profile_picture.storage
+        transaction.on_commit(lambda: storage.delete(name))
@@ -16,5 +16,5 @@ urlpatterns = [
     # User profile endpoints
     path('me/', views.UserMeView.as_view(), name='me'),
     path('profile/', views.UserProfileView.as_view(), name='profile'),
-    path('check-auth/', views.check_auth, name='check_auth'),
+    path('check-auth/', views.CheckAuthView.as_view(), name='check_auth'),
 ]
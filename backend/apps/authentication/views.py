@@ -7,6 +7,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.core.async_views import AsyncHandlersMixin
 from .models import User
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, EmailVerificationSerializer,
@@ -220,24 +221,29 @@ def resend_verification_email(request):
             'error': 'User not found.'
         }, status=status.HTTP_400_BAD_REQUEST)
 
-@api_view(['GET'])
-@permission_classes([AllowAny])
-def check_auth(request):
+class CheckAuthView(AsyncHandlersMixin, APIView):
     """
     Check authentication status endpoint.
     """
-    # Check if user is authenticated
-    if request.user.is_authenticated:
-        return Response({
-            'user': {
-                'id': request.user.id,
-                'username': request.user.username,
-                'email': request.user.email,
-                'first_name': request.user.first_name,
-                'last_name': request.user.last_name
-            }
-        }, status=status.HTTP_200_OK)
-    else:
-        return Response({
-            'error': 'User not authenticated.'
-        }, status=status.HTTP_401_UNAUTHORIZED)
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        # Check if user is authenticated
+        if request.user.is_authenticated:
+            return Response({
+                'user': {
+                    'id': request.user.id,
+                    'username': request.user.username,
+                    'email': request.user.email,
+                    'first_name': request.user.first_name,
+                    'last_name': request.user.last_name
+                }
+            }, status=status.HTTP_200_OK)
+        else:
+            return Response({
+                'error': 'User not authenticated.'
+            }, status=status.HTTP_401_UNAUTHORIZED)
+
+    async def aget(self, request):
+        # The user was loaded by the authentication checks
+        return self.get(request)
@@ -1,7 +1,11 @@
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from .models import Category, Tag, Post
+from .counters import refresh_counts_for_posts
+from .cache import invalidate
+from .related import refresh_related_posts
 
 
 @admin.register(Category)
@@ -33,6 +37,7 @@ class CategoryAdmin(admin.ModelAdmin):
             obj.id, count
         )
     post_count.short_description = 'Posts'
+    post_count.admin_order_field = 'post_count'
 
 
 @admin.register(Tag)
@@ -64,6 +69,7 @@ class TagAdmin(admin.ModelAdmin):
             obj.id, count
         )
     post_count.short_description = 'Posts'
+    post_count.admin_order_field = 'post_count'
 
 
 @admin.register(Post)
@@ -80,7 +86,7 @@ class PostAdmin(admin.ModelAdmin):
     ]
     search_fields = ['title', 'content', 'excerpt', 'author__email', 'author__username']
     prepopulated_fields = {'slug': ('title',)}
-    readonly_fields = ['created_at', 'updated_at', 'published_at', 'reading_time_display']
+    readonly_fields = ['created_at', 'updated_at', 'published_at', 'word_count', 'reading_time_display']
     filter_horizontal = ['tags']
 
     fieldsets = (
@@ -98,7 +104,7 @@ class PostAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Metadata', {
-            'fields': ('reading_time_display',),
+            'fields': ('word_count', 'reading_time_display'),
             'classes': ('collapse',)
         }),
     )
@@ -130,11 +136,18 @@ class PostAdmin(admin.ModelAdmin):
 
     def publish_selected_posts(self, request, queryset):
         """Publish selected posts."""
-        from django.utils import timezone
+        post_ids = list(queryset.values_list('pk', flat=True))
+        now = timezone.now()
         updated = queryset.update(
             status='published',
-            published_at=timezone.now()
+            published_at=now,
+            updated_at=now
         )
+        # QuerySet.update() bypasses auto_now and the counter, related
+        # posts and cache signals
+        refresh_counts_for_posts(post_ids)
+        refresh_related_posts(post_ids)
+        invalidate('posts', 'categories', 'tags')
         self.message_user(
             request,
             f'Successfully published {updated} post(s).'
@@ -143,10 +156,17 @@ class PostAdmin(admin.ModelAdmin):
 
     def unpublish_selected_posts(self, request, queryset):
         """Unpublish selected posts."""
+        post_ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(
             status='draft',
-            published_at=None
+            published_at=None,
+            updated_at=timezone.now()
         )
+        # QuerySet.update() bypasses auto_now and the counter, related
+        # posts and cache signals
+        refresh_counts_for_posts(post_ids)
+        refresh_related_posts(post_ids)
+        invalidate('posts', 'categories', 'tags')
         self.message_user(
             request,
             f'Successfully unpublished {updated} post(s).'
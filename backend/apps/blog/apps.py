@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.blog'
+
+    def ready(self):
+        """
+        Connect signal handlers that keep denormalized data in sync, report
+        stored image variants to media garbage collection and decide who
+        may download post images.
+        """
+        from apps.core.media import register_media_access
+        from apps.core.storage import register_references
+
+        from . import signals  # noqa: F401
+        from .images import get_media_access, get_variant_references
+
+        register_references(get_variant_references)
+        register_media_access(get_media_access)
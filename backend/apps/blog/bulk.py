@@ -0,0 +1,136 @@
+"""
+Bulk post creation.
+
+Creating posts one by one through ``PostCreateSerializer`` costs a category
+and a tag lookup during validation, a slug ``exists()`` loop, two saves and
+a ``tags.set()`` per post, plus the signal handlers of each save. The bulk
+path validates the whole payload against one category and one tag query,
+allocates all slugs at once, inserts the posts and their tag rows with one
+``bulk_create`` each, and then does what the skipped signal handlers would
+have done once for the whole batch: index the posts for search, refresh
+counters and related posts, and invalidate cached responses.
+"""
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .cache import invalidate
+from .counters import refresh_counts_for_posts
+from .models import Category, Post, Tag
+from .related import refresh_related_posts
+from .search import get_search_backend
+from .serializers import PostCreateSerializer
+from .slugs import allocate_slugs
+
+INSERT_BATCH_SIZE = 500
+
+# Attempts before giving up when a concurrent writer takes an allocated slug
+SLUG_ATTEMPTS = 3
+
+
+def get_limit():
+    """Return the maximum number of posts accepted per bulk request."""
+    return getattr(settings, 'BLOG_BULK_CREATE_LIMIT', 1000)
+
+
+def _int_values(values):
+    ids = set()
+    for value in values:
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+def get_validation_context(items, context=None):
+    """
+    Return serializer context listing which of the categories and tags
+    referenced by ``items`` exist, read with one query per model.
+    """
+    category_ids, tag_ids = set(), set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        category_ids.update(_int_values([item.get('category_id')]))
+        if isinstance(item.get('tag_ids'), list):
+            tag_ids.update(_int_values(item['tag_ids']))
+    return {
+        **(context or {}),
+        'category_ids': set(Category.objects.filter(pk__in=category_ids).values_list('pk', flat=True)),
+        'tag_ids': set(Tag.objects.filter(pk__in=tag_ids).values_list('pk', flat=True)),
+    }
+
+
+def validate_posts(items, context=None):
+    """
+    Validate every item with ``PostCreateSerializer``.
+
+    Returns:
+        ``(validated_data, errors)``; ``errors`` lists ``{'index', 'errors'}``
+        for each invalid item and is empty when all of them are valid
+    """
+    context = get_validation_context(items, context)
+    validated, errors = [], []
+    for index, item in enumerate(items):
+        serializer = PostCreateSerializer(data=item, context=context)
+        if serializer.is_valid():
+            validated.append(serializer.validated_data)
+        else:
+            errors.append({'index': index, 'errors': serializer.errors})
+    return validated, errors
+
+
+def build_post(author, data):
+    """Build an unsaved post with the fields ``Post.save()`` derives."""
+    data = dict(data)
+    data.pop('tag_ids', None)
+    post = Post(author=author, **data)
+    post.populate_defaults()
+    post.update_reading_stats()
+    return post
+
+
+def _insert(author, validated_data, using):
+    with transaction.atomic(using=using):
+        posts = [build_post(author, data) for data in validated_data]
+        for post, slug in zip(posts, allocate_slugs(Post, [post.title for post in posts])):
+            post.slug = slug
+        Post.objects.using(using).bulk_create(posts, batch_size=INSERT_BATCH_SIZE)
+
+        through = Post.tags.through
+        through.objects.using(using).bulk_create(
+            [
+                through(post_id=post.pk, tag_id=tag_id)
+                for post, data in zip(posts, validated_data)
+                for tag_id in dict.fromkeys(data.get('tag_ids', []))
+            ],
+            batch_size=INSERT_BATCH_SIZE,
+        )
+    return posts
+
+
+def bulk_create_posts(author, validated_data, using='default'):
+    """
+    Insert validated posts for ``author`` and bring the search index,
+    counters, related posts and response cache up to date.
+
+    Returns:
+        The created posts, in input order
+    """
+    for attempt in range(1, SLUG_ATTEMPTS + 1):
+        try:
+            posts = _insert(author, validated_data, using)
+            break
+        except IntegrityError:
+            # Most likely a slug taken since allocation; other violations
+            # fail again and are raised after the last attempt
+            if attempt == SLUG_ATTEMPTS:
+                raise
+
+    get_search_backend(using).index_posts([post.pk for post in posts])
+    published = [post.pk for post in posts if post.status == 'published']
+    if published:
+        refresh_counts_for_posts(published)
+        refresh_related_posts(published)
+        invalidate('posts', 'categories', 'tags')
+    return posts
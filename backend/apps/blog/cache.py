@@ -0,0 +1,186 @@
+"""
+Versioned response cache for the public blog read endpoints.
+
+Every cached response is keyed on the request URL, its normalized query
+parameters and the current version of each namespace it depends on
+(``posts``, ``categories``, ``tags``). Writes bump namespace versions
+(see ``apps.core.cache``) instead of deleting keys, so stale entries
+simply expire. Responses read from a replica that has not replayed the
+last invalidating write are served but not stored.
+"""
+import hashlib
+import json
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+from apps.core import replicas
+from apps.core.cache import get_versions, invalidate_versions
+from apps.core.metrics import record_cache_access
+
+NAMESPACES = ('posts', 'categories', 'tags')
+
+# Conditional GET validators cached along with the response data
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+# Time of the last invalidation, compared with replica heartbeats
+INVALIDATED_AT_KEY = 'blog:invalidated_at'
+
+
+def get_cache_alias():
+    """Return the alias of the cache used for blog responses."""
+    return getattr(settings, 'BLOG_CACHE_ALIAS', 'default')
+
+
+def get_cache():
+    """Return the cache backend used for blog responses."""
+    return caches[get_cache_alias()]
+
+
+def get_timeout():
+    """Return the response cache timeout in seconds (0 disables caching)."""
+    return getattr(settings, 'BLOG_RESPONSE_CACHE_TIMEOUT', 300)
+
+
+def _version_key(namespace):
+    return f'blog:version:{namespace}'
+
+
+def get_namespace_versions(namespaces):
+    """Return the current version of each namespace."""
+    return get_versions([_version_key(namespace) for namespace in namespaces], get_cache_alias())
+
+
+def invalidate(*namespaces):
+    """
+    Invalidate cached responses depending on any of ``namespaces``.
+    """
+    invalidate_versions([_version_key(namespace) for namespace in namespaces], get_cache_alias())
+    if replicas.get_setting('ALIASES'):
+        _mark_invalidated()
+        if connection.in_atomic_block:
+            transaction.on_commit(_mark_invalidated)
+
+
+def _mark_invalidated():
+    get_cache().set(INVALIDATED_AT_KEY, time.time(), None)
+
+
+def _read_before_invalidation():
+    """
+    Return whether the current request read from a replica that has not
+    replayed the last invalidating write.
+    """
+    alias = replicas.get_read_alias()
+    if alias is None:
+        return False
+    invalidated_at = get_cache().get(INVALIDATED_AT_KEY)
+    heartbeat = replicas.get_heartbeat(alias)
+    return invalidated_at is not None and (heartbeat is None or heartbeat < invalidated_at)
+
+
+def build_response_key(request, view, versions):
+    """
+    Build the cache key of a request from its absolute path, normalized
+    query parameters and the namespace versions.
+    """
+    params = sorted({
+        (name, value)
+        for name in request.query_params
+        for value in request.query_params.getlist(name)
+        if value != ''
+    })
+    payload = json.dumps([
+        request.build_absolute_uri(request.path),
+        view.action,
+        params,
+        versions,
+    ])
+    digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    return f'blog:response:v2:{view.basename}:{view.action}:{digest}'
+
+
+def _is_private(response):
+    cache_control = response.get('Cache-Control', '')
+    return 'private' in cache_control or 'no-store' in cache_control
+
+
+def _lookup(request, view, namespaces):
+    """Return ``(key, cached entry or None)`` for a request."""
+    key = build_response_key(request, view, get_namespace_versions(namespaces))
+    entry = get_cache().get(key)
+    record_cache_access('blog_response', entry is not None)
+    return key, entry
+
+
+def _cached_response(request, entry):
+    data, headers = entry
+    response = get_conditional_response(
+        request,
+        etag=headers.get('ETag'),
+        last_modified=parse_http_date_safe(headers.get('Last-Modified')),
+    ) or Response(data)
+    for name, value in headers.items():
+        response[name] = value
+    response['X-Cache'] = 'HIT'
+    return response
+
+
+def _store(key, response, timeout):
+    if response.status_code == 200 and not _is_private(response) and not _read_before_invalidation():
+        headers = {name: response[name] for name in VALIDATOR_HEADERS if response.has_header(name)}
+        get_cache().set(key, (response.data, headers), timeout)
+
+
+def cache_response(*namespaces):
+    """
+    Cache the data of successful GET responses of a viewset action.
+
+    Runs after authentication and permission checks. Responses marked
+    ``Cache-Control: private`` or ``no-store`` are never stored. Validators
+    set by ``conditional_response`` are stored along with the data, so
+    conditional requests for cached responses are answered from the cache.
+    Async actions (see ``apps.core.async_views``) share the cache entries
+    of their synchronous counterparts.
+    """
+    def decorator(view_method):
+        if iscoroutinefunction(view_method):
+            @wraps(view_method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                timeout = get_timeout()
+                if not timeout or request.method != 'GET':
+                    return await view_method(self, request, *args, **kwargs)
+
+                key, entry = await sync_to_async(_lookup)(request, self, namespaces)
+                if entry is not None:
+                    return _cached_response(request, entry)
+
+                response = await view_method(self, request, *args, **kwargs)
+                await sync_to_async(_store)(key, response, timeout)
+                response['X-Cache'] = 'MISS'
+                return response
+            return async_wrapper
+
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            timeout = get_timeout()
+            if not timeout or request.method != 'GET':
+                return view_method(self, request, *args, **kwargs)
+
+            key, entry = _lookup(request, self, namespaces)
+            if entry is not None:
+                return _cached_response(request, entry)
+
+            response = view_method(self, request, *args, **kwargs)
+            _store(key, response, timeout)
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,150 @@
+"""
+Conditional GET support for the public blog read endpoints.
+
+Validators are computed from aggregates of the rows a response is built
+from, without loading or serializing them: the row count and the latest
+``updated_at`` of the rows and of every model nested in their
+representation. Saves bump ``updated_at``, retagging touches the post and
+counter refreshes touch the categories and tags whose ``post_count``
+changed, so any change to a rendered value moves one of the aggregates.
+
+Every response carries a weak ``ETag``. ``Last-Modified`` is only sent for
+single objects: removing a row from a collection changes its count but not
+its latest ``updated_at``, so ``If-Modified-Since`` cannot be trusted there.
+"""
+import hashlib
+import json
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.exceptions import ValidationError
+
+from .projection import get_projection, parse_sparse_fields
+
+
+def get_aggregates(serializer_class=None, sparse=None):
+    """
+    Return the aggregate expressions describing the rows rendered by
+    ``serializer_class``: their count, their latest ``updated_at`` and the
+    latest ``updated_at`` of each relation rendered as a nested object.
+    Relations collapsed to ids by ``?expand=`` are not joined.
+    """
+    aggregates = {
+        'rows': Count('pk', distinct=True),
+        'updated_at': Max('updated_at'),
+    }
+    if serializer_class is not None:
+        _, select_related, prefetches = get_projection(serializer_class, sparse)
+        relations = [name for name in select_related if '__' not in name]
+        relations.extend(name for name, _, child_class in prefetches if child_class is not None)
+        aggregates.update((name, Max(f'{name}__updated_at')) for name in relations)
+    return aggregates
+
+
+def compute_validators(view, queryset, detail, serializer_class=None, sparse=None):
+    """
+    Return ``(etag, last_modified)`` for the rows of ``queryset`` rendered
+    by ``serializer_class``, or None when a single object was expected and
+    there is none.
+    """
+    # Aggregate over a pk subquery so joins used for filtering (e.g. on
+    # tags) cannot narrow the nested aggregates
+    model = queryset.model
+    rows = model._default_manager.filter(pk__in=queryset.order_by().values('pk'))
+    values = rows.aggregate(**get_aggregates(serializer_class, sparse))
+    if detail and not values['rows']:
+        return None
+
+    payload = json.dumps(
+        [view.basename, view.action, sorted(values.items())],
+        default=lambda value: value.isoformat(),
+    )
+    etag = 'W/"%s"' % hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+    last_modified = None
+    if detail:
+        timestamps = [value for name, value in values.items() if name != 'rows' and value is not None]
+        last_modified = int(max(timestamps).timestamp())
+    return etag, last_modified
+
+
+def get_validators(view, request, detail, serializer_class=None):
+    """
+    Return ``(etag, last_modified)`` for the response ``view`` is about to
+    build, or None when conditional handling does not apply.
+    """
+    try:
+        queryset = view.get_validator_queryset()
+        if queryset is None:
+            return None
+        sparse = serializer_class and parse_sparse_fields(request, serializer_class)
+        return compute_validators(view, queryset, detail, serializer_class, sparse)
+    except (TypeError, ValueError, DjangoValidationError, ValidationError):
+        # Malformed lookups and parameters are reported by the action itself
+        return None
+
+
+def _add_validators(response, etag, last_modified):
+    if not response.has_header('ETag'):
+        response['ETag'] = etag
+    if last_modified is not None and not response.has_header('Last-Modified'):
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def conditional_response(detail=False, serializer_class=None):
+    """
+    Answer ``If-None-Match``/``If-Modified-Since`` on a viewset action
+    before the action does any work, and send the validators with
+    successful responses.
+
+    The rows behind the response come from the view's
+    ``get_validator_queryset()``; returning None skips conditional handling.
+    ``serializer_class`` names the serializer rendering them when it nests
+    related objects. Apply below ``cache_response``, which stores the
+    validators and answers conditional requests for cached responses
+    without any query. On async actions the validators are computed in a
+    thread, since building the queryset may run filter form queries.
+    """
+    def decorator(view_method):
+        if iscoroutinefunction(view_method):
+            @wraps(view_method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view_method(self, request, *args, **kwargs)
+
+                validators = await sync_to_async(get_validators)(self, request, detail, serializer_class)
+                if validators is None:
+                    return await view_method(self, request, *args, **kwargs)
+
+                etag, last_modified = validators
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if response is None:
+                    response = await view_method(self, request, *args, **kwargs)
+                    if response.status_code != 200:
+                        return response
+                return _add_validators(response, etag, last_modified)
+            return async_wrapper
+
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_method(self, request, *args, **kwargs)
+
+            validators = get_validators(self, request, detail, serializer_class)
+            if validators is None:
+                return view_method(self, request, *args, **kwargs)
+
+            etag, last_modified = validators
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            return _add_validators(response, etag, last_modified)
+        return wrapper
+    return decorator
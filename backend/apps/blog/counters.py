@@ -0,0 +1,105 @@
+"""
+Maintenance of the denormalized ``post_count`` columns on Category and Tag.
+
+Counters are never incremented blindly: every refresh recomputes the
+published-post total for the affected rows with one correlated UPDATE,
+so concurrent writers and missed signals cannot make them drift forever.
+Only rows whose counter actually changes are written, and their
+``updated_at`` moves with it so conditional GET validators see the change.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Now
+
+from .models import Category, Tag, Post
+
+
+def _published_count(queryset, group_field):
+    """
+    Build an expression counting published rows of ``queryset`` grouped on
+    ``group_field`` for the outer row.
+    """
+    counts = queryset.filter(
+        **{group_field: OuterRef('pk')}
+    ).order_by().values(group_field).annotate(total=Count('pk')).values('total')[:1]
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def category_count_expression():
+    """Expression resolving to the published post count of a category."""
+    return _published_count(Post.objects.filter(status='published'), 'category')
+
+
+def tag_count_expression():
+    """Expression resolving to the published post count of a tag."""
+    return _published_count(Post.tags.through.objects.filter(post__status='published'), 'tag')
+
+
+def _restrict(queryset, ids):
+    """Limit ``queryset`` to ``ids`` (all rows when ``ids`` is None)."""
+    if ids is None:
+        return queryset
+    ids = {pk for pk in ids if pk is not None}
+    if not ids:
+        return None
+    return queryset.filter(pk__in=ids)
+
+
+def _update_changed(queryset, expression):
+    """Store ``expression`` in ``post_count`` on the rows where it differs."""
+    return queryset.exclude(post_count=expression).update(post_count=expression, updated_at=Now())
+
+
+def refresh_category_counts(category_ids=None):
+    """
+    Recompute ``Category.post_count`` for the given ids (or every category).
+
+    Returns:
+        Number of category counters corrected
+    """
+    queryset = _restrict(Category.objects.all(), category_ids)
+    if queryset is None:
+        return 0
+    return _update_changed(queryset, category_count_expression())
+
+
+def refresh_tag_counts(tag_ids=None):
+    """
+    Recompute ``Tag.post_count`` for the given ids (or every tag).
+
+    Returns:
+        Number of tag counters corrected
+    """
+    queryset = _restrict(Tag.objects.all(), tag_ids)
+    if queryset is None:
+        return 0
+    return _update_changed(queryset, tag_count_expression())
+
+
+def refresh_counts_for_posts(post_ids):
+    """
+    Recompute the counters of every category and tag attached to the given
+    posts. Used by bulk paths such as ``QuerySet.update`` that bypass signals.
+    """
+    post_ids = list(post_ids)
+    if not post_ids:
+        return
+    category_ids = Post.objects.filter(pk__in=post_ids).values_list('category_id', flat=True)
+    tag_ids = Post.tags.through.objects.filter(post_id__in=post_ids).values_list('tag_id', flat=True)
+    refresh_category_counts(set(category_ids))
+    refresh_tag_counts(set(tag_ids))
+
+
+def find_counter_drift():
+    """
+    Find categories and tags whose stored counter disagrees with the data.
+
+    Returns:
+        List of ``(model_name, pk, name, stored, actual)`` tuples
+    """
+    drift = []
+    for model, expression in ((Category, category_count_expression()), (Tag, tag_count_expression())):
+        rows = model.objects.annotate(actual=expression).exclude(
+            post_count=F('actual')
+        ).values_list('pk', 'name', 'post_count', 'actual')
+        drift.extend((model.__name__, pk, name, stored, actual) for pk, name, stored, actual in rows)
+    return drift
@@ -0,0 +1,68 @@
+"""
+Newline-delimited JSON export of published posts.
+
+Posts are read with ``QuerySet.iterator(chunk_size=...)`` in
+``(updated_at, id)`` order and rendered one chunk at a time with
+``PostDetailSerializer``, so memory stays constant however many posts are
+exported and no COUNT or OFFSET query is ever issued. Passing the latest
+``updated_at`` of a previous export as ``updated_since`` pulls only the
+posts changed since; the bound is inclusive, so consumers should upsert on
+``id``. Posts that were unpublished or deleted are not reported.
+"""
+from itertools import islice
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from apps.core.renderers import ORJSONRenderer
+
+from .models import Post
+from .projection import project_queryset
+from .serializers import PostDetailSerializer
+
+CHUNK_SIZE = 500
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+
+def parse_updated_since(value):
+    """
+    Parse an ISO 8601 ``updated_since`` bound; naive values are taken in
+    the current time zone.
+
+    Raises:
+        ValidationError: if the value is not a datetime
+    """
+    try:
+        updated_since = parse_datetime(value.strip())
+    except ValueError:
+        updated_since = None
+    if updated_since is None:
+        raise ValidationError({'updated_since': ['Enter an ISO 8601 date and time.']})
+    if timezone.is_naive(updated_since):
+        updated_since = timezone.make_aware(updated_since)
+    return updated_since
+
+
+def get_export_queryset(updated_since=None):
+    """Return the published posts to export, oldest change first."""
+    queryset = Post.objects.filter(status='published')
+    if updated_since is not None:
+        queryset = queryset.filter(updated_at__gte=updated_since)
+    return project_queryset(queryset, PostDetailSerializer).order_by('updated_at', 'pk')
+
+
+def iter_ndjson(updated_since=None, chunk_size=CHUNK_SIZE, request=None):
+    """
+    Yield the exported posts as NDJSON, one chunk of lines at a time.
+    """
+    renderer = ORJSONRenderer()
+    posts = get_export_queryset(updated_since).iterator(chunk_size=chunk_size)
+    context = {'request': request}
+    while True:
+        chunk = list(islice(posts, chunk_size))
+        if not chunk:
+            return
+        rows = PostDetailSerializer(chunk, many=True, context=context).data
+        yield b''.join(renderer.render(row) + b'\n' for row in rows)
@@ -0,0 +1,39 @@
+import django_filters
+from rest_framework import filters
+
+from .models import Post
+from .search import search_posts
+
+
+class PostFilter(django_filters.FilterSet):
+    """
+    Filters for post listings, including reading time bounds
+    (e.g. ``?max_reading_time=5``).
+    """
+    min_reading_time = django_filters.NumberFilter(field_name='reading_time', lookup_expr='gte')
+    max_reading_time = django_filters.NumberFilter(field_name='reading_time', lookup_expr='lte')
+
+    class Meta:
+        model = Post
+        fields = ['status', 'author', 'category', 'tags', 'created_at']
+
+
+class PostSearchFilter(filters.SearchFilter):
+    """
+    Search filter backed by the full-text search backend.
+
+    Results are ordered by relevance unless the client asked for an explicit
+    ``ordering``; the view's ordering is kept as the tie-breaker. Must run
+    after ``OrderingFilter`` in ``filter_backends``.
+    """
+    ordering_param = filters.OrderingFilter.ordering_param
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+
+        queryset = search_posts(queryset, query)
+        if request.query_params.get(self.ordering_param):
+            return queryset
+        return queryset.order_by('-search_rank', *queryset.query.order_by)
@@ -0,0 +1,275 @@
+"""
+Resized variants of post featured images.
+
+When a post is saved with a new featured image, the upload is resized to
+each configured width and encoded as WebP and JPEG by a pool of worker
+processes (see ``apps.blog.imaging``), off the request thread. The parent
+process saves the files in the featured image storage and records their
+names in ``Post.featured_image_variants``, which the serializers render as
+``srcset`` strings.
+"""
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .cache import get_cache, get_namespace_versions, get_timeout, invalidate
+from .imaging import FORMATS, render_variants
+from .models import Post, PostImageVariant
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'VARIANTS': {'thumbnail': 320, 'card': 768, 'full': 1600},
+    'FORMATS': ('webp', 'jpeg'),
+    'QUALITY': 82,
+    'WORKERS': 2,
+    'ASYNC': True,
+}
+
+
+def get_setting(name):
+    """Read a ``BLOG_IMAGES`` setting, falling back to the defaults."""
+    return getattr(settings, 'BLOG_IMAGES', {}).get(name, DEFAULTS[name])
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Return the worker pool of the current process, started on first use.
+    Workers are spawned rather than forked, so they inherit no locks or
+    database connections from a threaded server process.
+    """
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = ProcessPoolExecutor(
+                    max_workers=get_setting('WORKERS'),
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+                _executor_pid = os.getpid()
+    return _executor
+
+
+def get_variant_name(name, variant, extension):
+    """
+    Return the name a variant of the image stored as ``name`` is saved
+    under; content-addressed storage replaces it with the content hash.
+    """
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, 'variants', stem, f'{variant}.{extension}').replace(os.sep, '/')
+
+
+def store_variants(post_id, name, rendered):
+    """
+    Save rendered variants of the image ``name`` and record them on the
+    post, unless its featured image changed in the meantime.
+
+    Returns:
+        The ``{variant: {'width', 'height', <format>: name}}`` map stored
+    """
+    storage = Post._meta.get_field('featured_image').storage
+    variants = {}
+    for variant, entry in rendered.items():
+        stored = {'width': entry['width'], 'height': entry['height']}
+        for format_name in FORMATS:
+            if format_name not in entry:
+                continue
+            target = get_variant_name(name, variant, FORMATS[format_name][1])
+            stored[format_name] = storage.save(target, ContentFile(entry[format_name]))
+        variants[variant] = stored
+
+    rows = Post.objects.filter(pk=post_id, featured_image=name)
+    previous = rows.values_list('featured_image_variants', flat=True).first()
+    # The row changes without save(): bump updated_at for the conditional
+    # GET validators and drop cached responses showing the old srcset.
+    with transaction.atomic():
+        stored = rows.update(featured_image_variants=variants, updated_at=timezone.now())
+        if stored:
+            set_variant_references(post_id, variants)
+    if stored:
+        delete_variants(previous)
+        invalidate('posts')
+    else:
+        delete_variants(variants)
+    return variants
+
+
+def get_variant_names(variants):
+    """Yield the storage names of a ``featured_image_variants`` map."""
+    for entry in (variants or {}).values():
+        yield from (entry[format_name] for format_name in FORMATS if entry.get(format_name))
+
+
+def set_variant_references(post_id, variants):
+    """Replace the ``PostImageVariant`` rows of a post with ``variants``."""
+    PostImageVariant.objects.filter(post_id=post_id).delete()
+    PostImageVariant.objects.bulk_create(
+        PostImageVariant(post_id=post_id, name=name) for name in get_variant_names(variants)
+    )
+
+
+def delete_variants(variants):
+    """Delete the files of a ``featured_image_variants`` map."""
+    storage = Post._meta.get_field('featured_image').storage
+    for name in get_variant_names(variants):
+        storage.delete(name)
+
+
+def get_variant_references():
+    """Yield the storage names of every stored variant."""
+    variant_maps = Post.objects.exclude(featured_image_variants={}).values_list(
+        'featured_image_variants', flat=True
+    )
+    for variants in variant_maps.iterator():
+        yield from get_variant_names(variants)
+
+
+def get_media_owners(name):
+    """
+    Return the ``(status, author_id)`` pairs of the posts using the stored
+    file ``name`` as featured image or variant.
+
+    Both lookups are indexed. Found owners are cached with the response
+    cache timeout until the ``posts`` namespace changes, which every save
+    of a published post does; unreferenced names are not cached, so a file
+    is visible as soon as a post starts using it.
+    """
+    timeout = get_timeout()
+    if timeout:
+        payload = json.dumps([get_namespace_versions(['posts']), name])
+        key = f'blog:media-owners:{hashlib.sha256(payload.encode()).hexdigest()}'
+        owners = get_cache().get(key)
+        if owners is not None:
+            return owners
+
+    owners = set(Post.objects.filter(featured_image=name).order_by().values_list('status', 'author_id'))
+    owners.update(
+        PostImageVariant.objects.filter(name=name).order_by().values_list('post__status', 'post__author_id')
+    )
+    owners = sorted(owners)
+    if timeout and owners:
+        get_cache().set(key, owners, timeout)
+    return owners
+
+
+def get_media_access(user, name):
+    """
+    Media access check (see ``apps.core.media``): featured images and
+    their variants are public once a post using them is published, and
+    visible only to the author while it is a draft.
+    """
+    access = None
+    for status, author_id in get_media_owners(name):
+        if status == 'published':
+            return 'public'
+        if user.is_authenticated and author_id == user.pk:
+            access = 'private'
+        elif access is None:
+            access = False
+    return access
+
+
+def get_render_arguments(name):
+    """Return the ``render_variants`` arguments for the stored image ``name``."""
+    storage = Post._meta.get_field('featured_image').storage
+    with storage.open(name, 'rb') as handle:
+        data = handle.read()
+    return data, dict(get_setting('VARIANTS')), tuple(get_setting('FORMATS')), get_setting('QUALITY')
+
+
+def _store_in_background(post_id, name, future):
+    try:
+        store_variants(post_id, name, future.result())
+    except Exception:
+        logger.exception('Could not generate variants of %s for post %s', name, post_id)
+    finally:
+        # Runs on the pool's result thread, which keeps no connection between tasks
+        connections.close_all()
+
+
+def generate_variants(post_id, name):
+    """
+    Render and store the variants of the featured image ``name`` of a post.
+
+    With ``BLOG_IMAGES['ASYNC']`` the rendering is handed to the worker
+    pool and this returns at once; otherwise it runs inline. Failures are
+    logged, never raised: the post keeps serving its original image.
+    """
+    try:
+        arguments = get_render_arguments(name)
+        if not get_setting('ASYNC'):
+            store_variants(post_id, name, render_variants(*arguments))
+            return
+        future = get_executor().submit(render_variants, *arguments)
+    except Exception:
+        logger.exception('Could not generate variants of %s for post %s', name, post_id)
+        return
+    future.add_done_callback(lambda done: _store_in_background(post_id, name, done))
+
+
+def render_in_pool(images):
+    """
+    Render the variants of ``(post_id, name)`` pairs in the worker pool,
+    keeping at most two images per worker in flight.
+
+    Yields:
+        ``(post_id, name, rendered)`` in input order, where ``rendered``
+        is the exception raised when an image could not be rendered
+    """
+    executor = get_executor()
+    window = 2 * get_setting('WORKERS')
+    pending = deque()
+
+    def collect():
+        post_id, name, future = pending.popleft()
+        try:
+            return post_id, name, future.result()
+        except Exception as exc:
+            return post_id, name, exc
+
+    for post_id, name in images:
+        try:
+            future = executor.submit(render_variants, *get_render_arguments(name))
+        except OSError as exc:
+            yield post_id, name, exc
+            continue
+        pending.append((post_id, name, future))
+        if len(pending) >= window:
+            yield collect()
+    while pending:
+        yield collect()
+
+
+def build_srcset(variants, url):
+    """
+    Return ``{format: srcset}`` for a ``featured_image_variants`` map, with
+    ``url`` turning storage names into URLs, or None without variants.
+    """
+    if not variants:
+        return None
+    entries = sorted(variants.values(), key=lambda entry: entry['width'])
+    srcset = {}
+    for format_name in FORMATS:
+        candidates = {}
+        for entry in entries:
+            if entry.get(format_name):
+                candidates.setdefault(entry['width'], entry[format_name])
+        if candidates:
+            srcset[format_name] = ', '.join(f'{url(name)} {width}w' for width, name in candidates.items())
+    return srcset or None
@@ -0,0 +1,60 @@
+"""
+Pillow-only rendering of featured image variants.
+
+Kept free of Django imports so worker processes started with ``spawn`` can
+import it without configuring Django; storing the results is the job of
+``apps.blog.images`` in the parent process.
+"""
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+# format -> (Pillow format, file extension, save options)
+FORMATS = {
+    'webp': ('WEBP', 'webp', {'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'optimize': True, 'progressive': True}),
+}
+
+
+def _flatten(image):
+    """Composite a transparent image onto white for formats without alpha."""
+    image = image.convert('RGBA')
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def render_variants(data, widths, formats, quality):
+    """
+    Resize the image in ``data`` to each of ``widths`` (a ``{variant: max
+    width}`` map) and encode every size in each of ``formats``.
+
+    Images are never upscaled, so variants wider than the original share
+    its size.
+
+    Returns:
+        ``{variant: {'width', 'height', <format>: bytes, ...}}``
+    """
+    with Image.open(BytesIO(data)) as original:
+        original.load()
+        image = ImageOps.exif_transpose(original)
+
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    rendered = {}
+    for variant, width in widths.items():
+        resized = image.copy()
+        resized.thumbnail((width, resized.height), Image.LANCZOS)
+        entry = {'width': resized.width, 'height': resized.height}
+        for name in formats:
+            pillow_format, _, options = FORMATS[name]
+            if not has_alpha:
+                frame = resized.convert('RGB')
+            elif pillow_format == 'JPEG':
+                frame = _flatten(resized)
+            else:
+                frame = resized.convert('RGBA')
+            buffer = BytesIO()
+            frame.save(buffer, pillow_format, quality=quality, **options)
+            entry[name] = buffer.getvalue()
+        rendered[variant] = entry
+    return rendered
@@ -0,0 +1,246 @@
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    """
+    Compare request concurrency of the WSGI and ASGI handlers in-process.
+
+    Each server runs in its own process (``ASYNC_VIEWS`` is read when the
+    URLconf is imported): WSGI requests are served by a pool of worker
+    threads, as by a threaded WSGI server, and ASGI requests by one event
+    loop. ``--client-delay`` keeps every request open that much longer
+    after the response is produced, standing in for slow clients or for
+    time spent waiting on other services: a WSGI worker is blocked for it,
+    the event loop is not.
+    """
+    help = (
+        'Benchmark the WSGI handler with a thread pool against the ASGI handler with '
+        'async views, on requests to an API path of the configured database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default='/api/v1/blog/posts/',
+            help='Path (and query string) requested (default: /api/v1/blog/posts/).',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Requests sent to each server (default: 500).',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=50,
+            help='Requests in flight at once (default: 50).',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='WSGI worker threads (default: 8).',
+        )
+        parser.add_argument(
+            '--client-delay',
+            type=float,
+            default=0,
+            help='Milliseconds each request stays open after its response (default: 0).',
+        )
+        parser.add_argument(
+            '--username',
+            help='Authenticate every request with a JWT of this user.',
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Disable the blog response cache.',
+        )
+        parser.add_argument(
+            '--server',
+            choices=['wsgi', 'asgi'],
+            help='Benchmark a single server in this process and print JSON.',
+        )
+
+    def handle(self, *args, **options):
+        if min(options['requests'], options['concurrency'], options['workers']) < 1:
+            raise CommandError('--requests, --concurrency and --workers must be positive.')
+        if options['client_delay'] < 0:
+            raise CommandError('--client-delay cannot be negative.')
+
+        if options['server']:
+            self.authorization = self.get_authorization(options['username'])
+            timeout = 0 if options['no_cache'] else settings.BLOG_RESPONSE_CACHE_TIMEOUT
+            with override_settings(BLOG_RESPONSE_CACHE_TIMEOUT=timeout):
+                if options['server'] == 'wsgi':
+                    latencies, elapsed = self.run_wsgi(options)
+                else:
+                    latencies, elapsed = asyncio.run(self.run_asgi(options))
+            self.stdout.write(json.dumps({'latencies': latencies, 'elapsed': elapsed}))
+            return
+
+        self.stdout.write(
+            f"{'server':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"
+        )
+        for server in ('wsgi', 'asgi'):
+            result = self.run_server(server, options)
+            latencies = [latency * 1000 for latency in result['latencies']]
+            self.stdout.write(
+                f"{server:>6} {len(latencies) / result['elapsed']:>9.1f} {percentile(latencies, 0.5):>9.1f} "
+                f"{percentile(latencies, 0.95):>9.1f} {max(latencies):>9.1f}"
+            )
+
+    def run_server(self, server, options):
+        """Benchmark ``server`` in a child process and return its result."""
+        command = [
+            sys.executable, '-m', 'django', 'benchmark_asgi', '--server', server,
+            '--path', options['path'],
+            '--requests', str(options['requests']),
+            '--concurrency', str(options['concurrency']),
+            '--workers', str(options['workers']),
+            '--client-delay', str(options['client_delay']),
+        ]
+        if options['username']:
+            command.extend(['--username', options['username']])
+        if options['no_cache']:
+            command.append('--no-cache')
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE,
+            ASYNC_VIEWS=str(server == 'asgi'),
+            METRICS_DIR='',
+        )
+        completed = subprocess.run(command, env=env, capture_output=True, text=True, cwd=settings.BASE_DIR)
+        if completed.returncode:
+            raise CommandError(f'The {server} benchmark failed:\n{completed.stderr}')
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def get_authorization(self, username):
+        """Return the ``Authorization`` header value to send, or None."""
+        if not username:
+            return None
+        from django.contrib.auth import get_user_model
+        from apps.authentication.jwt_utils import generate_token
+
+        user = get_user_model().objects.filter(username=username).first()
+        if user is None:
+            raise CommandError(f'No user named {username!r}.')
+        return f'Bearer {generate_token(user)}'
+
+    def check_status(self, status_code):
+        if status_code >= 400:
+            raise CommandError(f'{self.path} answered {status_code}.')
+
+    def run_wsgi(self, options):
+        from django.core.handlers.wsgi import WSGIHandler
+
+        handler = WSGIHandler()
+        url = urlsplit(options['path'])
+        self.path = options['path']
+        delay = options['client_delay'] / 1000
+
+        def request(queued):
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'PATH_INFO': url.path,
+                'QUERY_STRING': url.query,
+                'SERVER_NAME': 'localhost',
+                'SERVER_PORT': '8000',
+                'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_HOST': 'localhost:8000',
+                'wsgi.input': io.BytesIO(),
+                'wsgi.errors': sys.stderr,
+                'wsgi.url_scheme': 'http',
+                'wsgi.multithread': True,
+                'wsgi.multiprocess': False,
+                'wsgi.run_once': False,
+            }
+            if self.authorization:
+                environ['HTTP_AUTHORIZATION'] = self.authorization
+            statuses = []
+            body = handler(environ, lambda status, headers: statuses.append(status))
+            try:
+                b''.join(body)
+                # The worker stays busy while a slow client reads
+                time.sleep(delay)
+            finally:
+                body.close()
+            self.check_status(int(statuses[0].split()[0]))
+            return time.perf_counter() - queued
+
+        request(time.perf_counter())  # warm up
+        # Clients beyond the worker count wait in the accept queue
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            latencies = []
+            for batch in range(0, options['requests'], options['concurrency']):
+                size = min(options['concurrency'], options['requests'] - batch)
+                queued = time.perf_counter()
+                latencies.extend(executor.map(request, [queued] * size))
+        return latencies, time.perf_counter() - started
+
+    async def run_asgi(self, options):
+        from django.core.handlers.asgi import ASGIHandler
+
+        handler = ASGIHandler()
+        url = urlsplit(options['path'])
+        self.path = options['path']
+        delay = options['client_delay'] / 1000
+
+        async def request():
+            queued = time.perf_counter()
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'GET',
+                'scheme': 'http',
+                'path': url.path,
+                'query_string': url.query.encode(),
+                'root_path': '',
+                'headers': [(b'host', b'localhost:8000')],
+                'server': ('localhost', 8000),
+                'client': ('127.0.0.1', 50000),
+            }
+            if self.authorization:
+                scope['headers'].append((b'authorization', self.authorization.encode()))
+            messages = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+            async def send(message):
+                messages.append(message)
+                if message['type'] == 'http.response.body' and not message.get('more_body'):
+                    # A slow client holds the connection, not a thread
+                    await asyncio.sleep(delay)
+
+            await handler(scope, receive, send)
+            self.check_status(messages[0]['status'])
+            return time.perf_counter() - queued
+
+        await request()  # warm up
+        started = time.perf_counter()
+        latencies = []
+        for batch in range(0, options['requests'], options['concurrency']):
+            size = min(options['concurrency'], options['requests'] - batch)
+            latencies.extend(await asyncio.gather(*(request() for _ in range(size))))
+        return latencies, time.perf_counter() - started
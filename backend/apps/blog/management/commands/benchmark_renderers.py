@@ -0,0 +1,131 @@
+import timeit
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.blog.models import Category, Post, Tag
+from apps.blog.projection import project_queryset
+from apps.blog.serializers import PostListSerializer
+from apps.core.renderers import ORJSONRenderer
+
+User = get_user_model()
+
+WORDS = (
+    'django query index cache latency render stream café naïve '
+    'throughput — request “quoted” serializer page cursor'
+).split()
+
+
+class Command(BaseCommand):
+    """
+    Compare the stock JSON renderer with the orjson renderer on pages of
+    ``PostListSerializer`` output.
+    """
+    help = (
+        'Benchmark JSONRenderer against ORJSONRenderer on paginated post lists. '
+        'Sample posts are created in a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='10,100,1000',
+            help='Comma separated page sizes to render (default: 10,100,1000).',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timing runs per renderer; the best run is reported (default: 5).',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted({int(size) for size in options['sizes'].split(',')})
+        except ValueError:
+            raise CommandError('--sizes must be a comma separated list of integers.')
+        if not sizes or sizes[0] < 1 or options['repeat'] < 1:
+            raise CommandError('Page sizes and --repeat must be positive.')
+
+        with transaction.atomic():
+            pages = self.build_pages(sizes)
+            transaction.set_rollback(True)
+
+        renderers = (('json', JSONRenderer()), ('orjson', ORJSONRenderer()))
+        self.stdout.write(f"{'posts':>6} {'bytes':>9} {'json ms':>9} {'orjson ms':>10} {'speedup':>8}")
+        for size, data in pages:
+            outputs = {name: renderer.render(data) for name, renderer in renderers}
+            if outputs['json'] != outputs['orjson']:
+                raise CommandError(f'Renderers disagree on the page of {size} posts.')
+            timings = {}
+            for name, renderer in renderers:
+                number = max(1, 1000 // size)
+                runs = timeit.repeat(lambda: renderer.render(data), number=number, repeat=options['repeat'])
+                timings[name] = min(runs) / number * 1000
+            self.stdout.write(
+                f"{size:>6} {len(outputs['json']):>9} {timings['json']:>9.3f} "
+                f"{timings['orjson']:>10.3f} {timings['json'] / timings['orjson']:>7.1f}x"
+            )
+
+    def build_pages(self, sizes):
+        """
+        Create enough sample posts for the largest page and return
+        ``(size, paginated response data)`` pairs.
+        """
+        count = sizes[-1]
+        author = User.objects.create_user(
+            username='renderer-benchmark',
+            email='renderer-benchmark@example.com',
+            password='unused-benchmark-password',
+            first_name='Zoë',
+            last_name='Bench',
+        )
+        categories = Category.objects.bulk_create(
+            Category(name=f'Renderer benchmark {index}', slug=f'renderer-benchmark-{index}')
+            for index in range(5)
+        )
+        tags = Tag.objects.bulk_create(
+            Tag(name=f'renderer-benchmark-{index}', slug=f'renderer-benchmark-{index}')
+            for index in range(10)
+        )
+        now = timezone.now()
+        posts = Post.objects.bulk_create(
+            Post(
+                title=' '.join(WORDS[index % len(WORDS):] + WORDS[:3]).capitalize(),
+                slug=f'renderer-benchmark-{index}',
+                content=' '.join(WORDS * 20),
+                excerpt=' '.join(WORDS * 2)[:150] + '...',
+                author=author,
+                category=categories[index % len(categories)],
+                status='published',
+                featured_image=f'blog_images/benchmark-{index}.jpg' if index % 2 else None,
+                word_count=len(WORDS) * 20,
+                reading_time=2,
+                published_at=now - timezone.timedelta(minutes=index),
+            )
+            for index in range(count)
+        )
+        Post.tags.through.objects.bulk_create(
+            Post.tags.through(post_id=post.pk, tag_id=tags[(index + offset) % len(tags)].pk)
+            for index, post in enumerate(posts)
+            for offset in range(3)
+        )
+
+        request = RequestFactory().get('/api/v1/blog/posts/', HTTP_HOST='localhost:8000')
+        queryset = project_queryset(
+            Post.objects.filter(author=author).order_by('-published_at'), PostListSerializer
+        )
+        pages = []
+        for size in sizes:
+            results = PostListSerializer(queryset[:size], many=True, context={'request': request}).data
+            pages.append((size, {
+                'count': count,
+                'next': request.build_absolute_uri('?page=2'),
+                'previous': None,
+                'results': results,
+            }))
+        return pages
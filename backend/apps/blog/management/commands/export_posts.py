@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from apps.blog.export import CHUNK_SIZE, iter_ndjson, parse_updated_since
+
+
+class Command(BaseCommand):
+    """
+    Export published posts as newline-delimited JSON.
+    """
+    help = 'Write every published post (or those updated since a time) as NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--updated-since',
+            help='Only export posts updated at or after this ISO 8601 date and time.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help=f'Posts read and rendered per query (default: {CHUNK_SIZE}).',
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write to (default: standard output).',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive.')
+        updated_since = None
+        if options['updated_since']:
+            try:
+                updated_since = parse_updated_since(options['updated_since'])
+            except ValidationError:
+                raise CommandError('--updated-since must be an ISO 8601 date and time.')
+
+        chunks = iter_ndjson(updated_since, chunk_size=options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'wb') as handle:
+                exported = self.write_chunks(chunks, handle)
+            self.stdout.write(self.style.SUCCESS(f"Exported {exported} post(s) to {options['output']}."))
+        else:
+            exported = self.write_chunks(chunks)
+            self.stderr.write(f'Exported {exported} post(s).', style_func=self.style.SUCCESS)
+
+    def write_chunks(self, chunks, handle=None):
+        """
+        Write NDJSON chunks to ``handle`` (standard output when None) and
+        return the number of posts written.
+        """
+        exported = 0
+        for chunk in chunks:
+            exported += chunk.count(b'\n')
+            if handle is None:
+                self.stdout.write(chunk.decode('utf-8'), ending='')
+            else:
+                handle.write(chunk)
+        return exported
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from apps.blog.images import render_in_pool, store_variants
+from apps.blog.models import Post
+
+
+class Command(BaseCommand):
+    """
+    Render the resized variants of existing featured images.
+    """
+    help = 'Generate the WebP/JPEG variants of post featured images in the worker pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--missing-only',
+            action='store_true',
+            help='Skip posts whose variants were already generated.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(featured_image='').exclude(featured_image__isnull=True)
+        if options['missing_only']:
+            posts = posts.filter(featured_image_variants={})
+        images = list(posts.order_by('pk').values_list('pk', 'featured_image'))
+
+        generated = failed = 0
+        for post_id, name, rendered in render_in_pool(images):
+            if isinstance(rendered, Exception):
+                failed += 1
+                self.stderr.write(f'Post {post_id}: could not render {name}: {rendered}')
+                continue
+            store_variants(post_id, name, rendered)
+            generated += 1
+
+        message = f'Generated variants for {generated} post(s).'
+        if failed:
+            message += f' {failed} image(s) failed.'
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.blog.counters import find_counter_drift, refresh_category_counts, refresh_tag_counts
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the denormalized published-post counters on categories and tags.
+    """
+    help = 'Reconcile Category.post_count and Tag.post_count with the published posts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report drifted counters and exit with an error if any are found.',
+        )
+
+    def handle(self, *args, **options):
+        drift = find_counter_drift()
+
+        for model_name, pk, name, stored, actual in drift:
+            self.stdout.write(f"{model_name} #{pk} '{name}': stored {stored}, actual {actual}")
+
+        if options['check']:
+            if drift:
+                raise CommandError(f'{len(drift)} counter(s) out of date.')
+            self.stdout.write(self.style.SUCCESS('All counters are up to date.'))
+            return
+
+        categories = refresh_category_counts()
+        tags = refresh_tag_counts()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt counters for all categories and tags '
+            f'({categories + tags} corrected).'
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from apps.blog.related import RelatedPostsEngine
+
+
+class Command(BaseCommand):
+    """
+    Recompute the related-posts index for all published posts.
+    """
+    help = 'Rebuild the precomputed related posts of every published post.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=None,
+            help='Number of neighbours to store per post (default: BLOG_RELATED_POSTS TOP_K).',
+        )
+
+    def handle(self, *args, **options):
+        indexed = RelatedPostsEngine(top_k=options['top_k']).rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed related posts for {indexed} post(s).'))
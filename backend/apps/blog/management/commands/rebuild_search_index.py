@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.blog.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the full-text search index for blog posts.
+    """
+    help = 'Rebuild the full-text search index of all posts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Database alias whose index should be rebuilt.',
+        )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend(options['database'])
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt search index with {backend.__class__.__name__}.'
+        ))
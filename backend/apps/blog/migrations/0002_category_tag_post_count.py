@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:05
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_post_counts(apps, schema_editor):
+    Category = apps.get_model("blog", "Category")
+    Tag = apps.get_model("blog", "Tag")
+    Post = apps.get_model("blog", "Post")
+
+    published = Post.objects.filter(status="published")
+    category_counts = published.values("category").annotate(total=Count("pk"))
+    for row in category_counts:
+        if row["category"] is not None:
+            Category.objects.filter(pk=row["category"]).update(post_count=row["total"])
+
+    tag_counts = (
+        Post.tags.through.objects.filter(post__status="published")
+        .values("tag")
+        .annotate(total=Count("pk"))
+    )
+    for row in tag_counts:
+        Tag.objects.filter(pk=row["tag"]).update(post_count=row["total"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="post_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Published Posts"
+            ),
+        ),
+        migrations.AddField(
+            model_name="tag",
+            name="post_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Published Posts"
+            ),
+        ),
+        migrations.RunPython(populate_post_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0002_category_tag_post_count"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["status", "-published_at", "-id"],
+                name="post_published_keyset_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["author", "-created_at", "-id"], name="post_author_keyset_idx"
+            ),
+        ),
+    ]
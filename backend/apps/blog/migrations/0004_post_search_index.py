@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:20
+
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS blog_post_fts "
+    "USING fts5(title, excerpt, content, tokenize='porter unicode61')",
+    "INSERT INTO blog_post_fts (rowid, title, excerpt, content) "
+    "SELECT id, title, COALESCE(excerpt, ''), content FROM blog_post",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TABLE IF EXISTS blog_post_fts",
+]
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE blog_post ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "UPDATE blog_post SET search_vector = "
+    "setweight(to_tsvector('english', COALESCE(title, '')), 'A') || "
+    "setweight(to_tsvector('english', COALESCE(excerpt, '')), 'B') || "
+    "setweight(to_tsvector('english', COALESCE(content, '')), 'C')",
+    "CREATE INDEX IF NOT EXISTS blog_post_search_vector_idx "
+    "ON blog_post USING GIN (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS blog_post_search_vector_idx",
+    "ALTER TABLE blog_post DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0003_post_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            _run({"sqlite": SQLITE_BACKWARD, "postgresql": POSTGRES_BACKWARD}),
+        ),
+    ]
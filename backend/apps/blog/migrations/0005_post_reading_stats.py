@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:12
+
+from django.db import migrations, models
+
+WORDS_PER_MINUTE = 200
+BATCH_SIZE = 500
+
+
+def backfill_reading_stats(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    batch = []
+    for post in Post.objects.only("id", "content").iterator(chunk_size=BATCH_SIZE):
+        post.word_count = len(post.content.split()) if post.content else 0
+        post.reading_time = max(1, round(post.word_count / WORDS_PER_MINUTE))
+        batch.append(post)
+        if len(batch) >= BATCH_SIZE:
+            Post.objects.bulk_update(batch, ["word_count", "reading_time"])
+            batch = []
+    if batch:
+        Post.objects.bulk_update(batch, ["word_count", "reading_time"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0004_post_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="reading_time",
+            field=models.PositiveIntegerField(
+                default=1, editable=False, verbose_name="Reading Time (minutes)"
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="word_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Word Count"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["reading_time"], name="blog_post_reading_657d58_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_reading_stats, migrations.RunPython.noop),
+    ]
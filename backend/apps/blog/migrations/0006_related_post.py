@@ -0,0 +1,64 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0005_post_reading_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RelatedPost",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField(verbose_name="Score")),
+                ("rank", models.PositiveSmallIntegerField(verbose_name="Rank")),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="related_entries",
+                        to="blog.post",
+                        verbose_name="Post",
+                    ),
+                ),
+                (
+                    "related",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="related_by",
+                        to="blog.post",
+                        verbose_name="Related Post",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Related Post",
+                "verbose_name_plural": "Related Posts",
+                "ordering": ["post", "rank"],
+                "indexes": [
+                    models.Index(
+                        fields=["post", "rank"], name="blog_relate_post_id_0c405e_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="relatedpost",
+            constraint=models.UniqueConstraint(
+                fields=("post", "related"), name="unique_related_post"
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0006_related_post"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="featured_image_variants",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                verbose_name="Featured Image Variants",
+            ),
+        ),
+    ]
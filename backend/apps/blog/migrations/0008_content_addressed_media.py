@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:03
+
+import apps.core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0007_post_featured_image_variants"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="post",
+            name="featured_image",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=apps.core.storage.get_media_storage,
+                upload_to="blog_images/",
+                verbose_name="Featured Image",
+            ),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:41
+
+import apps.core.storage
+from django.db import migrations, models
+import django.db.models.deletion
+
+FORMATS = ("webp", "jpeg")
+BATCH_SIZE = 500
+
+
+def backfill_image_variants(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    PostImageVariant = apps.get_model("blog", "PostImageVariant")
+    posts = Post.objects.exclude(featured_image_variants={}).values_list("id", "featured_image_variants")
+    batch = []
+    for post_id, variants in posts.iterator(chunk_size=BATCH_SIZE):
+        for entry in variants.values():
+            batch.extend(
+                PostImageVariant(post_id=post_id, name=entry[format_name])
+                for format_name in FORMATS
+                if entry.get(format_name)
+            )
+        if len(batch) >= BATCH_SIZE:
+            PostImageVariant.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        PostImageVariant.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0008_content_addressed_media"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="post",
+            name="featured_image",
+            field=models.ImageField(
+                blank=True,
+                db_index=True,
+                null=True,
+                storage=apps.core.storage.get_media_storage,
+                upload_to="blog_images/",
+                verbose_name="Featured Image",
+            ),
+        ),
+        migrations.CreateModel(
+            name="PostImageVariant",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        db_index=True, max_length=255, verbose_name="File Name"
+                    ),
+                ),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="image_variants",
+                        to="blog.post",
+                        verbose_name="Post",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Post Image Variant",
+                "verbose_name_plural": "Post Image Variants",
+            },
+        ),
+        migrations.RunPython(backfill_image_variants, migrations.RunPython.noop),
+    ]
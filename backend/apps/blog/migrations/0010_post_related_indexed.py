@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:06
+
+from django.db import migrations, models
+
+
+def mark_indexed_posts(apps, schema_editor):
+    # Posts indexed without neighbours are picked up by the next rebuild
+    Post = apps.get_model("blog", "Post")
+    Post.objects.filter(related_entries__isnull=False).distinct().update(related_indexed=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0009_post_image_variant_lookups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="related_indexed",
+            field=models.BooleanField(
+                default=False, editable=False, verbose_name="Related Posts Indexed"
+            ),
+        ),
+        migrations.RunPython(mark_indexed_posts, migrations.RunPython.noop),
+    ]
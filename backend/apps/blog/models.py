@@ -1,9 +1,13 @@
 from django.db import models
 from django.utils import timezone
-from django.utils.text import slugify
 from django.urls import reverse
 from apps.core.models import BaseModel
+from apps.core.storage import get_media_storage
 from apps.authentication.models import User
+from .slugs import save_with_slug
+
+# Average reading speed used to estimate reading time
+WORDS_PER_MINUTE = 200
 
 
 class Category(BaseModel):
@@ -13,6 +17,11 @@ class Category(BaseModel):
     name = models.CharField(max_length=100, unique=True, verbose_name='Category Name')
     slug = models.SlugField(max_length=100, unique=True, verbose_name='Category Slug')
     description = models.TextField(blank=True, null=True, verbose_name='Description')
+    post_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Published Posts'
+    )
 
     class Meta:
         verbose_name = 'Category'
@@ -27,20 +36,13 @@ class Category(BaseModel):
         return self.name
 
     def save(self, *args, **kwargs):
-        """Auto-generate slug from name if not provided."""
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        """Auto-generate a unique slug from name if not provided."""
+        save_with_slug(self, self.name, super().save, *args, **kwargs)
 
     def get_absolute_url(self):
         """Get the absolute URL for the category."""
         return reverse('blog:category_detail', kwargs={'slug': self.slug})
 
-    @property
-    def post_count(self):
-        """Get the number of published posts in this category."""
-        return self.posts.filter(status='published').count()
-
 
 class Tag(BaseModel):
     """
@@ -48,6 +50,11 @@ class Tag(BaseModel):
     """
     name = models.CharField(max_length=50, unique=True, verbose_name='Tag Name')
     slug = models.SlugField(max_length=50, unique=True, verbose_name='Tag Slug')
+    post_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Published Posts'
+    )
 
     class Meta:
         verbose_name = 'Tag'
@@ -62,20 +69,13 @@ class Tag(BaseModel):
         return self.name
 
     def save(self, *args, **kwargs):
-        """Auto-generate slug from name if not provided."""
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        """Auto-generate a unique slug from name if not provided."""
+        save_with_slug(self, self.name, super().save, *args, **kwargs)
 
     def get_absolute_url(self):
         """Get the absolute URL for the tag."""
         return reverse('blog:tag_detail', kwargs={'slug': self.slug})
 
-    @property
-    def post_count(self):
-        """Get the number of published posts with this tag."""
-        return self.posts.filter(status='published').count()
-
 
 class Post(BaseModel):
     """
@@ -122,10 +122,35 @@ class Post(BaseModel):
     )
     featured_image = models.ImageField(
         upload_to='blog_images/',
+        storage=get_media_storage,
         blank=True,
         null=True,
+        db_index=True,  # media access checks look posts up by image
         verbose_name='Featured Image'
     )
+    # Resized copies of the featured image, written by apps.blog.images
+    featured_image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Featured Image Variants'
+    )
+
+    # Whether apps.blog.related has stored the neighbours of the post,
+    # possibly none; until then related posts come from a fallback query
+    related_indexed = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Related Posts Indexed'
+    )
+
+    # Reading statistics, computed from content in save()
+    word_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='Word Count')
+    reading_time = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        verbose_name='Reading Time (minutes)'
+    )
 
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
@@ -144,6 +169,10 @@ class Post(BaseModel):
             models.Index(fields=['category']),
             models.Index(fields=['created_at']),
             models.Index(fields=['published_at']),
+            models.Index(fields=['reading_time']),
+            # Keyset pagination over (published_at, id) and (created_at, id)
+            models.Index(fields=['status', '-published_at', '-id'], name='post_published_keyset_idx'),
+            models.Index(fields=['author', '-created_at', '-id'], name='post_author_keyset_idx'),
         ]
 
     def __str__(self):
@@ -151,18 +180,21 @@ class Post(BaseModel):
 
     def save(self, *args, **kwargs):
         """
-        Auto-generate slug from title if not provided.
+        Auto-generate a unique slug from title if not provided.
         """
-        if not self.slug:
-            self.slug = slugify(self.title)
+        self.populate_defaults()
+
+        # Recompute reading statistics whenever content may have changed
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'content' in update_fields:
+            self.update_reading_stats()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'word_count', 'reading_time'}
 
-            # Handle duplicate slugs
-            counter = 1
-            original_slug = self.slug
-            while Post.objects.filter(slug=self.slug).exclude(pk=self.pk).exists():
-                self.slug = f"{original_slug}-{counter}"
-                counter += 1
+        save_with_slug(self, self.title, super().save, *args, **kwargs)
 
+    def populate_defaults(self):
+        """Fill in the excerpt and publication date when they are missing."""
         # Auto-generate excerpt if not provided
         if not self.excerpt and self.content:
             self.excerpt = self.content[:150] + '...' if len(self.content) > 150 else self.content
@@ -171,7 +203,10 @@ class Post(BaseModel):
         if self.status == 'published' and not self.published_at:
             self.published_at = timezone.now()
 
-        super().save(*args, **kwargs)
+    def update_reading_stats(self):
+        """Compute word count and estimated reading time from the content."""
+        self.word_count = len(self.content.split()) if self.content else 0
+        self.reading_time = max(1, round(self.word_count / WORDS_PER_MINUTE))
 
     def get_absolute_url(self):
         """Get the absolute URL for the post."""
@@ -182,12 +217,6 @@ class Post(BaseModel):
         """Check if the post is published."""
         return self.status == 'published'
 
-    @property
-    def reading_time(self):
-        """Estimate reading time in minutes (average 200 words per minute)."""
-        word_count = len(self.content.split())
-        return max(1, round(word_count / 200))
-
     @property
     def excerpt_or_content(self):
         """Get excerpt if available, otherwise first 150 characters of content."""
@@ -196,7 +225,16 @@ class Post(BaseModel):
         return self.content[:150] + '...' if len(self.content) > 150 else self.content
 
     def get_related_posts(self, limit=5):
-        """Get related posts based on category and tags."""
+        """
+        Get related posts from the precomputed index, falling back to a
+        category and tag match for posts that have not been indexed yet.
+        """
+        if self.related_indexed:
+            return Post.objects.filter(
+                status='published',
+                related_by__post=self
+            ).order_by('related_by__rank')[:limit]
+
         related_posts = Post.objects.filter(status='published').exclude(id=self.id)
 
         if self.category:
@@ -220,3 +258,60 @@ class Post(BaseModel):
             status='published',
             created_at__gt=self.created_at
         ).order_by('created_at').first()
+
+
+class RelatedPost(models.Model):
+    """
+    Precomputed top-k neighbour of a published post, scored by weighted
+    tag and category overlap. Maintained by ``apps.blog.related``.
+    """
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_entries',
+        verbose_name='Post'
+    )
+    related = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_by',
+        verbose_name='Related Post'
+    )
+    score = models.FloatField(verbose_name='Score')
+    rank = models.PositiveSmallIntegerField(verbose_name='Rank')
+
+    class Meta:
+        verbose_name = 'Related Post'
+        verbose_name_plural = 'Related Posts'
+        ordering = ['post', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'related'], name='unique_related_post'),
+        ]
+        indexes = [
+            models.Index(fields=['post', 'rank']),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} -> {self.related_id} ({self.score:.3f})'
+
+
+class PostImageVariant(models.Model):
+    """
+    Storage name of a resized variant of a post's featured image, mirroring
+    ``Post.featured_image_variants`` so media access checks can find the
+    post by file name. Maintained by ``apps.blog.images``.
+    """
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_variants',
+        verbose_name='Post'
+    )
+    name = models.CharField(max_length=255, db_index=True, verbose_name='File Name')
+
+    class Meta:
+        verbose_name = 'Post Image Variant'
+        verbose_name_plural = 'Post Image Variants'
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,214 @@
+import base64
+import json
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PostPagination(PageNumberPagination):
+    """
+    Custom pagination for posts.
+
+    Defaults to page numbers. Clients can opt into keyset (cursor) pagination
+    with ``?pagination=cursor`` on views that declare a cursor ordering field
+    through ``get_cursor_ordering_field()``. Keyset pages are ordered by
+    ``(<field>, id)`` descending, never run a COUNT query and stay stable when
+    new posts are inserted while a client is paging.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_field = self.get_cursor_field(request, view)
+        if self.cursor_field is None:
+            return super().paginate_queryset(queryset, request, view)
+        return self.paginate_keyset(queryset, request)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        ``paginate_queryset`` through the async ORM, for async views.
+        """
+        self.cursor_field = self.get_cursor_field(request, view)
+        if self.cursor_field is None:
+            return await self.apaginate_page_numbers(queryset, request)
+        return await self.apaginate_keyset(queryset, request)
+
+    async def apaginate_page_numbers(self, queryset, request):
+        """
+        Async ``PageNumberPagination.paginate_queryset``.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count is a cached property; filling it keeps page() from querying
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.page.object_list = [row async for row in self.page.object_list]
+        return self.page.object_list
+
+    def get_paginated_response(self, data):
+        if self.cursor_field is None:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if self.cursor_field is None:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return self.build_cursor_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if self.cursor_field is None:
+            return super().get_previous_link()
+        if not self.has_previous:
+            return None
+        return self.build_cursor_link(self.page[0], reverse=True)
+
+    def get_cursor_field(self, request, view):
+        """
+        Return the ordering field for keyset mode, or None for page numbers.
+        """
+        wants_cursor = (
+            self.cursor_query_param in request.query_params or
+            request.query_params.get(self.mode_query_param) == 'cursor'
+        )
+        if not wants_cursor or view is None:
+            return None
+        get_field = getattr(view, 'get_cursor_ordering_field', None)
+        return get_field() if get_field else None
+
+    def paginate_keyset(self, queryset, request):
+        """
+        Return one keyset page of ``queryset`` ordered by the cursor field.
+        """
+        queryset, page_size, position = self.get_keyset_queryset(queryset, request)
+        return self.set_keyset_page(list(queryset[:page_size + 1]), page_size, position)
+
+    async def apaginate_keyset(self, queryset, request):
+        """
+        Async ``paginate_keyset``.
+        """
+        queryset, page_size, position = self.get_keyset_queryset(queryset, request)
+        rows = [row async for row in queryset[:page_size + 1]]
+        return self.set_keyset_page(rows, page_size, position)
+
+    def get_keyset_queryset(self, queryset, request):
+        """
+        Return ``(queryset, page_size, position)``: ``queryset`` filtered
+        past the requested cursor and ordered in the paging direction.
+        """
+        field = self.cursor_field
+        self.request = request
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.filter(**{f'{field}__isnull': False})
+
+        if position is None:
+            value, pk, reverse = None, None, False
+        else:
+            value, pk, reverse = position
+            if reverse:
+                queryset = queryset.filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'pk__gt': pk}))
+            else:
+                queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk}))
+
+        if reverse:
+            queryset = queryset.order_by(field, 'pk')
+        else:
+            queryset = queryset.order_by(f'-{field}', '-pk')
+
+        # A column projection must still load the cursor field
+        loaded, deferred = queryset.query.deferred_loading
+        if not deferred and field not in loaded:
+            queryset = queryset.only(*loaded, field)
+        return queryset, page_size, position
+
+    def set_keyset_page(self, rows, page_size, position):
+        """
+        Keep the page from up to ``page_size + 1`` fetched ``rows`` and
+        work out its links.
+        """
+        reverse = position is not None and position[2]
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = rows
+        return rows
+
+    def encode_cursor(self, obj, reverse):
+        """
+        Encode the keyset position of ``obj`` (an instance or a ``values()``
+        row) into an opaque cursor string.
+        """
+        if isinstance(obj, dict):
+            value, pk = obj[self.cursor_field], obj['id']
+        else:
+            value, pk = getattr(obj, self.cursor_field), obj.pk
+        payload = {
+            'v': value.isoformat(),
+            'id': pk,
+            'r': int(reverse),
+        }
+        raw = json.dumps(payload, separators=(',', ':')).encode('ascii')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request):
+        """
+        Decode the cursor from the request into ``(value, pk, reverse)``.
+
+        Returns None when no cursor was given and raises ``NotFound`` when
+        the cursor cannot be decoded.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            value = parse_datetime(payload['v'])
+            pk = int(payload['id'])
+            reverse = bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk, reverse
+
+    def build_cursor_link(self, obj, reverse):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(obj, reverse))
@@ -0,0 +1,134 @@
+"""
+Column projections derived from serializer declarations.
+
+List endpoints render a fixed set of fields, so their querysets only need
+the columns those fields read. ``project_queryset`` loads exactly those
+columns with ``only()``: nested serializers on foreign keys become
+``select_related`` joins restricted to the nested fields, and nested
+serializers on many-to-many relations become prefetches with their own
+projection. Large columns such as ``Post.content`` are never transferred
+unless a serializer actually renders them.
+
+A field is mapped to a column through its ``source`` or, for
+``SerializerMethodField``, its name. Serializers whose methods read other
+columns list them in ``Meta.projection_fields``.
+
+Serializers built on ``SparseFieldsMixin`` also honour ``?fields=`` and
+``?expand=``; the parsed ``(fields, expand)`` pair narrows the projection
+the same way it narrows the rendered fields.
+"""
+from functools import lru_cache
+
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+def _concrete_fields(model):
+    return {field.name: field for field in model._meta.concrete_fields}
+
+
+def _split(value):
+    return frozenset(name.strip() for name in value.split(',') if name.strip())
+
+
+@lru_cache(maxsize=None)
+def get_field_names(serializer_class):
+    """Return the names of the fields a serializer class declares."""
+    return frozenset(serializer_class().fields)
+
+
+def parse_sparse_fields(request, serializer_class):
+    """
+    Parse ``?fields=`` and ``?expand=`` for ``serializer_class``.
+
+    Returns:
+        None when neither parameter is given or the serializer does not
+        support them, otherwise a ``(fields, expand)`` pair where ``fields``
+        is None when every field is wanted
+
+    Raises:
+        ValidationError: for unknown field or expansion names
+    """
+    expandable = getattr(serializer_class, 'expandable_fields', None)
+    if request is None or expandable is None:
+        return None
+    params = request.query_params
+    if 'fields' not in params and 'expand' not in params:
+        return None
+
+    errors = {}
+    fields = None
+    if 'fields' in params:
+        fields = _split(params['fields'])
+        unknown = fields - get_field_names(serializer_class)
+        if unknown:
+            errors['fields'] = [f"Unknown field(s): {', '.join(sorted(unknown))}."]
+    expand = _split(params.get('expand', ''))
+    if expand - set(expandable):
+        errors['expand'] = [f"Can only expand: {', '.join(expandable)}."]
+    if errors:
+        raise ValidationError(errors)
+    return fields, expand
+
+
+@lru_cache(maxsize=None)
+def get_projection(serializer_class, sparse=None):
+    """
+    Return ``(only, select_related, prefetches)`` for a model serializer.
+
+    ``only`` and ``select_related`` are tuples of lookups; ``prefetches`` is
+    a tuple of ``(relation, related_model, child_serializer_class)`` triples,
+    where the child class is None for relations rendered as primary keys.
+    """
+    model = serializer_class.Meta.model
+    concrete = _concrete_fields(model)
+    only = {model._meta.pk.name}
+    select_related = set()
+    prefetches = []
+    fields, expand = sparse or (None, None)
+
+    names = list(getattr(serializer_class.Meta, 'projection_fields', ()))
+    for name, field in serializer_class().fields.items():
+        if fields is not None and name not in fields:
+            continue
+        source = name if field.source == '*' else field.source
+        # Relations left out of ?expand= are rendered as primary keys
+        collapsed = sparse is not None and name not in expand
+        if isinstance(field, serializers.ListSerializer) and isinstance(field.child, serializers.ModelSerializer):
+            relation = model._meta.get_field(source)
+            child_class = None if collapsed else type(field.child)
+            prefetches.append((source, relation.related_model, child_class))
+        elif isinstance(field, serializers.ModelSerializer) and source in concrete:
+            only.add(source)
+            if not collapsed:
+                nested_only, nested_select, _ = get_projection(type(field))
+                only.update(f'{source}__{lookup}' for lookup in nested_only)
+                select_related.add(source)
+                select_related.update(f'{source}__{lookup}' for lookup in nested_select)
+        else:
+            names.append(source)
+
+    only.update(name for name in names if name in concrete)
+    return tuple(sorted(only)), tuple(sorted(select_related)), tuple(prefetches)
+
+
+def project_queryset(queryset, serializer_class, sparse=None):
+    """
+    Restrict ``queryset`` to the columns rendered by ``serializer_class``
+    (narrowed by a parsed ``(fields, expand)`` pair, if given).
+
+    Replaces any ``select_related``/``prefetch_related`` already applied,
+    since the projection describes every relation the serializer reads.
+    """
+    only, select_related, prefetches = get_projection(serializer_class, sparse)
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    for relation, related_model, child_class in prefetches:
+        if child_class is None:
+            related = related_model._default_manager.only(related_model._meta.pk.name)
+        else:
+            related = project_queryset(related_model._default_manager.all(), child_class)
+        queryset = queryset.prefetch_related(Prefetch(relation, queryset=related))
+    return queryset.only(*only)
@@ -0,0 +1,184 @@
+"""
+Related-posts engine.
+
+Published posts form a sparse post x tag matrix kept as inverted postings
+(tag -> posts). The score of a candidate is the row of ``A . W . A^T`` for
+the target post, where ``W`` weights each tag by its inverse document
+frequency, so rare shared tags count more than ubiquitous ones. Sharing the
+target's category adds a fixed boost, and same-category posts fill the
+remaining slots when too few posts share a tag. The top-k neighbours of each
+post are stored in ``RelatedPost`` and ``Post.related_indexed`` marks the
+posts scored, including those left without neighbours.
+"""
+import heapq
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+from .cache import invalidate
+from .models import Post, RelatedPost
+
+DEFAULTS = {
+    'TOP_K': 5,
+    'TAG_WEIGHT': 1.0,
+    'CATEGORY_WEIGHT': 0.5,
+}
+
+
+def get_setting(name):
+    """Read a ``BLOG_RELATED_POSTS`` setting, falling back to the defaults."""
+    return getattr(settings, 'BLOG_RELATED_POSTS', {}).get(name, DEFAULTS[name])
+
+
+class RelatedPostsEngine:
+    """
+    Score posts against each other and persist their top-k neighbours.
+    """
+
+    def __init__(self, top_k=None, tag_weight=None, category_weight=None):
+        self.top_k = top_k or get_setting('TOP_K')
+        self.tag_weight = get_setting('TAG_WEIGHT') if tag_weight is None else tag_weight
+        self.category_weight = (
+            get_setting('CATEGORY_WEIGHT') if category_weight is None else category_weight
+        )
+        self.total = 0
+        self.post_tags = defaultdict(list)
+        self.tag_postings = defaultdict(list)
+        self.post_category = {}
+        self.category_posts = defaultdict(list)
+
+    def load(self, post_ids=None):
+        """
+        Load the matrix rows needed to score ``post_ids`` (all posts if None).
+
+        Postings are always complete for every loaded tag, so document
+        frequencies are exact for incremental refreshes too.
+        """
+        published = Post.objects.filter(status='published')
+        through = Post.tags.through.objects.filter(post__status='published')
+        self.total = published.count()
+
+        if post_ids is None:
+            targets = None
+            rows = published.order_by('-published_at', '-id').values_list('id', 'category_id')
+            tag_rows = through.values_list('post_id', 'tag_id')
+        else:
+            targets = set(published.filter(pk__in=post_ids).values_list('id', flat=True))
+            target_tags = through.filter(post_id__in=targets).values_list('tag_id', flat=True)
+            tag_rows = list(through.filter(tag_id__in=set(target_tags)).values_list('post_id', 'tag_id'))
+            rows = published.filter(
+                pk__in=targets | {post_id for post_id, _ in tag_rows}
+            ).values_list('id', 'category_id')
+
+        for post_id, tag_id in tag_rows:
+            self.tag_postings[tag_id].append(post_id)
+            if targets is None or post_id in targets:
+                self.post_tags[post_id].append(tag_id)
+
+        # Newest same-category posts, used to fill short neighbour lists
+        for post_id, category_id in rows:
+            self.post_category[post_id] = category_id
+            if targets is None and len(self.category_posts[category_id]) <= self.top_k:
+                self.category_posts[category_id].append(post_id)
+
+        if targets is not None:
+            categories = {self.post_category[post_id] for post_id in targets} - {None}
+            for category_id in categories:
+                self.category_posts[category_id] = list(
+                    published.filter(category_id=category_id).order_by(
+                        '-published_at', '-id'
+                    ).values_list('id', flat=True)[:self.top_k + 1]
+                )
+        return targets
+
+    def tag_idf(self, tag_id):
+        """Inverse document frequency weight of a tag."""
+        return math.log(1 + self.total / len(self.tag_postings[tag_id]))
+
+    def neighbours(self, post_id):
+        """
+        Return the top-k ``(related_id, score)`` pairs for a loaded post.
+        """
+        scores = defaultdict(float)
+        for tag_id in self.post_tags.get(post_id, ()):
+            weight = self.tag_weight * self.tag_idf(tag_id)
+            for other_id in self.tag_postings[tag_id]:
+                if other_id != post_id:
+                    scores[other_id] += weight
+
+        category_id = self.post_category.get(post_id)
+        if category_id is not None:
+            for other_id in scores:
+                if self.post_category.get(other_id) == category_id:
+                    scores[other_id] += self.category_weight
+            for other_id in self.category_posts.get(category_id, ()):
+                if len(scores) >= self.top_k:
+                    break
+                if other_id != post_id and other_id not in scores:
+                    scores[other_id] = self.category_weight
+
+        # Ties go to the newer (higher id) post
+        return heapq.nlargest(self.top_k, scores.items(), key=lambda item: (item[1], item[0]))
+
+    def build_entries(self, post_ids):
+        """Create unsaved ``RelatedPost`` rows for the given loaded posts."""
+        entries = []
+        for post_id in post_ids:
+            for rank, (related_id, score) in enumerate(self.neighbours(post_id), start=1):
+                entries.append(RelatedPost(post_id=post_id, related_id=related_id, score=score, rank=rank))
+        return entries
+
+    @transaction.atomic
+    def rebuild(self):
+        """
+        Recompute the neighbours of every published post.
+
+        Returns:
+            Number of posts indexed
+        """
+        self.load()
+        RelatedPost.objects.all().delete()
+        RelatedPost.objects.bulk_create(self.build_entries(self.post_category), batch_size=1000)
+        Post.objects.filter(status='published', related_indexed=False).update(related_indexed=True)
+        Post.objects.exclude(status='published').filter(related_indexed=True).update(related_indexed=False)
+        invalidate('posts')
+        return len(self.post_category)
+
+    @transaction.atomic
+    def refresh(self, post_ids):
+        """
+        Recompute the neighbours of the given posts. Unpublished or deleted
+        posts simply lose their entries.
+        """
+        post_ids = set(post_ids)
+        targets = self.load(post_ids)
+        RelatedPost.objects.filter(post_id__in=post_ids).delete()
+        RelatedPost.objects.bulk_create(self.build_entries(targets), batch_size=1000)
+        Post.objects.filter(pk__in=targets).update(related_indexed=True)
+        Post.objects.filter(pk__in=post_ids - targets).update(related_indexed=False)
+
+
+def refresh_related_posts(post_ids):
+    """
+    Incrementally refresh the index after the given posts changed.
+
+    The posts themselves are rescored, together with every post currently
+    listing one of them. Because scores are symmetric, the new neighbours of
+    the changed posts are rescored as well so they can pick the changed posts
+    up. Anything else is corrected by the next ``rebuild_related_posts`` run.
+    """
+    post_ids = {pk for pk in post_ids if pk is not None}
+    if not post_ids:
+        return
+    referrers = set(
+        RelatedPost.objects.filter(related_id__in=post_ids).values_list('post_id', flat=True)
+    )
+    RelatedPostsEngine().refresh(post_ids | referrers)
+
+    neighbours = set(
+        RelatedPost.objects.filter(post_id__in=post_ids).values_list('related_id', flat=True)
+    ) - post_ids - referrers
+    if neighbours:
+        RelatedPostsEngine().refresh(neighbours)
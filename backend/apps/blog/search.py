@@ -0,0 +1,215 @@
+"""
+Full-text search backends for blog posts.
+
+The backend is chosen from ``settings.BLOG_SEARCH_BACKEND`` (a dotted path)
+or, by default, from the database vendor: SQLite uses an FTS5 table,
+PostgreSQL a weighted ``tsvector`` column with a GIN index, and any other
+database falls back to ``icontains`` lookups. The index is kept in sync
+from the post signals in ``apps.blog.signals``.
+"""
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Post
+
+SEARCH_FIELDS = ('title', 'excerpt', 'content')
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def parse_terms(query):
+    """Split a user supplied query into plain word terms."""
+    return TERM_RE.findall(query or '')
+
+
+class BaseSearchBackend:
+    """
+    Interface implemented by post search backends.
+    """
+
+    def __init__(self, using='default'):
+        self.using = using
+
+    def search(self, queryset, query):
+        """
+        Filter ``queryset`` to posts matching ``query`` and annotate each
+        row with a ``search_rank`` where higher means more relevant.
+        """
+        raise NotImplementedError
+
+    def index_posts(self, post_ids):
+        """Add or refresh the index entries of the given posts."""
+
+    def remove_posts(self, post_ids):
+        """Drop the index entries of the given posts."""
+
+    def rebuild(self):
+        """Rebuild the whole index from the posts table."""
+
+
+class BasicSearchBackend(BaseSearchBackend):
+    """
+    Unindexed fallback using case-insensitive substring matches.
+    """
+
+    def search(self, queryset, query):
+        terms = parse_terms(query)
+        if not terms:
+            return queryset.none()
+        for term in terms:
+            condition = Q()
+            for field in SEARCH_FIELDS:
+                condition |= Q(**{f'{field}__icontains': term})
+            queryset = queryset.filter(condition)
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    SQLite FTS5 backend ranking matches with weighted BM25.
+    """
+    table = 'blog_post_fts'
+    # BM25 column weights for title, excerpt and content
+    weights = (10.0, 5.0, 1.0)
+
+    def build_match(self, terms):
+        """Build an FTS5 MATCH expression requiring every term as a prefix."""
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def search(self, queryset, query):
+        terms = parse_terms(query)
+        if not terms:
+            return queryset.none()
+        match = self.build_match(terms)
+        post_table = Post._meta.db_table
+        weights = ', '.join(str(weight) for weight in self.weights)
+
+        matching_ids = RawSQL(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+            (match,)
+        )
+        rank = RawSQL(
+            f'SELECT -bm25({self.table}, {weights}) FROM {self.table} '
+            f'WHERE {self.table} MATCH %s AND rowid = "{post_table}"."id"',
+            (match,),
+            output_field=FloatField()
+        )
+        return queryset.filter(pk__in=matching_ids).annotate(search_rank=rank)
+
+    def index_posts(self, post_ids):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(post_ids))
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid IN ({placeholders})', post_ids)
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, title, excerpt, content) '
+                f'SELECT id, title, COALESCE(excerpt, \'\'), content FROM {Post._meta.db_table} '
+                f'WHERE id IN ({placeholders})',
+                post_ids
+            )
+
+    def remove_posts(self, post_ids):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(post_ids))
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid IN ({placeholders})', post_ids)
+
+    def rebuild(self):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, title, excerpt, content) '
+                f'SELECT id, title, COALESCE(excerpt, \'\'), content FROM {Post._meta.db_table}'
+            )
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    PostgreSQL backend using a weighted ``search_vector`` column and GIN index.
+    """
+    column = 'search_vector'
+
+    @property
+    def config(self):
+        return getattr(settings, 'BLOG_SEARCH_CONFIG', 'english')
+
+    def vector_sql(self):
+        """SQL computing the weighted document vector of a post row."""
+        return (
+            "setweight(to_tsvector(%s::regconfig, COALESCE(title, '')), 'A') || "
+            "setweight(to_tsvector(%s::regconfig, COALESCE(excerpt, '')), 'B') || "
+            "setweight(to_tsvector(%s::regconfig, COALESCE(content, '')), 'C')"
+        )
+
+    def search(self, queryset, query):
+        terms = parse_terms(query)
+        if not terms:
+            return queryset.none()
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        post_table = Post._meta.db_table
+
+        matching_ids = RawSQL(
+            f'SELECT id FROM {post_table} '
+            f'WHERE {self.column} @@ to_tsquery(%s::regconfig, %s)',
+            (self.config, tsquery)
+        )
+        rank = RawSQL(
+            f'ts_rank("{post_table}"."{self.column}", to_tsquery(%s::regconfig, %s))',
+            (self.config, tsquery),
+            output_field=FloatField()
+        )
+        return queryset.filter(pk__in=matching_ids).annotate(search_rank=rank)
+
+    def index_posts(self, post_ids):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {Post._meta.db_table} SET {self.column} = {self.vector_sql()} '
+                f'WHERE id = ANY(%s)',
+                [self.config] * 3 + [post_ids]
+            )
+
+    def rebuild(self):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {Post._meta.db_table} SET {self.column} = {self.vector_sql()}',
+                [self.config] * 3
+            )
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend(using='default'):
+    """
+    Return the configured search backend for the given database alias.
+    """
+    path = getattr(settings, 'BLOG_SEARCH_BACKEND', None)
+    if path:
+        backend_class = import_string(path)
+    else:
+        backend_class = VENDOR_BACKENDS.get(connections[using].vendor, BasicSearchBackend)
+    return backend_class(using=using)
+
+
+def search_posts(queryset, query):
+    """
+    Filter a post queryset with the search backend of its database.
+
+    The result is annotated with ``search_rank``; callers decide the ordering.
+    """
+    return get_search_backend(queryset.db).search(queryset, query)
@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.conf import settings
 from rest_framework import serializers
+from .images import build_srcset
 from .models import Post, Category, Tag
 
 User = get_user_model()
@@ -35,7 +36,48 @@ class AuthorSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'first_name', 'last_name', 'email']
 
-class PostListSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    Render only the fields requested with ``?fields=`` and collapse nested
+    relations to primary keys unless they are named in ``?expand=``.
+
+    The parsed ``(fields, expand)`` pair is read from
+    ``context['sparse_fields']``; without it every field is rendered in full.
+    """
+    expandable_fields = ('author', 'category', 'tags')
+
+    def get_fields(self):
+        fields = super().get_fields()
+        sparse = self.context.get('sparse_fields')
+        if not sparse:
+            return fields
+
+        wanted, expand = sparse
+        if wanted is not None:
+            fields = {name: field for name, field in fields.items() if name in wanted}
+        for name in self.expandable_fields:
+            if name in fields and name not in expand:
+                many = isinstance(fields[name], serializers.ListSerializer)
+                fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, many=many)
+        return fields
+
+def get_featured_image_srcset(post, request):
+    """
+    Return the ``{format: srcset}`` map of a post's featured image
+    variants, with URLs built like ``featured_image``.
+    """
+    if not post.featured_image:
+        return None
+    storage = post.featured_image.storage
+
+    def url(name):
+        if request:
+            return request.build_absolute_uri(storage.url(name))
+        return f"http://localhost:8000{storage.url(name)}"
+
+    return build_srcset(post.featured_image_variants, url)
+
+class PostListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for listing posts (public view).
     """
@@ -45,14 +87,20 @@ class PostListSerializer(serializers.ModelSerializer):
     excerpt = serializers.ReadOnlyField()
     reading_time = serializers.ReadOnlyField()
     featured_image = serializers.SerializerMethodField()
+    featured_image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
         fields = [
             'id', 'title', 'slug', 'excerpt', 'author', 'category', 'tags',
-            'status', 'featured_image', 'created_at', 'updated_at', 'published_at',
-            'reading_time'
+            'status', 'featured_image', 'featured_image_srcset', 'created_at', 'updated_at',
+            'published_at', 'reading_time'
         ]
+        # Method fields rendering absolute media URLs (see fastpath)
+        absolute_media_fields = ['featured_image']
+        # Method fields rendering srcset maps: name -> (variants, image field)
+        srcset_fields = {'featured_image_srcset': ('featured_image_variants', 'featured_image')}
+        projection_fields = ['featured_image', 'featured_image_variants']
 
     def get_featured_image(self, obj):
         if obj.featured_image:
@@ -62,7 +110,10 @@ class PostListSerializer(serializers.ModelSerializer):
             return f"http://localhost:8000{obj.featured_image.url}"
         return None
 
-class PostDetailSerializer(serializers.ModelSerializer):
+    def get_featured_image_srcset(self, obj):
+        return get_featured_image_srcset(obj, self.context.get('request'))
+
+class PostDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for detailed post view.
     """
@@ -71,14 +122,20 @@ class PostDetailSerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True, read_only=True)
     reading_time = serializers.ReadOnlyField()
     featured_image = serializers.SerializerMethodField()
+    featured_image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
         fields = [
             'id', 'title', 'slug', 'content', 'excerpt', 'author', 'category', 'tags',
-            'status', 'featured_image', 'created_at', 'updated_at', 'published_at',
-            'reading_time'
+            'status', 'featured_image', 'featured_image_srcset', 'created_at', 'updated_at',
+            'published_at', 'reading_time'
         ]
+        # Method fields rendering absolute media URLs (see fastpath)
+        absolute_media_fields = ['featured_image']
+        # Method fields rendering srcset maps: name -> (variants, image field)
+        srcset_fields = {'featured_image_srcset': ('featured_image_variants', 'featured_image')}
+        projection_fields = ['featured_image', 'featured_image_variants']
 
     def get_featured_image(self, obj):
         if obj.featured_image:
@@ -88,6 +145,9 @@ class PostDetailSerializer(serializers.ModelSerializer):
             return f"http://localhost:8000{obj.featured_image.url}"
         return None
 
+    def get_featured_image_srcset(self, obj):
+        return get_featured_image_srcset(obj, self.context.get('request'))
+
 class PostCreateSerializer(serializers.ModelSerializer):
     """
     Serializer for creating posts.
@@ -136,8 +196,16 @@ class PostCreateSerializer(serializers.ModelSerializer):
     def validate_category_id(self, value):
         """
         Validate category exists if provided.
+
+        Bulk creation passes the ids of the existing categories as
+        ``context['category_ids']`` to avoid a query per post.
         """
         if value is not None:
+            known = self.context.get('category_ids')
+            if known is not None:
+                if value not in known:
+                    raise serializers.ValidationError("Category does not exist.")
+                return value
             try:
                 Category.objects.get(id=value)
             except Category.DoesNotExist:
@@ -146,9 +214,15 @@ class PostCreateSerializer(serializers.ModelSerializer):
 
     def validate_tag_ids(self, value):
         """
-        Validate tags exist if provided.
+        Validate tags exist if provided (against ``context['tag_ids']``
+        when given).
         """
         if value:
+            known = self.context.get('tag_ids')
+            if known is not None:
+                if not known.issuperset(value):
+                    raise serializers.ValidationError("One or more tags do not exist.")
+                return value
             existing_tags = Tag.objects.filter(id__in=value)
             if len(existing_tags) != len(value):
                 raise serializers.ValidationError("One or more tags do not exist.")
@@ -271,7 +345,7 @@ class PostUpdateSerializer(serializers.ModelSerializer):
         instance.save()
         return instance
 
-class MyPostSerializer(serializers.ModelSerializer):
+class MyPostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for user's own posts.
     """
@@ -289,6 +363,8 @@ class MyPostSerializer(serializers.ModelSerializer):
             'status', 'featured_image', 'created_at', 'updated_at', 'published_at',
             'reading_time'
         ]
+        # Method fields rendering absolute media URLs (see fastpath)
+        absolute_media_fields = ['featured_image']
 
     def get_featured_image(self, obj):
         if obj.featured_image:
@@ -0,0 +1,294 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.authentication.models import User
+from .models import Post, Category, Tag, RelatedPost, PostImageVariant
+from .counters import refresh_category_counts, refresh_tag_counts
+from .search import SEARCH_FIELDS, get_search_backend
+from .cache import invalidate
+from .related import refresh_related_posts
+from .images import delete_variants, generate_variants
+
+# User fields rendered by AuthorSerializer inside cached post responses
+AUTHOR_FIELDS = {'username', 'first_name', 'last_name', 'email'}
+
+
+def _publication_change(instance):
+    """
+    Return ``(was_published, is_published, old_category_id)`` for a saved post.
+    """
+    previous = getattr(instance, '_previous_state', None) or {}
+    return (
+        previous.get('status') == 'published',
+        instance.status == 'published',
+        previous.get('category_id'),
+    )
+
+
+def is_stored_published(instance):
+    """Return whether the stored row of a post is published."""
+    return Post.objects.filter(pk=instance.pk, status='published').exists()
+
+
+def touch_posts(post_ids):
+    """
+    Move ``updated_at`` of retagged posts, which conditional GET validators
+    rely on to notice changed tag lists.
+    """
+    if post_ids:
+        Post.objects.filter(pk__in=post_ids).update(updated_at=timezone.now())
+
+
+@receiver(pre_save, sender=Post)
+def capture_previous_post_state(sender, instance, raw=False, **kwargs):
+    """
+    Remember the stored status, category and featured image so post_save
+    can tell what changed.
+    """
+    instance._previous_state = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_state = Post.objects.filter(pk=instance.pk).values(
+        'status', 'category_id', 'featured_image', 'featured_image_variants'
+    ).first()
+    if instance._previous_state is None:
+        return
+    # Variants are stored in the background; keep whatever was recorded
+    # since this instance was loaded, or drop them with their image.
+    if instance._previous_state['featured_image'] == (instance.featured_image.name or ''):
+        instance.featured_image_variants = instance._previous_state['featured_image_variants']
+    else:
+        instance.featured_image_variants = {}
+
+
+@receiver(post_save, sender=Post)
+def update_counters_on_save(sender, instance, raw=False, **kwargs):
+    """
+    Refresh category and tag counters when a post is published, unpublished
+    or moved to another category.
+    """
+    if raw:
+        return
+
+    was_published, is_published, old_category_id = _publication_change(instance)
+    if not (was_published or is_published):
+        return
+
+    status_changed = was_published != is_published
+    if status_changed or old_category_id != instance.category_id:
+        refresh_category_counts([old_category_id, instance.category_id])
+
+    if status_changed:
+        refresh_tag_counts(instance.tags.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Post)
+def invalidate_cache_on_post_save(sender, instance, raw=False, **kwargs):
+    """
+    Invalidate cached responses affected by a saved post. Drafts that stay
+    drafts are never publicly visible and invalidate nothing.
+    """
+    if raw:
+        return
+
+    was_published, is_published, old_category_id = _publication_change(instance)
+    if not (was_published or is_published):
+        return
+
+    namespaces = ['posts']
+    if was_published != is_published or old_category_id != instance.category_id:
+        namespaces.append('categories')
+    if was_published != is_published:
+        namespaces.append('tags')
+    invalidate(*namespaces)
+
+
+@receiver(post_save, sender=Post)
+def refresh_related_posts_on_save(sender, instance, raw=False, **kwargs):
+    """
+    Rescore related posts when a post is published, unpublished or moved
+    to another category.
+    """
+    if raw:
+        return
+
+    was_published, is_published, old_category_id = _publication_change(instance)
+    if was_published != is_published or (is_published and old_category_id != instance.category_id):
+        refresh_related_posts([instance.pk])
+        # Keep a later save of this instance from resetting the flag
+        instance.related_indexed = is_published
+
+
+@receiver(post_save, sender=Post)
+def update_search_index_on_save(sender, instance, raw=False, using='default', update_fields=None, **kwargs):
+    """
+    Refresh the full-text index entry of a saved post.
+    """
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & set(SEARCH_FIELDS):
+        return
+    get_search_backend(using).index_posts([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+def generate_image_variants_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Replace the resized variants of a post whose featured image changed,
+    once the transaction has committed.
+    """
+    if raw:
+        return
+    previous = getattr(instance, '_previous_state', None) or {}
+    old_image = previous.get('featured_image') or ''
+    new_image = instance.featured_image.name or ''
+    if old_image == new_image:
+        return
+
+    old_variants = previous.get('featured_image_variants')
+    if old_variants:
+        if update_fields is not None and 'featured_image_variants' not in update_fields:
+            Post.objects.filter(pk=instance.pk).update(featured_image_variants={})
+        PostImageVariant.objects.filter(post=instance).delete()
+        transaction.on_commit(lambda: delete_variants(old_variants))
+    if new_image:
+        transaction.on_commit(lambda: generate_variants(instance.pk, new_image))
+
+
+@receiver(post_save, sender=Post)
+def release_replaced_image_on_save(sender, instance, raw=False, **kwargs):
+    """
+    Drop the storage reference held by a replaced featured image.
+    """
+    if raw:
+        return
+    previous = getattr(instance, '_previous_state', None) or {}
+    old_image = previous.get('featured_image')
+    if old_image and old_image != instance.featured_image.name:
+        storage = instance.featured_image.storage
+        transaction.on_commit(lambda: storage.delete(old_image))
+
+
+@receiver(pre_delete, sender=Post)
+def capture_deleted_post_tags(sender, instance, **kwargs):
+    """
+    Remember the tags of a published post before its through rows are removed.
+    """
+    instance._deleted_tag_ids = []
+    instance._related_referrer_ids = []
+    if instance.status == 'published':
+        instance._deleted_tag_ids = list(instance.tags.values_list('id', flat=True))
+        instance._related_referrer_ids = list(
+            RelatedPost.objects.filter(related=instance).values_list('post_id', flat=True)
+        )
+
+
+@receiver(post_delete, sender=Post)
+def update_counters_on_delete(sender, instance, **kwargs):
+    """
+    Refresh counters after a published post has been deleted.
+    """
+    if instance.status != 'published':
+        return
+    refresh_category_counts([instance.category_id])
+    refresh_tag_counts(getattr(instance, '_deleted_tag_ids', []))
+    refresh_related_posts(getattr(instance, '_related_referrer_ids', []))
+    invalidate('posts', 'categories', 'tags')
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index_on_delete(sender, instance, using='default', **kwargs):
+    """
+    Drop the full-text index entry of a deleted post.
+    """
+    get_search_backend(using).remove_posts([instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+def delete_images_on_delete(sender, instance, **kwargs):
+    """
+    Drop the storage references held by a deleted post's featured image
+    and its resized variants.
+    """
+    if instance.featured_image_variants:
+        variants = instance.featured_image_variants
+        transaction.on_commit(lambda: delete_variants(variants))
+    if instance.featured_image:
+        name, storage = instance.featured_image.name, instance.featured_image.storage
+        transaction.on_commit(lambda: storage.delete(name))
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def update_counters_on_retag(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Refresh tag counters, related posts and cached responses when tags are
+    added to or removed from a post, from either side of the relation.
+    """
+    if reverse:
+        # ``instance`` is a Tag and ``pk_set`` holds post ids.
+        if action == 'pre_clear':
+            instance._cleared_post_ids = list(instance.posts.values_list('id', flat=True))
+        elif action in ('post_add', 'post_remove', 'post_clear'):
+            refresh_tag_counts([instance.pk])
+            post_ids = getattr(instance, '_cleared_post_ids', []) if action == 'post_clear' else pk_set
+            touch_posts(post_ids)
+            refresh_related_posts(post_ids)
+            invalidate('posts', 'tags')
+        return
+
+    if action == 'pre_clear':
+        instance._cleared_tag_ids = list(instance.tags.values_list('id', flat=True))
+        return
+
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        touch_posts([instance.pk])
+
+    # The stored status decides, not the in-memory one: serializers set
+    # tags before saving a status change, and post_save only refreshes the
+    # tags the post has after the change.
+    if action in ('post_add', 'post_remove', 'post_clear') and not is_stored_published(instance):
+        return
+
+    if action in ('post_add', 'post_remove'):
+        refresh_tag_counts(pk_set)
+    elif action == 'post_clear':
+        refresh_tag_counts(getattr(instance, '_cleared_tag_ids', []))
+    else:
+        return
+    refresh_related_posts([instance.pk])
+    instance.related_indexed = True
+    invalidate('posts', 'tags')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_cache_on_category_change(sender, raw=False, **kwargs):
+    """
+    Invalidate category responses and the posts nesting the category.
+    """
+    if not raw:
+        invalidate('categories', 'posts')
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_cache_on_tag_change(sender, raw=False, **kwargs):
+    """
+    Invalidate tag responses and the posts nesting the tag.
+    """
+    if not raw:
+        invalidate('tags', 'posts')
+
+
+@receiver(post_save, sender=User)
+def invalidate_cache_on_author_change(sender, raw=False, update_fields=None, **kwargs):
+    """
+    Invalidate post responses when author details shown in them may change.
+    """
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & AUTHOR_FIELDS:
+        return
+    invalidate('posts')
@@ -0,0 +1,99 @@
+"""
+Slug allocation for posts, categories and tags.
+
+A slug is the slugified source text, or when that is taken the first free
+``-1``, ``-2``, ... suffix, truncated to fit the column. ``allocate_slugs``
+serves a whole batch, reading the taken slugs with one prefix query per
+``LOOKUP_BATCH_SIZE`` distinct bases instead of an ``exists()`` query per
+candidate. ``save_with_slug`` does the same for a single ``save()`` and
+retries inside a savepoint when a concurrent writer takes the slug between
+allocation and insert.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+LOOKUP_BATCH_SIZE = 100
+
+# Room kept for a "-<n>" suffix when a base fills the whole column
+SUFFIX_RESERVE = 7
+
+# Allocations tried by save_with_slug before the IntegrityError is raised
+SAVE_ATTEMPTS = 3
+
+
+def _prefix(base, max_length):
+    """Return the prefix every slug derived from ``base`` starts with."""
+    if len(base) > max_length - SUFFIX_RESERVE:
+        return base[:max_length - SUFFIX_RESERVE]
+    return f'{base}-'
+
+
+def get_taken_slugs(model, bases, field='slug', exclude_pk=None):
+    """
+    Return the stored values of ``field`` that ``bases`` or their suffixed
+    variants could collide with, ignoring the row ``exclude_pk``.
+    """
+    max_length = model._meta.get_field(field).max_length
+    bases = list(dict.fromkeys(bases))
+    taken = set()
+    for start in range(0, len(bases), LOOKUP_BATCH_SIZE):
+        query = Q()
+        for base in bases[start:start + LOOKUP_BATCH_SIZE]:
+            query |= Q(**{field: base}) | Q(**{f'{field}__startswith': _prefix(base, max_length)})
+        rows = model._default_manager.filter(query)
+        if exclude_pk is not None:
+            rows = rows.exclude(pk=exclude_pk)
+        taken.update(rows.values_list(field, flat=True))
+    return taken
+
+
+def allocate_slugs(model, sources, field='slug', exclude_pk=None):
+    """
+    Return a unique slug for each text in ``sources``, unique among the
+    stored rows of ``model`` (other than ``exclude_pk``) and within the
+    batch itself.
+    """
+    max_length = model._meta.get_field(field).max_length
+    bases = [slugify(source)[:max_length] for source in sources]
+    taken = get_taken_slugs(model, bases, field, exclude_pk)
+
+    next_suffix = {}
+    slugs = []
+    for base in bases:
+        slug = base
+        counter = next_suffix.get(base, 1)
+        while slug in taken:
+            suffix = f'-{counter}'
+            slug = base[:max_length - len(suffix)] + suffix
+            counter += 1
+        next_suffix[base] = counter
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def save_with_slug(instance, source, save, *args, field='slug', **kwargs):
+    """
+    Call ``save(*args, **kwargs)``, first allocating ``instance``'s slug
+    from ``source`` if it has none.
+
+    Each attempt runs in a savepoint. When the insert fails because the
+    allocated slug was taken in the meantime, a new one is allocated;
+    any other integrity error is raised unchanged.
+    """
+    if getattr(instance, field):
+        return save(*args, **kwargs)
+
+    model = type(instance)
+    for attempt in range(1, SAVE_ATTEMPTS + 1):
+        slug = allocate_slugs(model, [source], field, exclude_pk=instance.pk)[0]
+        setattr(instance, field, slug)
+        try:
+            with transaction.atomic(using=kwargs.get('using')):
+                return save(*args, **kwargs)
+        except IntegrityError:
+            setattr(instance, field, '')
+            taken = model._default_manager.filter(**{field: slug}).exclude(pk=instance.pk).exists()
+            if not taken or attempt == SAVE_ATTEMPTS:
+                raise
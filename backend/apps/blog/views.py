@@ -1,37 +1,93 @@
-from django.db.models import Q
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
 from rest_framework import status, filters
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
-from rest_framework.pagination import PageNumberPagination
 from django_filters.rest_framework import DjangoFilterBackend
 
+from apps.core.async_views import AsyncHandlersMixin, aget_object_or_404
+from apps.core.streaming import stream_content
 from .models import Post, Category, Tag
+from .pagination import PostPagination
+from .filters import PostFilter, PostSearchFilter
+from .search import search_posts
+from . import bulk, fastpath
+from .cache import cache_response
+from .conditional import conditional_response
+from .export import NDJSON_CONTENT_TYPE, iter_ndjson, parse_updated_since
+from .projection import parse_sparse_fields, project_queryset
 from .serializers import (
     PostListSerializer, PostDetailSerializer, PostCreateSerializer, PostUpdateSerializer,
     MyPostSerializer, CategorySerializer, TagSerializer
 )
 
-class PostPagination(PageNumberPagination):
+def render_post_feed(view, posts, sparse):
     """
-    Custom pagination for posts.
+    Paginate and render a category or tag post feed with PostListSerializer.
     """
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+    if fastpath.is_enabled():
+        compiled = fastpath.compile_serializer(PostListSerializer, sparse)
+        posts = compiled.values(posts, view.get_cursor_ordering_field())
+        page = view.paginate_queryset(posts)
+        if page is not None:
+            return view.get_paginated_response(compiled.render(page))
+        return Response(compiled.render(posts))
+
+    page = view.paginate_queryset(posts)
+    if page is not None:
+        serializer = PostListSerializer(page, many=True, context={'sparse_fields': sparse})
+        return view.get_paginated_response(serializer.data)
 
-class PostViewSet(ModelViewSet):
+    serializer = PostListSerializer(posts, many=True, context={'sparse_fields': sparse})
+    return Response(serializer.data)
+
+async def arender_post_feed(view, posts, sparse):
+    """
+    Async ``render_post_feed``.
+    """
+    if fastpath.is_enabled():
+        compiled = fastpath.compile_serializer(PostListSerializer, sparse)
+        posts = compiled.values(posts, view.get_cursor_ordering_field())
+        page = await view.apaginate_queryset(posts)
+        if page is not None:
+            return view.get_paginated_response(await compiled.arender(page))
+        return Response(await compiled.arender([row async for row in posts]))
+
+    page = await view.apaginate_queryset(posts)
+    if page is not None:
+        serializer = PostListSerializer(page, many=True, context={'sparse_fields': sparse})
+        return view.get_paginated_response(serializer.data)
+
+    posts = [post async for post in posts]
+    serializer = PostListSerializer(posts, many=True, context={'sparse_fields': sparse})
+    return Response(serializer.data)
+
+def search_post_feed(request, posts):
+    """
+    Apply ``?search=`` to a category or tag post feed.
+    """
+    search = request.query_params.get('search', None)
+    if search:
+        posts = search_posts(posts, search).order_by('-search_rank', '-created_at')
+    return posts
+
+class PostViewSet(AsyncHandlersMixin, ModelViewSet):
     """
     ViewSet for blog posts with CRUD operations.
+
+    The public reads have async variants served under ASGI (see
+    ``apps.core.async_views``).
     """
     queryset = Post.objects.all()
     pagination_class = PostPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['status', 'author', 'category', 'tags', 'created_at']
-    search_fields = ['title', 'content', 'excerpt']
-    ordering_fields = ['created_at', 'updated_at', 'published_at', 'title']
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, PostSearchFilter]
+    filterset_class = PostFilter
+    ordering_fields = ['created_at', 'updated_at', 'published_at', 'title', 'reading_time', 'word_count']
     ordering = ['-created_at']
 
     def get_queryset(self):
@@ -41,16 +97,32 @@ class PostViewSet(ModelViewSet):
         queryset = Post.objects.select_related('author', 'category').prefetch_related('tags')
 
         # For public actions, only show published posts
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'related']:
             queryset = queryset.filter(status='published')
 
+        # Reads only load the columns their serializer renders
+        if self.action in ['list', 'retrieve']:
+            serializer_class = self.get_serializer_class()
+            queryset = project_queryset(queryset, serializer_class, self.get_sparse_fields(serializer_class))
+
         return queryset
 
+    def get_sparse_fields(self, serializer_class):
+        """
+        Return the parsed ``?fields=``/``?expand=`` pair for ``serializer_class``.
+        """
+        return parse_sparse_fields(self.request, serializer_class)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['sparse_fields'] = self.get_sparse_fields(self.get_serializer_class())
+        return context
+
     def get_serializer_class(self):
         """
         Return appropriate serializer based on action.
         """
-        if self.action == 'create':
+        if self.action in ['create', 'bulk_create']:
             return PostCreateSerializer
         elif self.action in ['update', 'partial_update']:
             return PostUpdateSerializer
@@ -65,13 +137,111 @@ class PostViewSet(ModelViewSet):
         """
         Set permissions based on action.
         """
-        if self.action in ['create', 'update', 'partial_update', 'destroy', 'my_posts', 'publish', 'unpublish']:
+        if self.action in [
+            'create', 'bulk_create', 'update', 'partial_update', 'destroy', 'my_posts', 'publish', 'unpublish',
+            'export',
+        ]:
             permission_classes = [IsAuthenticated]
         else:
             permission_classes = [IsAuthenticatedOrReadOnly]
 
         return [permission() for permission in permission_classes]
 
+    def get_cursor_ordering_field(self):
+        """
+        Return the field used by keyset pagination for the current action.
+        """
+        if self.action == 'my_posts':
+            # Drafts have no published_at, so the author's feed uses created_at
+            return 'created_at'
+        return 'published_at'
+
+    def get_validator_queryset(self):
+        """
+        Return the rows the response of a conditional action is built from.
+        """
+        if self.action == 'by_slug':
+            # Drafts are private to their author and never answered with a 304
+            return Post.objects.filter(slug=self.kwargs['slug'], status='published')
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset
+
+    @cache_response('posts', 'categories', 'tags')
+    @conditional_response(serializer_class=PostListSerializer)
+    def list(self, request, *args, **kwargs):
+        compiled = self.get_compiled_serializer()
+        if compiled is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = compiled.values(self.filter_queryset(self.get_queryset()), self.get_cursor_ordering_field())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(compiled.render(page, request))
+        return Response(compiled.render(queryset, request))
+
+    @cache_response('posts', 'categories', 'tags')
+    @conditional_response(serializer_class=PostListSerializer)
+    async def alist(self, request, *args, **kwargs):
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        compiled = self.get_compiled_serializer()
+        if compiled is not None:
+            queryset = compiled.values(queryset, self.get_cursor_ordering_field())
+            page = await self.apaginate_queryset(queryset)
+            if page is not None:
+                return self.get_paginated_response(await compiled.arender(page, request))
+            return Response(await compiled.arender([row async for row in queryset], request))
+
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer([post async for post in queryset], many=True)
+        return Response(serializer.data)
+
+    @cache_response('posts', 'categories', 'tags')
+    @conditional_response(detail=True, serializer_class=PostDetailSerializer)
+    def retrieve(self, request, *args, **kwargs):
+        compiled = self.get_compiled_serializer()
+        if compiled is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        # Reads carry no object-level permissions, so the row is enough
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            compiled.values(self.filter_queryset(self.get_queryset())),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        return Response(compiled.render([row], request)[0])
+
+    @cache_response('posts', 'categories', 'tags')
+    @conditional_response(detail=True, serializer_class=PostDetailSerializer)
+    async def aretrieve(self, request, *args, **kwargs):
+        compiled = self.get_compiled_serializer()
+        if compiled is None:
+            instance = await self.aget_object()
+            return Response(self.get_serializer(instance).data)
+
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = await aget_object_or_404(
+            compiled.values(queryset), **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        return Response((await compiled.arender([row], request))[0])
+
+    def get_compiled_serializer(self):
+        """
+        Return the compiled renderer for this action, or None when the
+        compiled serializers are disabled.
+        """
+        if not fastpath.is_enabled():
+            return None
+        serializer_class = self.get_serializer_class()
+        return fastpath.compile_serializer(serializer_class, self.get_sparse_fields(serializer_class))
+
     def perform_create(self, serializer):
         """
         Set author to current user and handle slug generation.
@@ -102,18 +272,15 @@ class PostViewSet(ModelViewSet):
         """
         Get current user's posts (both draft and published).
         """
-        posts = Post.objects.filter(author=request.user).select_related(
-            'author', 'category'
-        ).prefetch_related('tags').order_by('-created_at')
+        posts = project_queryset(
+            Post.objects.filter(author=request.user), MyPostSerializer,
+            self.get_sparse_fields(MyPostSerializer)
+        ).order_by('-created_at')
 
         # Apply search if provided
         search = request.query_params.get('search', None)
         if search:
-            posts = posts.filter(
-                Q(title__icontains=search) |
-                Q(content__icontains=search) |
-                Q(excerpt__icontains=search)
-            )
+            posts = search_posts(posts, search).order_by('-search_rank', '-created_at')
 
         # Apply filters
         status_filter = request.query_params.get('status', None)
@@ -133,16 +300,90 @@ class PostViewSet(ModelViewSet):
         serializer = self.get_serializer(posts, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'], url_path='bulk', permission_classes=[IsAuthenticated])
+    def bulk_create(self, request):
+        """
+        Create a list of posts in one request. Nothing is created unless
+        every post is valid; errors are reported per list index.
+        """
+        items = request.data
+        limit = bulk.get_limit()
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'error': 'Expected a non-empty list of posts.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > limit:
+            return Response(
+                {'error': f'At most {limit} posts can be created per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        validated_data, errors = bulk.validate_posts(items, self.get_serializer_context())
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        posts = bulk.bulk_create_posts(request.user, validated_data)
+        return Response(
+            {'created': [{'id': post.pk, 'slug': post.slug} for post in posts]},
+            status=status.HTTP_201_CREATED
+        )
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def export(self, request):
+        """
+        Stream every published post as newline-delimited JSON, optionally
+        only those updated since ``?updated_since=``.
+        """
+        updated_since = None
+        if request.query_params.get('updated_since'):
+            updated_since = parse_updated_since(request.query_params['updated_since'])
+
+        response = StreamingHttpResponse(
+            stream_content(request, iter_ndjson(updated_since, request=request)),
+            content_type=NDJSON_CONTENT_TYPE
+        )
+        response['Content-Disposition'] = 'attachment; filename="posts.ndjson"'
+        return response
+
     @action(detail=False, methods=['get'])
+    @cache_response('posts', 'categories', 'tags')
     def featured(self, request):
         """
         Get featured/popular posts.
         """
-        posts = Post.objects.filter(
-            status='published'
-        ).select_related('author', 'category').prefetch_related('tags').order_by('-created_at')[:5]
+        sparse = self.get_sparse_fields(PostListSerializer)
+        posts = project_queryset(
+            Post.objects.filter(status='published'), PostListSerializer, sparse
+        ).order_by('-created_at')[:5]
+
+        serializer = PostListSerializer(posts, many=True, context={'sparse_fields': sparse})
+        return Response(serializer.data)
+
+    @cache_response('posts', 'categories', 'tags')
+    async def afeatured(self, request):
+        sparse = self.get_sparse_fields(PostListSerializer)
+        posts = project_queryset(
+            Post.objects.filter(status='published'), PostListSerializer, sparse
+        ).order_by('-created_at')[:5]
+
+        posts = [post async for post in posts]
+        serializer = PostListSerializer(posts, many=True, context={'sparse_fields': sparse})
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    @cache_response('posts', 'categories', 'tags')
+    def related(self, request, pk=None):
+        """
+        Get posts related to a published post, best match first.
+        """
+        post = self.get_object()
+        sparse = self.get_sparse_fields(PostListSerializer)
+        related_posts = project_queryset(post.get_related_posts(), PostListSerializer, sparse)
 
-        serializer = PostListSerializer(posts, many=True)
+        serializer = PostListSerializer(
+            related_posts, many=True, context={'request': request, 'sparse_fields': sparse}
+        )
         return Response(serializer.data)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
@@ -198,31 +439,51 @@ class PostViewSet(ModelViewSet):
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'], url_path='by-slug/(?P<slug>[^/.]+)')
+    @cache_response('posts', 'categories', 'tags')
+    @conditional_response(detail=True, serializer_class=PostDetailSerializer)
     def by_slug(self, request, slug=None):
         """
         Get a post by slug.
         """
         try:
             post = Post.objects.select_related('author', 'category').prefetch_related('tags').get(slug=slug)
+        except Post.DoesNotExist:
+            post = None
+        return self.get_by_slug_response(request, post)
 
-            # For public access, only show published posts
-            if not request.user.is_authenticated or post.author != request.user:
-                if post.status != 'published':
-                    return Response(
-                        {'error': 'Post not found.'},
-                        status=status.HTTP_404_NOT_FOUND
-                    )
-
-            serializer = PostDetailSerializer(post)
-            return Response(serializer.data)
-
+    @cache_response('posts', 'categories', 'tags')
+    @conditional_response(detail=True, serializer_class=PostDetailSerializer)
+    async def aby_slug(self, request, slug=None):
+        try:
+            post = await Post.objects.select_related('author', 'category').prefetch_related('tags').aget(slug=slug)
         except Post.DoesNotExist:
+            post = None
+        return self.get_by_slug_response(request, post)
+
+    def get_by_slug_response(self, request, post):
+        """
+        Render the post found by ``by_slug``, or a 404 response when there
+        is none or it is a draft of another user.
+        """
+        # For public access, only show published posts
+        if post is None or (
+            post.status != 'published' and (not request.user.is_authenticated or post.author != request.user)
+        ):
             return Response(
                 {'error': 'Post not found.'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-class CategoryViewSet(ReadOnlyModelViewSet):
+        serializer = PostDetailSerializer(
+            post, context={'sparse_fields': self.get_sparse_fields(PostDetailSerializer)}
+        )
+        response = Response(serializer.data)
+        if post.status != 'published':
+            # Drafts are only visible to their author; keep them out of shared caches
+            patch_cache_control(response, private=True)
+        return response
+
+class CategoryViewSet(AsyncHandlersMixin, ReadOnlyModelViewSet):
     """
     ViewSet for categories (read-only).
     """
@@ -232,36 +493,62 @@ class CategoryViewSet(ReadOnlyModelViewSet):
     filter_backends = [filters.SearchFilter]
     search_fields = ['name', 'description']
 
-    @action(detail=True, methods=['get'])
-    def posts(self, request, pk=None):
+    def get_cursor_ordering_field(self):
         """
-        Get all posts in a specific category.
+        Keyset pagination is only available on the category post feed.
         """
-        category = self.get_object()
-        posts = Post.objects.filter(
-            category=category,
-            status='published'
-        ).select_related('author', 'category').prefetch_related('tags').order_by('-created_at')
+        return 'published_at' if self.action == 'posts' else None
 
-        # Apply search if provided
-        search = request.query_params.get('search', None)
-        if search:
-            posts = posts.filter(
-                Q(title__icontains=search) |
-                Q(content__icontains=search) |
-                Q(excerpt__icontains=search)
-            )
+    def get_validator_queryset(self):
+        """
+        Return the rows the response of a conditional action is built from.
+        """
+        if self.action == 'posts':
+            posts = Post.objects.filter(category=self.kwargs['pk'], status='published')
+            return search_post_feed(self.request, posts)
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'retrieve':
+            queryset = queryset.filter(pk=self.kwargs['pk'])
+        return queryset
 
-        # Paginate results
-        page = self.paginate_queryset(posts)
-        if page is not None:
-            serializer = PostListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+    @cache_response('categories')
+    @conditional_response()
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
-        serializer = PostListSerializer(posts, many=True)
-        return Response(serializer.data)
+    @cache_response('categories')
+    @conditional_response(detail=True)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
-class TagViewSet(ReadOnlyModelViewSet):
+    @action(detail=True, methods=['get'])
+    @cache_response('posts', 'categories', 'tags')
+    @conditional_response(serializer_class=PostListSerializer)
+    def posts(self, request, pk=None):
+        """
+        Get all posts in a specific category.
+        """
+        # Look up without filter_queryset(): ?search= targets the posts here
+        category = get_object_or_404(self.get_queryset(), pk=pk)
+        sparse = parse_sparse_fields(request, PostListSerializer)
+        posts = project_queryset(
+            Post.objects.filter(category=category, status='published'), PostListSerializer, sparse
+        ).order_by('-created_at')
+
+        return render_post_feed(self, search_post_feed(request, posts), sparse)
+
+    @cache_response('posts', 'categories', 'tags')
+    @conditional_response(serializer_class=PostListSerializer)
+    async def aposts(self, request, pk=None):
+        category = await aget_object_or_404(self.get_queryset(), pk=pk)
+        sparse = parse_sparse_fields(request, PostListSerializer)
+        posts = project_queryset(
+            Post.objects.filter(category=category, status='published'), PostListSerializer, sparse
+        ).order_by('-created_at')
+
+        return await arender_post_feed(self, search_post_feed(request, posts), sparse)
+
+class TagViewSet(AsyncHandlersMixin, ReadOnlyModelViewSet):
     """
     ViewSet for tags (read-only).
     """
@@ -271,31 +558,57 @@ class TagViewSet(ReadOnlyModelViewSet):
     filter_backends = [filters.SearchFilter]
     search_fields = ['name']
 
-    @action(detail=True, methods=['get'])
-    def posts(self, request, pk=None):
+    def get_cursor_ordering_field(self):
         """
-        Get all posts with a specific tag.
+        Keyset pagination is only available on the tag post feed.
         """
-        tag = self.get_object()
-        posts = Post.objects.filter(
-            tags=tag,
-            status='published'
-        ).select_related('author', 'category').prefetch_related('tags').order_by('-created_at')
+        return 'published_at' if self.action == 'posts' else None
 
-        # Apply search if provided
-        search = request.query_params.get('search', None)
-        if search:
-            posts = posts.filter(
-                Q(title__icontains=search) |
-                Q(content__icontains=search) |
-                Q(excerpt__icontains=search)
-            )
+    def get_validator_queryset(self):
+        """
+        Return the rows the response of a conditional action is built from.
+        """
+        if self.action == 'posts':
+            posts = Post.objects.filter(tags=self.kwargs['pk'], status='published')
+            return search_post_feed(self.request, posts)
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'retrieve':
+            queryset = queryset.filter(pk=self.kwargs['pk'])
+        return queryset
 
-        # Paginate results
-        page = self.paginate_queryset(posts)
-        if page is not None:
-            serializer = PostListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+    @cache_response('tags')
+    @conditional_response()
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
-        serializer = PostListSerializer(posts, many=True)
-        return Response(serializer.data)
+    @cache_response('tags')
+    @conditional_response(detail=True)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=True, methods=['get'])
+    @cache_response('posts', 'categories', 'tags')
+    @conditional_response(serializer_class=PostListSerializer)
+    def posts(self, request, pk=None):
+        """
+        Get all posts with a specific tag.
+        """
+        # Look up without filter_queryset(): ?search= targets the posts here
+        tag = get_object_or_404(self.get_queryset(), pk=pk)
+        sparse = parse_sparse_fields(request, PostListSerializer)
+        posts = project_queryset(
+            Post.objects.filter(tags=tag, status='published'), PostListSerializer, sparse
+        ).order_by('-created_at')
+
+        return render_post_feed(self, search_post_feed(request, posts), sparse)
+
+    @cache_response('posts', 'categories', 'tags')
+    @conditional_response(serializer_class=PostListSerializer)
+    async def aposts(self, request, pk=None):
+        tag = await aget_object_or_404(self.get_queryset(), pk=pk)
+        sparse = parse_sparse_fields(request, PostListSerializer)
+        posts = project_queryset(
+            Post.objects.filter(tags=tag, status='published'), PostListSerializer, sparse
+        ).order_by('-created_at')
+
+        return await arender_post_feed(self, search_post_feed(request, posts), sparse)
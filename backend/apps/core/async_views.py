@@ -0,0 +1,125 @@
+"""
+Async variants of DRF views for ASGI deployments.
+
+DRF 3.14 dispatches synchronously, so under ASGI every request to a DRF
+view runs in a worker thread. ``AsyncHandlersMixin`` lets a view or viewset
+define ``async def a<handler>`` next to a handler (``alist`` for ``list``,
+``aget`` for ``get``, ...). With ``settings.ASYNC_VIEWS`` (set by
+``blog_project.asgi``) or ``as_view(asynchronous=True)`` those handlers
+serve their methods from the event loop, querying through Django's async
+ORM. Authentication, permission and throttle checks still run in a thread,
+as they may query the database; methods without an async handler are
+dispatched to the regular synchronous view.
+"""
+from functools import update_wrapper
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+
+
+async def aget_object_or_404(queryset, *filter_args, **filter_kwargs):
+    """
+    Async ``rest_framework.generics.get_object_or_404``: malformed lookup
+    values are reported as missing objects too.
+    """
+    try:
+        return await queryset.aget(*filter_args, **filter_kwargs)
+    except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+        raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+
+
+class AsyncHandlersMixin:
+    """
+    Serve the handlers of a DRF view that have an ``a<handler>`` coroutine
+    variant from the event loop.
+
+    Mix in before ``APIView`` or the viewset class.
+    """
+
+    @classmethod
+    def get_async_handlers(cls, actions=None):
+        """
+        Return ``{http method: async handler name}`` for the methods routed
+        to ``actions`` (or to the handlers named after the methods).
+        """
+        if actions is None:
+            routes = {method: method for method in cls.http_method_names if hasattr(cls, method)}
+        else:
+            routes = actions
+        handlers = {
+            method: f'a{name}' for method, name in routes.items()
+            if iscoroutinefunction(getattr(cls, f'a{name}', None))
+        }
+        # HEAD falls back to GET, as in the synchronous dispatch
+        if 'get' in handlers and 'head' not in routes:
+            handlers['head'] = handlers['get']
+        return handlers
+
+    @classmethod
+    def as_view(cls, *args, asynchronous=None, **initkwargs):
+        sync_view = super().as_view(*args, **initkwargs)
+        if asynchronous is None:
+            asynchronous = getattr(settings, 'ASYNC_VIEWS', False)
+        actions = getattr(sync_view, 'actions', None)
+        handlers = cls.get_async_handlers(actions)
+        if not asynchronous or not handlers:
+            return sync_view
+
+        async def view(request, *args, **kwargs):
+            handler = handlers.get(request.method.lower())
+            if handler is None:
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            if actions is not None:
+                self.action_map = actions
+                for method, action in actions.items():
+                    setattr(self, method, getattr(self, action))
+            self.setup(request, *args, **kwargs)
+            return await self.adispatch(request, getattr(self, handler), *args, **kwargs)
+
+        # Copies cls, initkwargs, actions and csrf_exempt from the sync view
+        update_wrapper(view, sync_view, updated=('__dict__',))
+        del view.__wrapped__
+        return view
+
+    async def adispatch(self, request, handler, *args, **kwargs):
+        """
+        ``APIView.dispatch`` for an async handler.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aget_object(self):
+        """Async ``GenericAPIView.get_object``."""
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        obj = await aget_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        await sync_to_async(self.check_object_permissions)(self.request, obj)
+        return obj
+
+    async def apaginate_queryset(self, queryset):
+        """
+        Async ``GenericAPIView.paginate_queryset``; paginators without an
+        ``apaginate_queryset`` method run in a thread.
+        """
+        if self.paginator is None:
+            return None
+        paginate = getattr(self.paginator, 'apaginate_queryset', None)
+        if paginate is None:
+            paginate = sync_to_async(self.paginator.paginate_queryset)
+        return await paginate(queryset, self.request, view=self)
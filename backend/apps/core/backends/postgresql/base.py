@@ -0,0 +1,25 @@
+"""
+PostgreSQL backend taking its connections from ``apps.core.dbpool``.
+
+Set ``ENGINE`` to ``apps.core.backends.postgresql`` and give the limits in
+``OPTIONS['pool']``; ``apps.core.dburl.parse_database_url`` does both when
+``DB_POOL_MAX_SIZE`` is set.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from apps.core.dbpool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    def prepare_pooled_connection(self):
+        # A reused connection keeps the isolation level it was opened with
+        value = self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        try:
+            self.isolation_level = IsolationLevel(value)
+        except ValueError:
+            raise ImproperlyConfigured(
+                f'Invalid transaction isolation level {value} specified. '
+                f'Use one of the psycopg.IsolationLevel values.'
+            )
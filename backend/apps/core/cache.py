@@ -0,0 +1,56 @@
+"""
+Version stamps for cache invalidation.
+
+Cached values are stored under keys that embed (or record) the version of
+the data they were built from. Invalidating means bumping the version, a
+single ``incr`` that makes every older entry unreachable without having to
+know or delete its key.
+"""
+import time
+
+from django.core.cache import caches
+from django.db import connection, transaction
+
+
+def _initial_version():
+    # Millisecond clock so a version evicted from the cache never restarts
+    # at a value older entries were stored under.
+    return int(time.time() * 1000)
+
+
+def get_versions(keys, alias='default'):
+    """
+    Return the current version stored under each key, creating missing ones.
+    """
+    cache = caches[alias]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            cache.add(key, _initial_version(), None)
+            version = cache.get(key)
+        versions.append(version)
+    return versions
+
+
+def bump_versions(keys, alias='default'):
+    """Move every key to a new version."""
+    cache = caches[alias]
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), None)
+
+
+def invalidate_versions(keys, alias='default'):
+    """
+    Bump versions now and again once the surrounding transaction commits,
+    so an entry cached by a concurrent reader between the write and the
+    commit cannot outlive the commit.
+    """
+    keys = list(keys)
+    bump_versions(keys, alias)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: bump_versions(keys, alias))
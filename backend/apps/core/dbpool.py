@@ -0,0 +1,309 @@
+"""
+In-process database connection pool.
+
+Each process keeps one ``ConnectionPool`` per database alias, holding at
+most ``max_size`` open connections shared by all of its threads. Django's
+database wrapper checks a connection out when a request first queries and
+hands it back when the request ends (``CONN_MAX_AGE = 0``), so a threaded
+gunicorn worker needs as many connections as it has requests querying at
+once, not one per thread. A request that finds every connection in use
+waits up to ``timeout`` seconds, then fails with ``PoolTimeout``.
+
+Idle connections are closed after ``max_idle`` seconds and any connection
+after ``max_lifetime`` seconds. With ``CONN_HEALTH_CHECKS`` an idle
+connection is pinged before it is handed out, and replaced if the server
+dropped it. Pool sizes, waits and timeouts are exported by
+``apps.core.metrics``.
+
+Enable it with the ``apps.core.backends.postgresql`` engine and an
+``OPTIONS['pool']`` dict of limits (see ``apps.core.dburl``).
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import closing
+
+from django.db.utils import OperationalError
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'max_size': 10,
+    'timeout': 10.0,
+    'max_idle': 300.0,
+    'max_lifetime': 3600.0,
+}
+
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+class PoolTimeout(OperationalError):
+    """No pooled connection became available within the pool timeout."""
+
+
+def ping(connection):
+    """Return whether a DB-API ``connection`` still answers a query."""
+    try:
+        with closing(connection.cursor()) as cursor:
+            cursor.execute('SELECT 1')
+        return True
+    except Exception:
+        return False
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        logger.warning('Could not close a pooled database connection', exc_info=True)
+
+
+class ConnectionPool:
+    """
+    A bounded set of DB-API connections shared by the threads of a process.
+    """
+
+    def __init__(self, alias, max_size=DEFAULTS['max_size'], timeout=DEFAULTS['timeout'],
+                 max_idle=DEFAULTS['max_idle'], max_lifetime=DEFAULTS['max_lifetime'], check=None):
+        if max_size < 1:
+            raise ValueError('The pool max_size must be at least 1.')
+        self.alias = alias
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check = check
+        self.condition = threading.Condition()
+        # (connection, opened_at, released_at), most recently released last
+        self.idle = deque()
+        # id(connection) -> opened_at of checked out connections
+        self.checked_out = {}
+        self.size = 0
+        self.closed = False
+
+    def stats(self):
+        """Return ``{'idle', 'in_use', 'max_size'}``."""
+        with self.condition:
+            return {'idle': len(self.idle), 'in_use': len(self.checked_out), 'max_size': self.max_size}
+
+    def _expired(self, opened_at, released_at, now):
+        return now - released_at > self.max_idle or now - opened_at > self.max_lifetime
+
+    def _take_idle(self, now, discard):
+        """
+        Pop the most recently used idle connection still within its limits,
+        moving expired ones to ``discard``. Call with the lock held.
+        """
+        while self.idle and self._expired(self.idle[0][1], self.idle[0][2], now):
+            discard.append(self.idle.popleft()[0])
+        while self.idle:
+            connection, opened_at, released_at = self.idle.pop()
+            if not self._expired(opened_at, released_at, now):
+                return connection, opened_at
+            discard.append(connection)
+        return None
+
+    def acquire(self, connect):
+        """
+        Check out a connection, opening one with ``connect()`` while the
+        pool is below ``max_size``.
+
+        Raises:
+            PoolTimeout: when no connection became free within ``timeout``
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+        while True:
+            discard = []
+            with self.condition:
+                while True:
+                    taken = self._take_idle(time.monotonic(), discard)
+                    self.size -= len(discard)
+                    if taken is not None or self.size < self.max_size:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._record_timeout()
+                        raise PoolTimeout(
+                            f'No connection to database {self.alias!r} became available within '
+                            f'{self.timeout:g}s ({self.max_size} in use).'
+                        )
+                    self.condition.wait(remaining)
+                if taken is None:
+                    # Reserve the slot before connecting outside the lock
+                    self.size += 1
+            for connection in discard:
+                _close_quietly(connection)
+
+            if taken is None:
+                try:
+                    connection = connect()
+                except BaseException:
+                    self._forget()
+                    raise
+                opened_at = time.monotonic()
+                self._record_open()
+            else:
+                connection, opened_at = taken
+                if self.check is not None and not self.check(connection):
+                    logger.info('Replacing a broken pooled connection to database %r', self.alias)
+                    self._forget()
+                    _close_quietly(connection)
+                    continue
+
+            with self.condition:
+                self.checked_out[id(connection)] = opened_at
+            self._record_wait(time.monotonic() - started)
+            return connection
+
+    def release(self, connection, reusable=True):
+        """
+        Hand a checked out connection back, closing it instead when it is
+        not ``reusable``, past ``max_lifetime`` or the pool is closed.
+        """
+        now = time.monotonic()
+        with self.condition:
+            opened_at = self.checked_out.pop(id(connection), None)
+            keep = (
+                reusable and opened_at is not None and not self.closed
+                and now - opened_at <= self.max_lifetime
+            )
+            if keep:
+                self.idle.append((connection, opened_at, now))
+            elif opened_at is not None:
+                self.size -= 1
+            self.condition.notify()
+        if not keep:
+            _close_quietly(connection)
+
+    def _forget(self):
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+    def close(self):
+        """Close the idle connections; checked out ones close on release."""
+        with self.condition:
+            self.closed = True
+            idle = [connection for connection, _, _ in self.idle]
+            self.idle.clear()
+            self.size -= len(idle)
+            self.condition.notify_all()
+        for connection in idle:
+            _close_quietly(connection)
+
+    def _record_open(self):
+        if metrics.get_setting('ENABLED'):
+            metrics.get_registry().inc('db_pool_connections_opened_total', {'alias': self.alias})
+
+    def _record_wait(self, seconds):
+        if metrics.get_setting('ENABLED'):
+            metrics.get_registry().observe('db_pool_wait_seconds', {'alias': self.alias}, seconds, WAIT_BUCKETS)
+
+    def _record_timeout(self):
+        if metrics.get_setting('ENABLED'):
+            metrics.get_registry().inc('db_pool_timeouts_total', {'alias': self.alias})
+
+
+_pools = {}
+_pools_pid = None
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, options, check=None):
+    """
+    Return the pool of ``alias`` in the current process, created from the
+    ``OPTIONS['pool']`` limits on first use. A forked process starts with
+    no pools rather than sharing its parent's connections.
+    """
+    global _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            _pools.clear()
+            _pools_pid = os.getpid()
+        pool = _pools.get(alias)
+        if pool is None:
+            limits = {name: options.get(name, default) for name, default in DEFAULTS.items()}
+            pool = _pools[alias] = ConnectionPool(alias, check=check, **limits)
+        return pool
+
+
+def close_pools():
+    """Close and forget every pool of the current process."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+@metrics.register_collector
+def collect_pool_metrics(registry):
+    """Export the connection counts of every pool as gauges."""
+    with _pools_lock:
+        pools = list(_pools.values()) if _pools_pid == os.getpid() else []
+    for pool in pools:
+        stats = pool.stats()
+        registry.set('db_pool_connections', {'alias': pool.alias, 'state': 'idle'}, stats['idle'])
+        registry.set('db_pool_connections', {'alias': pool.alias, 'state': 'in_use'}, stats['in_use'])
+        registry.set('db_pool_max_connections', {'alias': pool.alias}, stats['max_size'])
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    ``DatabaseWrapper`` mixin checking connections out of the pool of the
+    alias when ``OPTIONS['pool']`` is set, and handing them back on close.
+    """
+    # Pool the current connection was checked out of
+    connection_pool = None
+
+    def get_pool(self):
+        options = self.settings_dict['OPTIONS'].get('pool')
+        if not options:
+            return None
+        check = ping if self.settings_dict['CONN_HEALTH_CHECKS'] else None
+        return get_pool(self.alias, options, check)
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def prepare_pooled_connection(self):
+        """
+        Set up the wrapper state ``get_new_connection()`` sets when it
+        opens a connection, for connections taken from the pool.
+        """
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool()
+        connect = super().get_new_connection
+        if pool is None:
+            return connect(conn_params)
+        self.prepare_pooled_connection()
+        connection = pool.acquire(lambda: connect(conn_params))
+        self.connection_pool = pool
+        return connection
+
+    def is_pooled_connection_reusable(self):
+        """
+        Roll back whatever the connection left open and return whether it
+        can serve another request.
+        """
+        if self.in_atomic_block:
+            return False
+        try:
+            self.connection.rollback()
+        except self.Database.Error:
+            return False
+        return not self.errors_occurred or self.is_usable()
+
+    def _close(self):
+        pool, self.connection_pool = self.connection_pool, None
+        if pool is None or self.connection is None:
+            return super()._close()
+        pool.release(self.connection, self.is_pooled_connection_reusable())
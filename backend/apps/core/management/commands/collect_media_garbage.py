@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.storage import collect_garbage
+
+
+class Command(BaseCommand):
+    """
+    Remove content-addressed media files nothing refers to.
+    """
+    help = 'Delete unreferenced content-addressed media files and correct stored reference counts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age',
+            type=float,
+            default=24,
+            help='Keep files modified within this many hours, which may belong to uploads in progress.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report what would be deleted or corrected.',
+        )
+
+    def handle(self, *args, **options):
+        if options['min_age'] < 0:
+            raise CommandError('--min-age cannot be negative.')
+
+        deleted, freed, corrected = collect_garbage(
+            min_age=options['min_age'] * 3600, dry_run=options['dry_run']
+        )
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {deleted} unreferenced file(s) ({freed} bytes); '
+            f'{corrected} reference count(s) out of date.'
+        ))
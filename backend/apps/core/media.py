@@ -0,0 +1,177 @@
+"""
+Protected delivery of uploaded media.
+
+Every file under ``MEDIA_URL`` is served by ``apps.core.views.serve_media``:
+Django decides whether the requesting user may see it, then hands the
+transfer to the front proxy with ``X-Accel-Redirect`` (nginx) or
+``X-Sendfile`` (Apache, lighttpd), so no worker streams image bytes. The
+proxy also answers ``Range`` requests. The ``django`` backend streams the
+file from Python instead, including single byte ranges, for development
+and tests.
+
+Apps declare who may see their files with ``register_media_access``.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import (
+    FileResponse, HttpResponse, HttpResponseNotFound, HttpResponseNotModified, StreamingHttpResponse
+)
+from django.utils.http import http_date, parse_http_date_safe
+
+from .streaming import is_asgi_request, stream_content
+
+DEFAULTS = {
+    'BACKEND': 'django',
+    'INTERNAL_URL': '/protected-media/',
+    # Cache-Control of files readable by everyone; names are content hashes
+    'PUBLIC_MAX_AGE': 31536000,
+}
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_access_checks = []
+
+
+def get_setting(name):
+    """Read a ``MEDIA_DELIVERY`` setting, falling back to the defaults."""
+    return getattr(settings, 'MEDIA_DELIVERY', {}).get(name, DEFAULTS[name])
+
+
+def register_media_access(check):
+    """
+    Register ``check(user, name)`` deciding who may read the stored file
+    ``name``; ``user`` may be anonymous.
+
+    It returns ``'public'`` when anyone may read the file, ``'private'``
+    when ``user`` may but others may not, False when ``user`` may not, and
+    None when the app does not reference the file.
+    """
+    if check not in _access_checks:
+        _access_checks.append(check)
+    return check
+
+
+def get_access(user, name):
+    """
+    Return ``'public'``, ``'private'`` or None (not visible to ``user``,
+    or not referenced at all) for the stored file ``name``.
+    """
+    access = None
+    for check in _access_checks:
+        result = check(user, name)
+        if result == 'public':
+            return result
+        if result == 'private':
+            access = result
+    return access
+
+
+def parse_range(header, size):
+    """
+    Parse a single ``bytes=`` range against a file of ``size`` bytes.
+
+    Returns:
+        ``(start, end)`` with ``end`` inclusive, None when the header should
+        be ignored (absent, malformed or several ranges), or False when the
+        range cannot be satisfied
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        return False
+    if end < start:
+        return None
+    return start, end
+
+
+def _iter_range(path, start, length):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def _stream(request, path, stat, content_type):
+    byte_range = parse_range(request.META.get('HTTP_RANGE'), stat.st_size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+        if is_asgi_request(request):
+            # Keeps the headers FileResponse derived from the file
+            response.streaming_content = stream_content(request, response.streaming_content)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            stream_content(request, _iter_range(path, start, length)), status=206, content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = str(length)
+    return response
+
+
+def media_response(request, storage, name, access):
+    """
+    Build the response delivering the stored file ``name``, or a 404
+    response if it does not exist.
+
+    Raises:
+        ImproperlyConfigured: for an unknown ``MEDIA_DELIVERY['BACKEND']``
+    """
+    path = storage.path(name)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return HttpResponseNotFound('Media file not found.')
+
+    backend = get_setting('BACKEND')
+    last_modified = http_date(stat.st_mtime)
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+
+    if modified_since is not None and int(stat.st_mtime) <= modified_since:
+        response = HttpResponseNotModified()
+    elif backend == 'nginx':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = get_setting('INTERNAL_URL') + quote(name)
+    elif backend == 'sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+    elif backend == 'django':
+        response = _stream(request, path, stat, content_type)
+    else:
+        raise ImproperlyConfigured(f"Unknown MEDIA_DELIVERY backend {backend!r}.")
+
+    response['Last-Modified'] = last_modified
+    response['Accept-Ranges'] = 'bytes'
+    if access == 'public':
+        response['Cache-Control'] = f"public, max-age={get_setting('PUBLIC_MAX_AGE')}"
+    else:
+        response['Cache-Control'] = 'private, no-cache'
+        response['Vary'] = 'Authorization, Cookie'
+    return response
@@ -0,0 +1,275 @@
+"""
+Process-local request metrics with Prometheus text exposition.
+
+Every process aggregates counters and histograms in memory under a single
+lock, which costs a few dictionary updates per request. When
+``METRICS['DIR']`` is set (required with several gunicorn workers), each
+process periodically writes a snapshot of its totals to its own file in that
+directory and the metrics endpoint sums the files of all processes, the same
+layout ``prometheus_client`` uses for multiprocess mode. Wipe the directory
+when deploying.
+
+Gauges describe the current state of a process (e.g. its database pool) and
+are refreshed by the collectors registered with ``register_collector`` just
+before each snapshot; the endpoint sums them over the processes still
+running (files of exited workers keep contributing their counters only).
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'DIR': '',
+    'FLUSH_INTERVAL': 5,
+    'TOKEN': '',
+    'PUBLIC': False,
+}
+
+# name -> (type, help)
+METRICS = {
+    'http_requests_total': ('counter', 'Requests by view, method and status code.'),
+    'http_request_duration_seconds': ('histogram', 'Request latency by view and method.'),
+    'db_queries_total': ('counter', 'Database queries executed by view.'),
+    'db_query_duration_seconds_total': ('counter', 'Time spent in database queries by view.'),
+    'cache_requests_total': ('counter', 'Cache lookups by cache and result (hit or miss).'),
+    'db_pool_connections': ('gauge', 'Open pooled database connections by alias and state (idle or in_use).'),
+    'db_pool_max_connections': ('gauge', 'Pooled database connection limit by alias.'),
+    'db_pool_wait_seconds': ('histogram', 'Time spent waiting for a pooled database connection by alias.'),
+    'db_pool_timeouts_total': ('counter', 'Pooled connection requests that timed out by alias.'),
+    'db_pool_connections_opened_total': ('counter', 'Database connections opened by the pool by alias.'),
+    'db_read_requests_total': ('counter', 'Safe-method requests by the database alias serving their reads.'),
+    'db_replica_stale_total': ('counter', 'Requests that skipped a stale replica by alias.'),
+}
+
+_collectors = []
+
+
+def get_setting(name):
+    """Read a ``METRICS`` setting, falling back to the defaults."""
+    return getattr(settings, 'METRICS', {}).get(name, DEFAULTS[name])
+
+
+class Registry:
+    """
+    Counters and histograms of one process, keyed by metric name and a
+    sorted tuple of label pairs.
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.process_id = f'{self.pid}-{uuid.uuid4().hex[:8]}'
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self.gauges = {}
+        self.last_flush = 0.0
+
+    def inc(self, name, labels, amount=1):
+        """Increment a counter."""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] += amount
+
+    def set(self, name, labels, value):
+        """Set a gauge."""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.gauges[key] = value
+
+    def observe(self, name, labels, value, buckets=DEFAULT_BUCKETS):
+        """Record a histogram observation."""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {
+                    'buckets': list(buckets),
+                    'counts': [0] * len(buckets),
+                    'sum': 0.0,
+                    'count': 0,
+                }
+            for index, bound in enumerate(histogram['buckets']):
+                if value <= bound:
+                    histogram['counts'][index] += 1
+                    break
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def snapshot(self):
+        """Return a JSON-serializable copy of the current totals."""
+        for collector in _collectors:
+            collector(self)
+        with self.lock:
+            return {
+                'pid': self.pid,
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'gauges': [[name, list(labels), value] for (name, labels), value in self.gauges.items()],
+                'histograms': [
+                    [name, list(labels), dict(histogram, counts=list(histogram['counts']))]
+                    for (name, labels), histogram in self.histograms.items()
+                ],
+            }
+
+    def flush(self, directory):
+        """Atomically write the snapshot of this process to ``directory``."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{self.process_id}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as handle:
+            json.dump(self.snapshot(), handle)
+        os.replace(tmp_path, path)
+        self.last_flush = time.monotonic()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """
+    Return the registry of the current process. A process forked from a
+    parent that already had one (gunicorn ``--preload``) starts empty.
+    """
+    global _registry
+    if _registry is None or _registry.pid != os.getpid():
+        with _registry_lock:
+            if _registry is None or _registry.pid != os.getpid():
+                _registry = Registry()
+    return _registry
+
+
+def record_request(view, method, status_code, duration, db_queries, db_time):
+    """Record a finished request."""
+    registry = get_registry()
+    registry.inc('http_requests_total', {'view': view, 'method': method, 'status': str(status_code)})
+    registry.observe('http_request_duration_seconds', {'view': view, 'method': method}, duration)
+    if db_queries:
+        registry.inc('db_queries_total', {'view': view}, db_queries)
+        registry.inc('db_query_duration_seconds_total', {'view': view}, db_time)
+
+    directory = get_setting('DIR')
+    if directory and time.monotonic() - registry.last_flush >= get_setting('FLUSH_INTERVAL'):
+        registry.flush(directory)
+
+
+def register_collector(collector):
+    """
+    Register ``collector(registry)``, called before every snapshot to
+    ``set()`` the gauges it owns.
+    """
+    if collector not in _collectors:
+        _collectors.append(collector)
+    return collector
+
+
+def record_cache_access(cache, hit):
+    """Record a cache lookup so hit ratios can be derived."""
+    if get_setting('ENABLED'):
+        get_registry().inc('cache_requests_total', {'cache': cache, 'result': 'hit' if hit else 'miss'})
+
+
+def is_process_alive(pid):
+    """Return whether a process with ``pid`` is running on this host."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_snapshots(snapshots):
+    """
+    Sum the snapshots of several processes into one. Gauges describe the
+    current state of a process, so those of exited processes are dropped.
+    """
+    counters = defaultdict(float)
+    histograms = {}
+    for snapshot in snapshots:
+        gauges = snapshot.get('gauges', [])
+        if gauges and snapshot.get('pid') is not None and not is_process_alive(snapshot['pid']):
+            gauges = []
+        for name, labels, value in snapshot['counters'] + gauges:
+            counters[(name, tuple(map(tuple, labels)))] += value
+        for name, labels, histogram in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.get(key)
+            if merged is None or merged['buckets'] != histogram['buckets']:
+                histograms[key] = dict(histogram, counts=list(histogram['counts']))
+                continue
+            merged['counts'] = [a + b for a, b in zip(merged['counts'], histogram['counts'])]
+            merged['sum'] += histogram['sum']
+            merged['count'] += histogram['count']
+    return counters, histograms
+
+
+def collect():
+    """
+    Return the merged totals of every process: ``(counters, histograms)``.
+    """
+    registry = get_registry()
+    directory = get_setting('DIR')
+    if not directory:
+        return merge_snapshots([registry.snapshot()])
+
+    registry.flush(directory)
+    snapshots = []
+    for filename in os.listdir(directory):
+        if not filename.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, filename)) as handle:
+                snapshots.append(json.load(handle))
+        except (OSError, ValueError):
+            # Removed or replaced while reading; picked up on the next scrape
+            continue
+    return merge_snapshots(snapshots)
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def render():
+    """Render all metrics in the Prometheus text exposition format."""
+    counters, histograms = collect()
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'histogram':
+            for (metric, labels), histogram in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(histogram['buckets'], histogram['counts']):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_format_labels(labels, [("le", bound)])} {cumulative}')
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {histogram["count"]}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(histogram["sum"])}')
+                lines.append(f'{name}_count{_format_labels(labels)} {histogram["count"]}')
+        else:
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
@@ -1,50 +1,162 @@
 import time
 import logging
+from contextlib import ExitStack
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.conf import settings
+from django.db import connections
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.authentication import get_authorization_header
-from apps.authentication.jwt_utils import get_user_from_token, is_token_valid
+from apps.authentication.authentication import authenticate_request
+from apps.core import metrics, replicas
 
 logger = logging.getLogger(__name__)
 
 class JWTAuthenticationMiddleware:
     """
     JWT Authentication Middleware for DRF compatibility.
+
+    Sync and async capable; under ASGI the token is checked in a thread,
+    since loading the user may query the database.
     """
+    sync_capable = True
+    async_capable = True
 
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        # Only handle API endpoints
-        if request.path.startswith('/api/'):
-            # Get the authorization header
-            auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-
-            if auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
-
-                try:
-                    # Get user from token
-                    from apps.authentication.jwt_utils import get_user_from_token
-                    user = get_user_from_token(token)
-
-                    if user:
-                        # Set the user on the request
-                        request.user = user
-                        print(f"🔐 JWT Authentication successful for user: {user.email}")
-                    else:
-                        print("⚠️ JWT Authentication failed: No user found")
-
-                except Exception as e:
-                    print(f"❌ JWT Authentication error: {str(e)}")
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.authenticate(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        await sync_to_async(self.authenticate)(request)
+        return await self.get_response(request)
+
+    def authenticate(self, request):
+        # Only handle API endpoints and media downloads
+        if request.path.startswith(('/api/', settings.MEDIA_URL)):
+            # Decoded once per request; JWTAuthentication reuses the result
+            result = authenticate_request(request)
+
+            if result is not None:
+                if result.user and result.user.is_active:
+                    request.user = result.user
+                    logger.debug("JWT authentication successful for user %s", result.user.pk)
+                else:
                     # Don't set user, let it remain anonymous
-                    pass
+                    logger.debug("JWT authentication failed: %s", result.error or 'user inactive')
 
-        return self.get_response(request)
+class MetricsMiddleware:
+    """
+    Record latency, status and database usage of every request per view.
+
+    Sync and async capable. Database connections belong to the thread
+    running a request's synchronous code, so under ASGI the query
+    counters are installed and removed there.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not metrics.get_setting('ENABLED'):
+            return self.get_response(request)
+
+        db_usage = {'queries': 0, 'time': 0.0}
+        started = time.perf_counter()
+        with self.count_queries(db_usage):
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - started, db_usage)
+        return response
+
+    async def __acall__(self, request):
+        if not metrics.get_setting('ENABLED'):
+            return await self.get_response(request)
+
+        db_usage = {'queries': 0, 'time': 0.0}
+        started = time.perf_counter()
+        stack = await sync_to_async(self.count_queries)(db_usage)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        self.record(request, response, time.perf_counter() - started, db_usage)
+        return response
+
+    def count_queries(self, db_usage):
+        """
+        Return an ``ExitStack`` adding the queries run on this thread's
+        connections to ``db_usage`` until it is closed.
+        """
+        def record_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                db_usage['queries'] += 1
+                db_usage['time'] += time.perf_counter() - started
+
+        stack = ExitStack()
+        for db_connection in connections.all():
+            stack.enter_context(db_connection.execute_wrapper(record_query))
+        return stack
+
+    def record(self, request, response, duration, db_usage):
+        resolver_match = getattr(request, 'resolver_match', None)
+        view = resolver_match.view_name if resolver_match else 'unmatched'
+        metrics.record_request(
+            view, request.method, response.status_code, duration,
+            db_usage['queries'], db_usage['time'],
+        )
+
+class ReplicaRoutingMiddleware:
+    """
+    Serve the reads of safe-method requests from a fresh read replica and
+    pin users who wrote to the primary (see ``apps.core.replicas``).
+
+    Sync and async capable. Runs after authentication so pinned users are
+    recognized.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        routing = replicas.route(request)
+        token = replicas.activate(routing)
+        try:
+            return self.get_response(request)
+        finally:
+            replicas.deactivate(token)
+            replicas.finish(routing, request)
+
+    async def __acall__(self, request):
+        routing = await sync_to_async(replicas.route)(request)
+        token = replicas.activate(routing)
+        try:
+            return await self.get_response(request)
+        finally:
+            replicas.deactivate(token)
+            await sync_to_async(replicas.finish)(routing, request)
 
 class RequestLoggingMiddleware(MiddlewareMixin):
     """
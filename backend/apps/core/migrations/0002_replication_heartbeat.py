@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReplicationHeartbeat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("beat_at", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "Replication Heartbeat",
+                "verbose_name_plural": "Replication Heartbeats",
+            },
+        ),
+    ]
@@ -11,3 +11,36 @@ class BaseModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class StoredFile(models.Model):
+    """
+    A file kept once in content-addressed media storage, with the number of
+    saves referencing it (see ``apps.core.storage``).
+    """
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Stored File'
+        verbose_name_plural = 'Stored Files'
+
+    def __str__(self):
+        return f'{self.name} ({self.ref_count})'
+
+
+class ReplicationHeartbeat(models.Model):
+    """
+    Single row stamped on the primary database and read back from each
+    replica to measure its replication lag (see ``apps.core.replicas``).
+    """
+    beat_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Replication Heartbeat'
+        verbose_name_plural = 'Replication Heartbeats'
+
+    def __str__(self):
+        return self.beat_at.isoformat()
@@ -0,0 +1,34 @@
+"""
+JSON parser built on orjson, the counterpart of ``ORJSONRenderer``.
+"""
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from apps.core.renderers import ORJSONRenderer
+
+
+class ORJSONParser(JSONParser):
+    """
+    Parses JSON-serialized data with orjson.
+
+    orjson is always strict: ``NaN`` and ``Infinity`` are rejected, as they
+    are by ``JSONParser`` under the default ``STRICT_JSON`` setting.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Parses the incoming bytestream as JSON and returns the resulting data.
+        """
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            body = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except (ValueError, LookupError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,51 @@
+"""
+JSON renderer built on orjson.
+
+``ORJSONRenderer`` produces the same bytes as DRF's ``JSONRenderer`` with
+the default ``COMPACT_JSON`` and ``UNICODE_JSON`` settings: compact
+separators, raw UTF-8, ``Z`` for UTC datetimes and escaped U+2028/U+2029.
+Types orjson does not handle natively (``Decimal``, lazy translation
+strings, querysets, ...) are converted by DRF's own encoder, so they render
+exactly as before.
+
+Requests for indented output (the browsable API, ``; indent=4``) and data
+orjson rejects, such as integers wider than 64 bits, fall back to the
+standard library encoder. The remaining differences only concern floats,
+which no endpoint renders: exponents are spelled ``1e16`` instead of
+``1e+16`` and non-finite values render as ``null`` instead of raising.
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+_default = encoders.JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renderer which serializes to JSON with orjson.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render `data` into JSON, returning a bytestring.
+        """
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if indent is not None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Keep the output a strict javascript subset, as JSONRenderer does
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,193 @@
+"""
+Read-replica routing.
+
+``ReplicaRoutingMiddleware`` picks the database serving the reads of each
+request and ``ReplicaRouter`` applies it: safe-method requests (GET, HEAD,
+OPTIONS) read from a random fresh replica listed in
+``DATABASE_REPLICAS['ALIASES']``, everything else uses the primary
+(``default``). Writes always go to the primary; a write during a
+replica-routed request moves the rest of that request to the primary.
+
+A user who wrote is pinned to the primary for ``PIN_SECONDS`` so their
+next reads (``my_posts`` right after ``create``) see the write.
+
+Replica lag is read off ``ReplicationHeartbeat``: every ``CHECK_INTERVAL``
+each process stamps the row on the primary and reads it back from every
+replica. A replica is stale, and skipped, when its copy is older than
+``MAX_LAG`` seconds; other users may read data up to that old after a
+write. Pins are kept in the default cache, which must be shared by all
+workers (Redis) for them to hold across processes.
+"""
+import logging
+import math
+import random
+import threading
+import time
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+from django.utils import timezone
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ALIASES': [],
+    'PIN_SECONDS': 5,
+    'MAX_LAG': 5,
+    'CHECK_INTERVAL': 1,
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Routing of the request being handled, set by ReplicaRoutingMiddleware
+_routing = ContextVar('replica_routing', default=None)
+
+# alias -> (checked_at, replica heartbeat timestamp or None), per process
+_status = {}
+_status_lock = threading.Lock()
+
+
+def get_setting(name):
+    """Read a ``DATABASE_REPLICAS`` setting, falling back to the defaults."""
+    return getattr(settings, 'DATABASE_REPLICAS', {}).get(name, DEFAULTS[name])
+
+
+def _pin_key(user_pk):
+    return f'replicas:pin:{user_pk}'
+
+
+class Routing:
+    """
+    Database choice of one request: ``alias`` serves its reads (None for
+    the primary) and ``wrote`` tells whether it wrote to the primary.
+    """
+
+    def __init__(self, alias=None):
+        self.alias = alias
+        self.wrote = False
+
+
+def _beat(alias, interval):
+    """
+    Stamp the heartbeat on the primary if it is older than ``interval``
+    and return the heartbeat timestamp of ``alias``, or None.
+    """
+    from .models import ReplicationHeartbeat
+
+    primary = ReplicationHeartbeat.objects.using(DEFAULT_DB_ALIAS)
+    if not primary.filter(pk=1, beat_at__gte=timezone.now() - timedelta(seconds=interval)).exists():
+        primary.update_or_create(pk=1, defaults={'beat_at': timezone.now()})
+    beat_at = ReplicationHeartbeat.objects.using(alias).filter(pk=1).values_list('beat_at', flat=True).first()
+    return beat_at.timestamp() if beat_at else None
+
+
+def get_heartbeat(alias):
+    """
+    Return the heartbeat timestamp last read from replica ``alias``,
+    refreshing it every ``CHECK_INTERVAL`` seconds. None when the replica
+    has no heartbeat or cannot be reached.
+    """
+    interval = get_setting('CHECK_INTERVAL')
+    now = time.time()
+    with _status_lock:
+        checked_at, heartbeat = _status.get(alias, (None, None))
+    if checked_at is not None and now - checked_at < interval:
+        return heartbeat
+
+    try:
+        heartbeat = _beat(alias, interval)
+    except DatabaseError:
+        logger.warning('Could not read the replication heartbeat of database %r', alias, exc_info=True)
+        heartbeat = None
+    with _status_lock:
+        _status[alias] = (now, heartbeat)
+    return heartbeat
+
+
+def get_fresh_replicas():
+    """Return the replica aliases within ``MAX_LAG`` seconds of now."""
+    now = time.time()
+    fresh = []
+    for alias in get_setting('ALIASES'):
+        heartbeat = get_heartbeat(alias)
+        if heartbeat is not None and now - heartbeat <= get_setting('MAX_LAG'):
+            fresh.append(alias)
+        elif metrics.get_setting('ENABLED'):
+            metrics.get_registry().inc('db_replica_stale_total', {'alias': alias})
+    return fresh
+
+
+def route(request):
+    """
+    Return the ``Routing`` of a request: a fresh replica for safe methods
+    unless the user is pinned to the primary, the primary otherwise.
+    """
+    aliases = get_setting('ALIASES')
+    if not aliases or request.method not in SAFE_METHODS:
+        return Routing()
+
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and cache.get(_pin_key(user.pk)):
+        return Routing()
+
+    fresh = get_fresh_replicas()
+    return Routing(random.choice(fresh) if fresh else None)
+
+
+def get_read_alias():
+    """Return the replica serving the reads of the current request, or None."""
+    routing = _routing.get()
+    return routing.alias if routing is not None else None
+
+
+def finish(routing, request):
+    """
+    Record a request that wrote: pin its user to the primary.
+    """
+    if metrics.get_setting('ENABLED') and get_setting('ALIASES') and request.method in SAFE_METHODS:
+        metrics.get_registry().inc('db_read_requests_total', {'alias': routing.alias or DEFAULT_DB_ALIAS})
+    if not routing.wrote or not get_setting('ALIASES'):
+        return
+
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        cache.set(_pin_key(user.pk), True, math.ceil(get_setting('PIN_SECONDS')))
+
+
+def activate(routing):
+    """Apply ``routing`` to the current context; returns a reset token."""
+    return _routing.set(routing)
+
+
+def deactivate(token):
+    _routing.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Send reads to the replica chosen for the current request and writes to
+    the primary. Outside requests everything uses the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        return routing.alias if routing is not None else None
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None:
+            # Later reads of this request must see the write
+            routing.alias = None
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_setting('ALIASES')}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
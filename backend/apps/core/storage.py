@@ -0,0 +1,275 @@
+"""
+Content-addressed media storage.
+
+Uploads are hashed with SHA-256 while they are streamed to a temporary file
+in chunks, then moved to ``ab/cd/<sha256>.<ext>`` under ``MEDIA_ROOT``. The
+two levels of shard directories keep every directory small, and a file
+uploaded again (by anyone, to any field using this storage) is stored only
+once.
+
+``StoredFile`` rows count the saves referencing each file: ``save()``
+increments the count and ``delete()`` decrements it, removing the file once
+nothing refers to it. Saves take the row lock before checking whether the
+file exists, and the file is only removed under that lock, so a save
+racing the removal of the same content either keeps the file or writes it
+again. Files left behind by rolled-back transactions or by rows deleted
+without ``delete()`` are removed by ``collect_media_garbage``, which
+recounts references from the database. Files stored before this backend
+was introduced keep their names and are never deleted by it.
+"""
+import hashlib
+import os
+import re
+import tempfile
+import time
+from collections import Counter
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+# Temporary files of uploads still being hashed
+INCOMING_DIR = '.incoming'
+
+CONTENT_NAME_RE = re.compile(r'^([0-9a-f]{2})/([0-9a-f]{2})/([0-9a-f]{64})(\.[a-z0-9]+)?$')
+
+_reference_providers = []
+
+
+def get_content_name(digest, extension):
+    """Return the sharded storage name of a file with SHA-256 ``digest``."""
+    return f'{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+def is_content_name(name):
+    """Return whether ``name`` follows the content-addressed layout."""
+    match = CONTENT_NAME_RE.match(name or '')
+    return bool(match) and match.group(3).startswith(match.group(1) + match.group(2))
+
+
+def _extension(name):
+    extension = os.path.splitext(name)[1].lower()
+    return extension if re.fullmatch(r'\.[a-z0-9]+', extension) else ''
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage naming files after the SHA-256 of their content.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is only known once the content has been hashed
+        return name
+
+    def _save(self, name, content):
+        incoming = self.path(INCOMING_DIR)
+        os.makedirs(incoming, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+
+        fd, temporary = tempfile.mkstemp(dir=incoming)
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    handle.write(chunk)
+                    size += len(chunk)
+
+            name = get_content_name(digest.hexdigest(), _extension(name))
+            full_path = self.path(name)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with transaction.atomic():
+                # Holds the row lock until commit, so the file cannot be
+                # removed between this check and the reference becoming visible
+                self._add_reference(name, size)
+                if os.path.exists(full_path):
+                    os.remove(temporary)
+                    # A fresh mtime keeps the garbage collector off a file
+                    # that is about to be referenced again
+                    os.utime(full_path)
+                else:
+                    if self.file_permissions_mode is not None:
+                        os.chmod(temporary, self.file_permissions_mode)
+                    os.replace(temporary, full_path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        return name
+
+    def _add_reference(self, name, size):
+        from .models import StoredFile
+
+        if StoredFile.objects.filter(name=name).update(ref_count=F('ref_count') + 1):
+            return
+        try:
+            with transaction.atomic():
+                StoredFile.objects.create(name=name, size=size, ref_count=1)
+        except IntegrityError:
+            StoredFile.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+
+    def delete(self, name):
+        """
+        Drop one reference to ``name``; the file is removed after the
+        transaction commits once no reference is left. Files not tracked
+        by this storage are left alone.
+        """
+        from .models import StoredFile
+
+        with transaction.atomic():
+            stored = StoredFile.objects.select_for_update().filter(name=name).first()
+            # A count of 0 means the removal is already pending
+            if stored is None or stored.ref_count == 0:
+                return
+            StoredFile.objects.filter(pk=stored.pk).update(ref_count=F('ref_count') - 1)
+            if stored.ref_count > 1:
+                return
+        transaction.on_commit(lambda: self._remove_unreferenced(name))
+
+    def _remove_unreferenced(self, name, ref_count=0):
+        """
+        Remove the file ``name`` and its row if the row still counts
+        ``ref_count`` references once locked, i.e. nothing saved the same
+        content since the count was read. Returns whether it was removed.
+        """
+        from .models import StoredFile
+
+        with transaction.atomic():
+            # A row to lock even when none was tracked; a concurrent save
+            # creating it waits for this transaction
+            StoredFile.objects.get_or_create(name=name, defaults={'ref_count': ref_count})
+            stored = StoredFile.objects.select_for_update().get(name=name)
+            if stored.ref_count != ref_count:
+                return False
+            stored.delete()
+            super().delete(name)
+        return True
+
+
+def _create_counted(name, ref_count, size):
+    """Create the row of ``name`` unless a save created it meanwhile."""
+    from .models import StoredFile
+
+    try:
+        with transaction.atomic():
+            StoredFile.objects.create(name=name, ref_count=ref_count, size=size)
+    except IntegrityError:
+        return False
+    return True
+
+
+_media_storage = None
+
+
+def get_media_storage():
+    """Return the shared content-addressed storage used by upload fields."""
+    global _media_storage
+    if _media_storage is None:
+        _media_storage = ContentAddressedStorage()
+    return _media_storage
+
+
+def register_references(provider):
+    """
+    Register a callable returning storage names referenced outside file
+    fields (e.g. names kept in JSON columns), so garbage collection keeps
+    them.
+    """
+    if provider not in _reference_providers:
+        _reference_providers.append(provider)
+    return provider
+
+
+def get_references():
+    """
+    Count the database references to content-addressed files: every
+    file field using ``ContentAddressedStorage`` plus the registered
+    providers.
+    """
+    references = Counter()
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField) and isinstance(field.storage, ContentAddressedStorage):
+                names = model._default_manager.exclude(**{field.attname: ''}).exclude(
+                    **{f'{field.attname}__isnull': True}
+                ).values_list(field.attname, flat=True)
+                references.update(name for name in names.iterator() if is_content_name(name))
+    for provider in _reference_providers:
+        references.update(name for name in provider() if is_content_name(name))
+    return references
+
+
+def iter_content_files(storage):
+    """Yield ``(name, size, mtime)`` for every content-addressed file."""
+    root = storage.path('')
+    for directory, subdirectories, filenames in os.walk(root):
+        relative = os.path.relpath(directory, root).replace(os.sep, '/')
+        if relative == '.':
+            subdirectories[:] = [name for name in subdirectories if re.fullmatch('[0-9a-f]{2}', name)]
+            continue
+        for filename in filenames:
+            name = f'{relative}/{filename}'
+            if is_content_name(name):
+                stat = os.stat(os.path.join(directory, filename))
+                yield name, stat.st_size, stat.st_mtime
+
+
+def collect_garbage(min_age=86400, dry_run=False, storage=None):
+    """
+    Delete content-addressed files no database row refers to and reset
+    reference counts to the references actually found.
+
+    Files modified less than ``min_age`` seconds ago are kept, since an
+    upload may not be committed yet. Counts are read before references are
+    collected, and files are deleted and counts reset only where the count
+    has not changed since, so saves committed during the run are never
+    undone. Stale temporary uploads are removed as well.
+
+    Returns:
+        ``(files_deleted, bytes_freed, counts_corrected)``
+    """
+    from .models import StoredFile
+
+    storage = storage or get_media_storage()
+    cutoff = time.time() - min_age
+    stored = dict(StoredFile.objects.values_list('name', 'ref_count'))
+    references = get_references()
+    deleted = freed = 0
+
+    for name, size, mtime in list(iter_content_files(storage)):
+        if references[name] or mtime > cutoff:
+            continue
+        if dry_run or storage._remove_unreferenced(name, stored.get(name, 0)):
+            deleted += 1
+            freed += size
+
+    corrected = 0
+    for name, count in references.items():
+        if stored.get(name) == count or not storage.exists(name):
+            continue
+        if name in stored:
+            changed = dry_run or StoredFile.objects.filter(
+                name=name, ref_count=stored[name]
+            ).update(ref_count=count)
+        else:
+            changed = dry_run or _create_counted(name, count, storage.size(name))
+        corrected += bool(changed)
+    for name, count in stored.items():
+        if references[name] or storage.exists(name):
+            continue
+        corrected += bool(dry_run or StoredFile.objects.filter(name=name, ref_count=count).delete()[0])
+
+    incoming = storage.path(INCOMING_DIR)
+    if not dry_run and os.path.isdir(incoming):
+        for filename in os.listdir(incoming):
+            path = os.path.join(incoming, filename)
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+    return deleted, freed, corrected
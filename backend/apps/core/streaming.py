@@ -0,0 +1,42 @@
+"""
+Streaming response bodies that stay streamed under ASGI.
+
+Under ASGI, Django 4.2 reads a synchronous ``StreamingHttpResponse``
+iterator with ``sync_to_async(list)``, so the whole body is built in memory
+before the first byte goes out. ``stream_content`` gives ASGI requests an
+async iterator instead, pulling one chunk at a time in the thread-sensitive
+sync thread so database cursors stay on the connection that opened them.
+WSGI requests keep the plain iterator.
+"""
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+_DONE = object()
+
+
+def is_asgi_request(request):
+    """Return whether a Django or DRF ``request`` is served over ASGI."""
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+async def aiterate(iterator):
+    """Yield the items of a synchronous ``iterator`` from the sync thread."""
+    iterator = iter(iterator)
+    try:
+        while True:
+            item = await sync_to_async(next)(iterator, _DONE)
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
+def stream_content(request, iterator):
+    """
+    Return ``iterator`` as the streaming content of a response to
+    ``request``: async under ASGI, unchanged under WSGI.
+    """
+    return aiterate(iterator) if is_asgi_request(request) else iterator
@@ -5,5 +5,6 @@ app_name = 'core'
 
 urlpatterns = [
     path('health/', views.health_check, name='health_check'),
+    path('metrics/', views.metrics_view, name='metrics'),
     path('info/', views.api_info, name='api_info'),
 ]
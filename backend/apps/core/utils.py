@@ -85,3 +85,11 @@ def generate_verification_token():
     """
     import secrets
     return secrets.token_urlsafe(32)
+
+
+def hash_token(token):
+    """
+    Return the SHA-256 digest stored in place of a one-time token.
+    """
+    import hashlib
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
@@ -1,8 +1,12 @@
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseNotFound, JsonResponse
+from django.utils.crypto import constant_time_compare
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 import json
 
+from . import media, metrics
+from .storage import INCOMING_DIR, get_media_storage
+
 
 @csrf_exempt
 @require_http_methods(["GET"])
@@ -17,6 +21,33 @@ def health_check(request):
     })
 
 
+def can_read_metrics(request):
+    """Return whether ``request`` may read the metrics endpoint."""
+    if metrics.get_setting('PUBLIC'):
+        return True
+    token = metrics.get_setting('TOKEN')
+    if token and constant_time_compare(request.META.get('HTTP_X_METRICS_TOKEN', ''), token):
+        return True
+    user = getattr(request, 'user', None)
+    return bool(user is not None and user.is_active and user.is_staff)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def metrics_view(request):
+    """
+    Request metrics in the Prometheus text exposition format.
+
+    Readable by staff users and, when ``METRICS_TOKEN`` is set, by scrapers
+    sending it in the ``X-Metrics-Token`` header. ``METRICS_PUBLIC`` opens
+    the endpoint to everyone.
+    """
+    if not can_read_metrics(request):
+        return JsonResponse({'error': 'Metrics are only available to staff or with the metrics token.'}, status=403)
+
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def api_info(request):
@@ -29,7 +60,25 @@ def api_info(request):
         'description': 'A full-stack blog application API',
         'endpoints': {
             'health': '/api/v1/health/',
+            'metrics': '/api/v1/metrics/',
             'auth': '/api/v1/auth/',
             'blog': '/api/v1/blog/',
         }
     })
+
+
+@require_http_methods(["GET", "HEAD"])
+def serve_media(request, name):
+    """
+    Serve an uploaded file to users allowed to see it.
+
+    The file itself is sent by the front proxy (see ``apps.core.media``);
+    files the user may not see, or no row refers to, are reported as
+    missing.
+    """
+    if name.startswith(f'{INCOMING_DIR}/'):
+        return HttpResponseNotFound('Media file not found.')
+    access = media.get_access(request.user, name)
+    if access is None:
+        return HttpResponseNotFound('Media file not found.')
+    return media.media_response(request, get_media_storage(), name, access)
@@ -0,0 +1,19 @@
+"""
+ASGI config for blog_project project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+The public read endpoints are served by their async variants unless
+``ASYNC_VIEWS`` is set to False.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blog_project.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+
+application = get_asgi_application()
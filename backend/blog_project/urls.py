@@ -19,6 +19,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.http import JsonResponse
+from apps.core.views import serve_media
 
 def root_view(request):
     """Root URL view that provides API information."""
@@ -42,9 +43,10 @@ urlpatterns = [
     path('api/v1/', include('apps.core.urls')),
     path('api/v1/auth/', include('apps.authentication.urls', namespace='auth')),
     path('api/v1/blog/', include('apps.blog.urls')),
+    # Uploaded media, checked here and sent by the front proxy in production
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:name>", serve_media, name='media'),
 ]
 
 # Serve static files during development
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
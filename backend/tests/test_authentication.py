@@ -1,12 +1,21 @@
 import json
+import smtplib
+from datetime import timedelta
+from io import StringIO
 import jwt
-from django.test import TestCase, Client
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.utils import timezone
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
-from apps.authentication.models import User
+from apps.authentication.mail import enqueue_email
+from apps.authentication.models import OutgoingEmail, User
 from apps.authentication.jwt_utils import generate_token, get_user_from_token
+from apps.core.utils import hash_token
 
 User = get_user_model()
 
@@ -256,3 +265,201 @@ class AuthenticationTestCase(APITestCase):
         """Test User get_short_name method"""
         short_name = self.verified_user.get_short_name()
         self.assertEqual(short_name, 'Verified')
+
+
+class StandInEmailBackend(locmem.EmailBackend):
+    """
+    Local SMTP stand-in: counts opened connections, rejects the recipients
+    in ``rejected`` and refuses to connect while ``down`` is set.
+    """
+    opened = 0
+    rejected = set()
+    down = False
+
+    def open(self):
+        if StandInEmailBackend.down:
+            raise smtplib.SMTPConnectError(421, 'Service not available')
+        StandInEmailBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & StandInEmailBackend.rejected:
+                raise smtplib.SMTPRecipientsRefused({message.to[0]: (550, b'Rejected')})
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND='tests.test_authentication.StandInEmailBackend')
+class EmailQueueTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        StandInEmailBackend.opened = 0
+        StandInEmailBackend.rejected = set()
+        StandInEmailBackend.down = False
+
+    def run_worker(self):
+        call_command('send_queued_emails', stdout=StringIO())
+
+    def test_registration_queues_email(self):
+        """Test registration queues the verification email instead of sending it"""
+        response = self.client.post(reverse('auth:register'), {
+            'username': 'queued',
+            'email': 'queued@example.com',
+            'password': 'TestPass123!',
+            'password_confirm': 'TestPass123!',
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.to_email, 'queued@example.com')
+        self.assertEqual(email.status, 'pending')
+        self.assertTrue(email.html_body)
+
+        self.run_worker()
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['queued@example.com'])
+        self.assertEqual(len(mail.outbox[0].alternatives), 1)
+
+    def test_worker_batches_over_one_connection(self):
+        """Test a batch of emails is delivered over a single connection"""
+        for i in range(3):
+            enqueue_email(f'user{i}@example.com', 'Hello', 'Body')
+
+        self.run_worker()
+
+        self.assertEqual(StandInEmailBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(OutgoingEmail.objects.filter(status='sent').count(), 3)
+
+    @override_settings(EMAIL_QUEUE={'RETRY_BACKOFF': 60, 'MAX_ATTEMPTS': 2})
+    def test_failed_email_retried_with_backoff(self):
+        """Test failed emails are rescheduled and eventually given up on"""
+        StandInEmailBackend.rejected = {'bad@example.com'}
+        bad = enqueue_email('bad@example.com', 'Hello', 'Body')
+        enqueue_email('good@example.com', 'Hello', 'Body')
+
+        self.run_worker()
+
+        bad.refresh_from_db()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(bad.status, 'pending')
+        self.assertEqual(bad.attempts, 1)
+        self.assertGreater(bad.next_attempt_at, timezone.now() + timedelta(seconds=50))
+
+        # Not due yet
+        self.run_worker()
+        bad.refresh_from_db()
+        self.assertEqual(bad.attempts, 1)
+
+        OutgoingEmail.objects.filter(pk=bad.pk).update(next_attempt_at=timezone.now())
+        self.run_worker()
+        bad.refresh_from_db()
+        self.assertEqual(bad.status, 'failed')
+        self.assertEqual(bad.attempts, 2)
+
+    def test_unreachable_server_reschedules_batch(self):
+        """Test a connection failure reschedules every email of the batch"""
+        StandInEmailBackend.down = True
+        enqueue_email('a@example.com', 'Hello', 'Body')
+        enqueue_email('b@example.com', 'Hello', 'Body')
+
+        self.run_worker()
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            list(OutgoingEmail.objects.values_list('status', 'attempts')),
+            [('pending', 1), ('pending', 1)]
+        )
+
+
+class AuthTokenTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='tokenuser',
+            email='token@example.com',
+            password='testpass123',
+            is_email_verified=False
+        )
+
+    def test_verification_token_stored_as_digest(self):
+        """Test only the digest of a verification token is stored"""
+        token = self.user.generate_verification_token()
+        self.user.refresh_from_db()
+
+        self.assertNotEqual(self.user.email_verification_token, token)
+        self.assertEqual(self.user.email_verification_token, hash_token(token))
+
+        # The stored digest itself is not a valid token
+        response = self.client.post(reverse('auth:verify_email'), {
+            'token': self.user.email_verification_token
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(reverse('auth:verify_email'), {'token': token})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_email_verified)
+        self.assertIsNone(self.user.email_verification_token)
+
+    def test_tokens_are_not_written_to_output_or_logs(self):
+        """Test queueing verification and reset emails never prints or logs the raw token"""
+        from contextlib import redirect_stdout
+        from unittest.mock import patch
+        from apps.authentication.services import send_password_reset_email, send_verification_email
+
+        token = 'e5a8c7d0-raw-token'
+        stdout = StringIO()
+        with patch('apps.authentication.services.generate_verification_token', return_value=token), \
+                redirect_stdout(stdout), self.assertLogs('apps.authentication.services', 'DEBUG') as logs:
+            self.assertTrue(send_verification_email(self.user))
+            self.assertTrue(send_password_reset_email(self.user))
+
+        self.assertEqual(stdout.getvalue(), '')
+        self.assertEqual(len(logs.output), 2)
+        self.assertNotIn(token, '\n'.join(logs.output))
+
+    def test_password_reset_with_hashed_token(self):
+        """Test password reset looks up the digest of the submitted token"""
+        token = self.user.generate_password_reset_token()
+
+        response = self.client.post(reverse('auth:reset_password'), {
+            'token': token,
+            'password': 'NewPass123!',
+            'password_confirm': 'NewPass123!'
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('NewPass123!'))
+        self.assertIsNone(self.user.password_reset_token)
+
+    def test_sweeper_clears_expired_tokens_and_stale_accounts(self):
+        """Test the sweeper clears expired tokens and deletes stale unverified users"""
+        from apps.blog.models import Post
+
+        self.user.generate_verification_token()
+        expired = User.objects.create_user(
+            username='expired', email='expired@example.com', password='testpass123'
+        )
+        expired.generate_password_reset_token()
+        User.objects.filter(pk=expired.pk).update(password_reset_expires=timezone.now() - timedelta(minutes=1))
+
+        stale = User.objects.create_user(username='stale', email='stale@example.com', password='testpass123')
+        author = User.objects.create_user(username='author', email='author@example.com', password='testpass123')
+        Post.objects.create(title='Kept', content='Kept content', author=author)
+        User.objects.filter(pk__in=[stale.pk, author.pk]).update(
+            created_at=timezone.now() - timedelta(days=31)
+        )
+
+        call_command('sweep_auth_tokens', batch_size=1, stdout=StringIO())
+
+        expired.refresh_from_db()
+        self.assertIsNone(expired.password_reset_token)
+        self.assertIsNone(expired.password_reset_expires)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.email_verification_token)
+        self.assertFalse(User.objects.filter(pk=stale.pk).exists())
+        self.assertTrue(User.objects.filter(pk=author.pk).exists())
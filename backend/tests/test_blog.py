@@ -1,5 +1,15 @@
 import json
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.utils import timezone
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase, APIClient
@@ -7,6 +17,9 @@ from rest_framework import status
 from apps.authentication.models import User
 from apps.blog.models import Post, Category, Tag
 from apps.authentication.jwt_utils import generate_token
+from apps.blog.serializers import PostListSerializer
+from apps.core import replicas
+from apps.core.models import ReplicationHeartbeat
 
 User = get_user_model()
 
@@ -369,3 +382,1678 @@ class BlogTestCase(APITestCase):
 
         response = self.client.post(self.posts_url, {'title': 'Test'})
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)  # Private endpoint
+
+
+class PostCounterTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='counteruser',
+            email='counter@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+        self.category = Category.objects.create(name='Counted Category')
+        self.other_category = Category.objects.create(name='Other Category')
+        self.tag1 = Tag.objects.create(name='Counted Tag 1')
+        self.tag2 = Tag.objects.create(name='Counted Tag 2')
+
+        self.post = Post.objects.create(
+            title='Counted Post',
+            content='Counted content',
+            author=self.user,
+            category=self.category,
+            status='published'
+        )
+        self.post.tags.add(self.tag1, self.tag2)
+
+    def assertCounts(self, category, other_category, tag1, tag2):
+        """Assert stored counters after reloading from the database"""
+        for obj in (self.category, self.other_category, self.tag1, self.tag2):
+            obj.refresh_from_db()
+        self.assertEqual(
+            (self.category.post_count, self.other_category.post_count,
+             self.tag1.post_count, self.tag2.post_count),
+            (category, other_category, tag1, tag2)
+        )
+
+    def test_counters_on_publish_and_unpublish(self):
+        """Test counters follow post status changes"""
+        self.assertCounts(1, 0, 1, 1)
+
+        self.post.status = 'draft'
+        self.post.save()
+        self.assertCounts(0, 0, 0, 0)
+
+        self.post.status = 'published'
+        self.post.save()
+        self.assertCounts(1, 0, 1, 1)
+
+    def test_counters_ignore_drafts(self):
+        """Test draft posts are not counted"""
+        draft = Post.objects.create(
+            title='Draft', content='Draft', author=self.user,
+            category=self.category, status='draft'
+        )
+        draft.tags.add(self.tag1)
+
+        self.assertCounts(1, 0, 1, 1)
+
+    def test_counters_on_category_move(self):
+        """Test counters when a post moves to another category"""
+        self.post.category = self.other_category
+        self.post.save()
+
+        self.assertCounts(0, 1, 1, 1)
+
+    def test_counters_on_retag(self):
+        """Test counters when tags are set, removed, cleared or added in reverse"""
+        self.post.tags.set([self.tag2])
+        self.assertCounts(1, 0, 0, 1)
+
+        self.post.tags.clear()
+        self.assertCounts(1, 0, 0, 0)
+
+        self.tag1.posts.add(self.post)
+        self.assertCounts(1, 0, 1, 0)
+
+    def test_counters_on_unpublish_and_retag(self):
+        """Test counters when one update unpublishes a post and changes its tags"""
+        from apps.blog.counters import find_counter_drift
+
+        self.post.tags.set([self.tag1])
+        self.client.force_authenticate(self.user)
+        response = self.client.patch(
+            reverse('blog:post-detail', kwargs={'pk': self.post.pk}),
+            {'status': 'draft', 'tag_ids': [self.tag2.pk]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCounts(0, 0, 0, 0)
+        self.assertEqual(find_counter_drift(), [])
+
+        response = self.client.patch(
+            reverse('blog:post-detail', kwargs={'pk': self.post.pk}),
+            {'status': 'published', 'tag_ids': [self.tag1.pk]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCounts(1, 0, 1, 0)
+        self.assertEqual(find_counter_drift(), [])
+
+    def test_counters_on_delete(self):
+        """Test counters after deleting a published post"""
+        self.post.delete()
+
+        self.assertCounts(0, 0, 0, 0)
+
+    def test_admin_bulk_publish_updates_counters(self):
+        """Test admin bulk actions refresh counters, related posts and updated_at despite QuerySet.update()"""
+        from django.contrib.admin.sites import site
+        from apps.blog.models import RelatedPost
+        from django.test import RequestFactory
+
+        draft = Post.objects.create(
+            title='Bulk Draft', content='Bulk', author=self.user,
+            category=self.other_category, status='draft'
+        )
+        draft.tags.add(self.tag1)
+
+        request = RequestFactory().post('/admin/blog/post/')
+        model_admin = site._registry[Post]
+        model_admin.message_user = lambda *args, **kwargs: None
+
+        updated_at = draft.updated_at
+        model_admin.publish_selected_posts(request, Post.objects.filter(pk=draft.pk))
+        self.assertCounts(1, 1, 2, 1)
+        draft.refresh_from_db()
+        self.assertGreater(draft.updated_at, updated_at)
+        self.assertEqual(list(draft.related_entries.values_list('related_id', flat=True)), [self.post.pk])
+        self.assertEqual(list(self.post.related_entries.values_list('related_id', flat=True)), [draft.pk])
+
+        model_admin.unpublish_selected_posts(request, Post.objects.all())
+        self.assertCounts(0, 0, 0, 0)
+        self.assertFalse(RelatedPost.objects.exists())
+        self.assertGreater(Post.objects.get(pk=draft.pk).updated_at, draft.updated_at)
+
+    def test_rebuild_post_counts_command(self):
+        """Test the management command reconciles drifted counters"""
+        from io import StringIO
+        from django.core.management import call_command, CommandError
+
+        Category.objects.filter(pk=self.category.pk).update(post_count=7)
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_post_counts', '--check', stdout=StringIO())
+
+        out = StringIO()
+        call_command('rebuild_post_counts', stdout=out)
+        self.assertIn('1 corrected', out.getvalue())
+        self.assertCounts(1, 0, 1, 1)
+
+
+class PostCursorPaginationTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        from datetime import timedelta
+        from django.utils import timezone
+
+        self.user = User.objects.create_user(
+            username='cursoruser',
+            email='cursor@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+        self.category = Category.objects.create(name='Cursor Category')
+
+        # Two posts share a published_at value to exercise the id tie-breaker
+        now = timezone.now()
+        published = [now - timedelta(hours=h) for h in (0, 1, 1, 2, 3)]
+        self.posts = []
+        for index, published_at in enumerate(published):
+            post = Post.objects.create(
+                title=f'Cursor Post {index}',
+                content='Cursor content',
+                author=self.user,
+                category=self.category,
+                status='published',
+                published_at=published_at
+            )
+            self.posts.append(post)
+
+        self.posts_url = reverse('blog:post-list')
+
+    def collect_pages(self, url):
+        """Follow next links and return the ids of every page"""
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            pages.append([item['id'] for item in response.data['results']])
+            url = response.data['next']
+        return pages
+
+    def expected_order(self):
+        return [
+            post.id for post in sorted(
+                self.posts, key=lambda p: (p.published_at, p.id), reverse=True
+            )
+        ]
+
+    def test_cursor_pagination_walks_all_posts(self):
+        """Test keyset pages cover every post once in (published_at, id) order"""
+        pages = self.collect_pages(f'{self.posts_url}?pagination=cursor&page_size=2')
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), self.expected_order())
+
+    def test_cursor_pagination_previous_link(self):
+        """Test following the previous link returns the prior page"""
+        first = self.client.get(f'{self.posts_url}?pagination=cursor&page_size=2')
+        self.assertIsNone(first.data['previous'])
+
+        second = self.client.get(first.data['next'])
+        previous = self.client.get(second.data['previous'])
+
+        self.assertEqual(
+            [item['id'] for item in previous.data['results']],
+            [item['id'] for item in first.data['results']]
+        )
+
+    def test_cursor_pagination_stable_under_inserts(self):
+        """Test inserting a newer post does not shift the following pages"""
+        first = self.client.get(f'{self.posts_url}?pagination=cursor&page_size=2')
+
+        Post.objects.create(
+            title='Late Post', content='Late', author=self.user, status='published'
+        )
+
+        rest = self.collect_pages(first.data['next'])
+        seen = [item['id'] for item in first.data['results']] + sum(rest, [])
+        self.assertEqual(seen, self.expected_order())
+
+    def test_cursor_pagination_on_category_posts(self):
+        """Test keyset mode on the category post feed"""
+        url = reverse('blog:category-posts', kwargs={'pk': self.category.id})
+        pages = self.collect_pages(f'{url}?pagination=cursor&page_size=3')
+
+        self.assertEqual(sum(pages, []), self.expected_order())
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is rejected"""
+        response = self.client.get(f'{self.posts_url}?cursor=not-a-cursor')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_pagination_is_default(self):
+        """Test page number pagination remains the default"""
+        response = self.client.get(self.posts_url)
+
+        self.assertEqual(response.data['count'], len(self.posts))
+
+
+class PostSearchTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='searchuser',
+            email='search@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+        self.category = Category.objects.create(name='Search Category')
+        self.tag = Tag.objects.create(name='Search Tag')
+
+        self.title_match = Post.objects.create(
+            title='Django performance tuning',
+            content='Profiling and caching notes.',
+            author=self.user,
+            category=self.category,
+            status='published'
+        )
+        self.content_match = Post.objects.create(
+            title='Weekly notes',
+            content='A short aside about Django at the end of a long post.',
+            author=self.user,
+            category=self.category,
+            status='published'
+        )
+        self.other = Post.objects.create(
+            title='Gardening',
+            content='Tomatoes and peppers.',
+            author=self.user,
+            status='published'
+        )
+        for post in (self.title_match, self.content_match, self.other):
+            post.tags.add(self.tag)
+
+        self.posts_url = reverse('blog:post-list')
+        token = generate_token(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def result_ids(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['id'] for item in response.data['results']]
+
+    def test_search_ranks_title_matches_first(self):
+        """Test relevance ranking weights titles above content"""
+        response = self.client.get(f'{self.posts_url}?search=django')
+
+        self.assertEqual(
+            self.result_ids(response),
+            [self.title_match.id, self.content_match.id]
+        )
+
+    def test_search_matches_prefixes_and_stems(self):
+        """Test prefix and stemmed matches"""
+        response = self.client.get(f'{self.posts_url}?search=tomato')
+        self.assertEqual(self.result_ids(response), [self.other.id])
+
+        response = self.client.get(f'{self.posts_url}?search=profiled')
+        self.assertEqual(self.result_ids(response), [self.title_match.id])
+
+    def test_search_requires_all_terms(self):
+        """Test every term must match"""
+        response = self.client.get(f'{self.posts_url}?search=django caching')
+
+        self.assertEqual(self.result_ids(response), [self.title_match.id])
+
+    def test_search_ignores_syntax_characters(self):
+        """Test query syntax characters are not passed to the backend"""
+        response = self.client.get(f'{self.posts_url}?search="django" OR -(')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_search_explicit_ordering_wins(self):
+        """Test an explicit ordering parameter overrides relevance"""
+        response = self.client.get(f'{self.posts_url}?search=django&ordering=title')
+
+        self.assertEqual(
+            self.result_ids(response),
+            [self.title_match.id, self.content_match.id]
+        )
+        response = self.client.get(f'{self.posts_url}?search=django&ordering=-title')
+        self.assertEqual(
+            self.result_ids(response),
+            [self.content_match.id, self.title_match.id]
+        )
+
+    def test_search_index_follows_updates_and_deletes(self):
+        """Test the index is kept in sync on save and delete"""
+        self.other.title = 'Django gardening'
+        self.other.save()
+        response = self.client.get(f'{self.posts_url}?search=django')
+        self.assertIn(self.other.id, self.result_ids(response))
+
+        self.other.delete()
+        response = self.client.get(f'{self.posts_url}?search=django')
+        self.assertNotIn(self.other.id, self.result_ids(response))
+
+    def test_search_on_custom_feeds(self):
+        """Test my_posts, category and tag feeds use the search backend"""
+        urls = [
+            reverse('blog:post-my-posts'),
+            reverse('blog:category-posts', kwargs={'pk': self.category.id}),
+            reverse('blog:tag-posts', kwargs={'pk': self.tag.id}),
+        ]
+        for url in urls:
+            response = self.client.get(f'{url}?search=django')
+            self.assertEqual(
+                self.result_ids(response),
+                [self.title_match.id, self.content_match.id]
+            )
+
+    def test_rebuild_search_index_command(self):
+        """Test the index can be rebuilt from the posts table"""
+        from io import StringIO
+        from django.core.management import call_command
+        from apps.blog.search import get_search_backend
+
+        get_search_backend().remove_posts(Post.objects.values_list('id', flat=True))
+
+        call_command('rebuild_search_index', stdout=StringIO())
+
+        response = self.client.get(f'{self.posts_url}?search=django')
+        self.assertEqual(len(self.result_ids(response)), 2)
+
+
+class ResponseCacheTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        from django.core.cache import cache
+        cache.clear()
+
+        self.user = User.objects.create_user(
+            username='cacheuser',
+            email='cache@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+        self.category = Category.objects.create(name='Cache Category')
+        self.tag = Tag.objects.create(name='Cache Tag')
+        self.post = Post.objects.create(
+            title='Cached Post',
+            content='Cached content',
+            author=self.user,
+            category=self.category,
+            status='published'
+        )
+        self.post.tags.add(self.tag)
+
+        self.posts_url = reverse('blog:post-list')
+        self.post_detail_url = reverse('blog:post-detail', kwargs={'pk': self.post.id})
+        self.categories_url = reverse('blog:category-list')
+
+    def test_repeated_request_is_served_from_cache(self):
+        """Test a second identical request hits the cache without queries"""
+        first = self.client.get(self.posts_url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.posts_url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.json(), first.json())
+
+    def test_query_params_are_normalized(self):
+        """Test parameter order and empty values share one cache entry"""
+        self.client.get(f'{self.posts_url}?page_size=5&ordering=title')
+        response = self.client.get(f'{self.posts_url}?ordering=title&search=&page_size=5')
+
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_post_update_invalidates_post_responses(self):
+        """Test saving a published post invalidates list and detail responses"""
+        self.client.get(self.posts_url)
+        self.client.get(self.post_detail_url)
+
+        self.post.title = 'Renamed Post'
+        self.post.save()
+
+        response = self.client.get(self.posts_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['title'], 'Renamed Post')
+        self.assertEqual(self.client.get(self.post_detail_url).data['title'], 'Renamed Post')
+
+    def test_draft_changes_keep_category_cache(self):
+        """Test draft-only writes do not invalidate public responses"""
+        self.client.get(self.categories_url)
+
+        Post.objects.create(
+            title='Private Draft', content='Draft', author=self.user,
+            category=self.category, status='draft'
+        )
+
+        self.assertEqual(self.client.get(self.categories_url)['X-Cache'], 'HIT')
+
+    def test_publish_invalidates_category_counts(self):
+        """Test publishing a post refreshes cached category counts"""
+        self.client.get(self.categories_url)
+
+        Post.objects.create(
+            title='Second Post', content='More', author=self.user,
+            category=self.category, status='published'
+        )
+
+        response = self.client.get(self.categories_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['post_count'], 2)
+
+    def test_retag_invalidates_post_responses(self):
+        """Test M2M tag changes invalidate post responses"""
+        self.client.get(self.post_detail_url)
+
+        self.post.tags.clear()
+
+        response = self.client.get(self.post_detail_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['tags'], [])
+
+    def test_draft_by_slug_is_not_cached(self):
+        """Test an author's draft fetched by slug never enters the cache"""
+        draft = Post.objects.create(
+            title='Secret Draft', content='Draft', author=self.user, status='draft'
+        )
+        url = reverse('blog:post-by-slug', kwargs={'slug': draft.slug})
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_token(self.user)}')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+        self.client.credentials()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(BLOG_RESPONSE_CACHE_TIMEOUT=0)
+class ConditionalRequestTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='etaguser',
+            email='etag@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+        self.category = Category.objects.create(name='ETag Category')
+        self.tag = Tag.objects.create(name='ETag Tag')
+        self.post = Post.objects.create(
+            title='Validated Post',
+            content='Validated content',
+            author=self.user,
+            category=self.category,
+            status='published'
+        )
+        self.post.tags.add(self.tag)
+
+        self.posts_url = reverse('blog:post-list')
+        self.post_detail_url = reverse('blog:post-detail', kwargs={'pk': self.post.id})
+        self.categories_url = reverse('blog:category-list')
+
+    def assertETagChanges(self, url, change):
+        etag = self.client.get(url)['ETag']
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_answers_if_none_match_without_serializing(self):
+        """Test a matching ETag gets a 304 before any serializer work"""
+        first = self.client.get(self.posts_url)
+        self.assertTrue(first['ETag'].startswith('W/"'))
+        self.assertFalse(first.has_header('Last-Modified'))
+
+        with patch.object(PostListSerializer, 'to_representation', side_effect=AssertionError), \
+                self.assertNumQueries(1):
+            response = self.client.get(self.posts_url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], first['ETag'])
+        self.assertEqual(response.content, b'')
+
+    def test_detail_answers_if_modified_since(self):
+        """Test post details carry Last-Modified and honour If-Modified-Since"""
+        first = self.client.get(self.post_detail_url)
+
+        response = self.client.get(self.post_detail_url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        by_slug = self.client.get(reverse('blog:post-by-slug', kwargs={'slug': self.post.slug}))
+        self.assertEqual(by_slug['Last-Modified'], first['Last-Modified'])
+        response = self.client.get(
+            reverse('blog:post-by-slug', kwargs={'slug': self.post.slug}), HTTP_IF_NONE_MATCH=by_slug['ETag']
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_changes_to_rendered_data_change_the_etag(self):
+        """Test edits, retagging, nested renames and deletions move the validators"""
+        other_tag = Tag.objects.create(name='Other Tag')
+
+        def edit():
+            self.post.title = 'Edited'
+            self.post.save()
+
+        def rename_tag():
+            self.tag.name = 'Renamed Tag'
+            self.tag.save()
+
+        def add_draft_then_delete_post():
+            Post.objects.create(title='Draft', content='Draft', author=self.user)
+            self.post.delete()
+
+        self.assertETagChanges(self.posts_url, edit)
+        self.assertETagChanges(self.posts_url, lambda: self.post.tags.add(other_tag))
+        self.assertETagChanges(self.posts_url, rename_tag)
+        self.assertETagChanges(self.posts_url, add_draft_then_delete_post)
+
+    def test_category_counters_change_the_etag(self):
+        """Test publishing a post into a category moves the category list ETag"""
+        draft = Post.objects.create(title='Draft', content='Draft', author=self.user, category=self.category)
+
+        def publish():
+            draft.status = 'published'
+            draft.save()
+
+        self.assertETagChanges(self.categories_url, publish)
+
+    def test_drafts_and_missing_posts_are_not_validated(self):
+        """Test drafts and unknown posts fall through to the regular responses"""
+        draft = Post.objects.create(title='Private Draft', content='Draft', author=self.user)
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('blog:post-by-slug', kwargs={'slug': draft.slug}), HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header('ETag'))
+
+        response = self.client.get(reverse('blog:post-detail', kwargs={'pk': 9999}), HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(BLOG_RESPONSE_CACHE_TIMEOUT=300)
+    def test_cached_responses_answer_without_queries(self):
+        """Test the response cache stores the validators and answers 304s itself"""
+        from django.core.cache import cache
+        cache.clear()
+        first = self.client.get(self.posts_url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.posts_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.posts_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], first['ETag'])
+
+
+class PostReadingStatsTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='readinguser',
+            email='reading@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+        self.short = Post.objects.create(
+            title='Short Read', content='word ' * 150, author=self.user, status='published'
+        )
+        self.long = Post.objects.create(
+            title='Long Read', content='word ' * 1900, author=self.user, status='published'
+        )
+        self.posts_url = reverse('blog:post-list')
+
+    def test_reading_stats_stored_on_save(self):
+        """Test word count and reading time are persisted"""
+        stored = Post.objects.values('word_count', 'reading_time').get(pk=self.long.pk)
+
+        self.assertEqual(stored, {'word_count': 1900, 'reading_time': 10})
+        self.assertEqual(self.short.reading_time, 1)
+
+    def test_reading_stats_follow_content_updates(self):
+        """Test saving with update_fields=['content'] refreshes the stats"""
+        self.short.content = 'word ' * 600
+        self.short.save(update_fields=['content'])
+
+        self.short.refresh_from_db()
+        self.assertEqual((self.short.word_count, self.short.reading_time), (600, 3))
+
+    def test_filter_by_max_reading_time(self):
+        """Test filtering posts with ?max_reading_time"""
+        response = self.client.get(f'{self.posts_url}?max_reading_time=5')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['id'] for p in response.data['results']], [self.short.id])
+
+        response = self.client.get(f'{self.posts_url}?min_reading_time=5')
+        self.assertEqual([p['id'] for p in response.data['results']], [self.long.id])
+
+    def test_order_by_reading_time(self):
+        """Test ordering posts by reading time"""
+        response = self.client.get(f'{self.posts_url}?ordering=-reading_time')
+
+        self.assertEqual(
+            [p['id'] for p in response.data['results']],
+            [self.long.id, self.short.id]
+        )
+
+
+class RelatedPostsTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='relateduser',
+            email='related@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+        self.category = Category.objects.create(name='Related Category')
+        self.common = Tag.objects.create(name='Common')
+        self.rare = Tag.objects.create(name='Rare')
+
+        def make(title, tags, category=None):
+            post = Post.objects.create(
+                title=title, content='Content', author=self.user,
+                category=category, status='published'
+            )
+            post.tags.add(*tags)
+            return post
+
+        self.target = make('Target', [self.common, self.rare])
+        self.rare_match = make('Rare Match', [self.rare])
+        self.common_match = make('Common Match', [self.common])
+        self.category_only = make('Category Only', [], self.category)
+        self.unrelated = make('Unrelated', [])
+        for extra in range(3):
+            make(f'Common Filler {extra}', [self.common])
+
+    def related_ids(self, post):
+        return list(post.related_entries.values_list('related_id', flat=True))
+
+    def test_rebuild_ranks_rare_tags_higher(self):
+        """Test shared rare tags outrank shared common tags"""
+        from apps.blog.related import RelatedPostsEngine
+
+        RelatedPostsEngine(top_k=3).rebuild()
+
+        related = self.related_ids(self.target)
+        common_ids = set(Post.objects.filter(tags=self.common).values_list('id', flat=True))
+        self.assertEqual(related[0], self.rare_match.id)
+        self.assertEqual(len(related), 3)
+        self.assertTrue(set(related[1:]) <= common_ids)
+        self.assertNotIn(self.unrelated.id, related)
+
+    def test_category_fills_short_lists(self):
+        """Test same-category posts fill neighbour lists without shared tags"""
+        other = Post.objects.create(
+            title='Category Sibling', content='Content', author=self.user,
+            category=self.category, status='published'
+        )
+
+        self.assertEqual(self.related_ids(other), [self.category_only.id])
+
+    def test_incremental_refresh_on_retag(self):
+        """Test tag changes rescore the post and its referrers"""
+        self.assertIn(self.rare_match.id, self.related_ids(self.target))
+
+        self.rare_match.tags.clear()
+
+        self.assertNotIn(self.rare_match.id, self.related_ids(self.target))
+
+    def test_incremental_matches_full_rebuild(self):
+        """Test incremental refreshes agree with a full rebuild for the changed post"""
+        from apps.blog.related import RelatedPostsEngine
+
+        incremental = self.related_ids(self.target)
+        RelatedPostsEngine().rebuild()
+
+        self.assertEqual(self.related_ids(self.target), incremental)
+
+    def test_unpublish_removes_entries(self):
+        """Test unpublished posts leave the index"""
+        self.rare_match.status = 'draft'
+        self.rare_match.save()
+
+        self.assertEqual(self.related_ids(self.rare_match), [])
+        self.assertNotIn(self.rare_match.id, self.related_ids(self.target))
+
+    def test_related_action(self):
+        """Test the related posts endpoint"""
+        url = reverse('blog:post-related', kwargs={'pk': self.target.id})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in response.data],
+            self.related_ids(self.target)
+        )
+
+    def test_related_action_hides_drafts(self):
+        """Test drafts have no public related posts"""
+        draft = Post.objects.create(
+            title='Draft', content='Content', author=self.user, status='draft'
+        )
+        url = reverse('blog:post-related', kwargs={'pk': draft.id})
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_indexed_post_without_neighbours_skips_fallback(self):
+        """Test a post indexed with no neighbours reads the index in one query and rebuilds drop cached lists"""
+        from apps.blog.related import RelatedPostsEngine
+
+        loner = Post.objects.create(title='Loner', content='Content', author=self.user, status='published')
+        loner.refresh_from_db()
+        self.assertTrue(loner.related_indexed)
+        with self.assertNumQueries(1):
+            self.assertEqual(list(loner.get_related_posts()), [])
+
+        url = reverse('blog:post-related', kwargs={'pk': self.target.id})
+        with override_settings(BLOG_RESPONSE_CACHE_TIMEOUT=300):
+            cache.clear()
+            before = [item['id'] for item in self.client.get(url).data]
+            RelatedPostsEngine(top_k=1).rebuild()
+            after = [item['id'] for item in self.client.get(url).data]
+        self.assertEqual(len(before), 5)
+        self.assertEqual(after, self.related_ids(self.target))
+        self.assertEqual(len(after), 1)
+
+    def test_rebuild_related_posts_command(self):
+        """Test the management command rebuilds the index"""
+        from io import StringIO
+        from django.core.management import call_command
+        from apps.blog.models import RelatedPost
+
+        RelatedPost.objects.all().delete()
+        call_command('rebuild_related_posts', '--top-k', '2', stdout=StringIO())
+
+        self.assertEqual(len(self.related_ids(self.target)), 2)
+
+
+@override_settings(BLOG_RESPONSE_CACHE_TIMEOUT=0)
+class NestedCountQueryTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='queryuser',
+            email='query@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_token(self.user)}')
+        self.category = Category.objects.create(name='Query Category')
+        self.tag = Tag.objects.create(name='Query Tag')
+
+    def add_posts(self, count):
+        """Create published posts, each with its own category and tags"""
+        for i in range(count):
+            category = Category.objects.create(name=f'Query Category {Post.objects.count()}')
+            post = Post.objects.create(
+                title=f'Query Post {Post.objects.count()}',
+                content='Query content',
+                author=self.user,
+                category=category if i % 2 else self.category,
+                status='published'
+            )
+            post.tags.add(self.tag, Tag.objects.create(name=f'Query Tag {post.pk}'))
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def test_nested_counts_do_not_query_per_item(self):
+        """Test category and tag counts of nested serializers cost no per-item queries"""
+        urls = [
+            reverse('blog:post-list'),
+            reverse('blog:post-featured'),
+            reverse('blog:post-my-posts'),
+            reverse('blog:category-list'),
+            reverse('blog:tag-list'),
+            reverse('blog:category-posts', kwargs={'pk': self.category.pk}),
+            reverse('blog:tag-posts', kwargs={'pk': self.tag.pk}),
+        ]
+        self.add_posts(2)
+        baseline = {url: self.count_queries(url) for url in urls}
+
+        self.add_posts(3)
+        for url in urls:
+            self.assertEqual(self.count_queries(url), baseline[url], url)
+
+    def test_list_queries_skip_unrendered_columns(self):
+        """Test list endpoints never load post content or unused author columns"""
+        self.add_posts(2)
+        urls = [
+            reverse('blog:post-list'),
+            reverse('blog:post-featured'),
+            reverse('blog:post-my-posts'),
+            reverse('blog:category-posts', kwargs={'pk': self.category.pk}),
+            reverse('blog:tag-posts', kwargs={'pk': self.tag.pk}),
+        ]
+        for url in urls:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.data['results'] if 'results' in response.data else response.data)
+            sql = ' '.join(query['sql'] for query in context.captured_queries if 'blog_post' in query['sql'])
+            self.assertNotIn('"blog_post"."content"', sql, url)
+            self.assertNotIn('"auth_user"."password"', sql, url)
+
+
+@override_settings(BLOG_RESPONSE_CACHE_TIMEOUT=0)
+class SparseFieldsTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='sparseuser',
+            email='sparse@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+        self.category = Category.objects.create(name='Sparse Category')
+        self.tag = Tag.objects.create(name='Sparse Tag')
+        for i in range(3):
+            post = Post.objects.create(
+                title=f'Sparse Post {i}',
+                content='Sparse content',
+                author=self.user,
+                category=self.category,
+                status='published'
+            )
+            post.tags.add(self.tag)
+        self.posts_url = reverse('blog:post-list')
+
+    def test_fields_limit_response_and_queries(self):
+        """Test ?fields= limits both the rendered fields and the SQL"""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.posts_url, {'fields': 'id,title,slug,published_at'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for item in response.data['results']:
+            self.assertEqual(set(item), {'id', 'title', 'slug', 'published_at'})
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        self.assertNotIn('auth_user', sql)
+        self.assertNotIn('blog_tag', sql)
+        self.assertNotIn('"blog_post"."excerpt"', sql)
+
+    def test_relations_collapse_to_ids_unless_expanded(self):
+        """Test relations render as ids unless listed in ?expand="""
+        response = self.client.get(self.posts_url, {'expand': 'author'})
+
+        item = response.data['results'][0]
+        self.assertEqual(item['author']['username'], 'sparseuser')
+        self.assertEqual(item['category'], self.category.pk)
+        self.assertEqual(item['tags'], [self.tag.pk])
+        self.assertIn('excerpt', item)
+
+        response = self.client.get(self.posts_url, {'fields': 'id,tags', 'expand': 'tags'})
+        item = response.data['results'][0]
+        self.assertEqual(set(item), {'id', 'tags'})
+        self.assertEqual(item['tags'][0]['name'], 'Sparse Tag')
+
+    def test_detail_and_feeds_support_sparse_fields(self):
+        """Test detail, by-slug and category feeds honour ?fields="""
+        post = Post.objects.first()
+        for url in [
+            reverse('blog:post-detail', kwargs={'pk': post.pk}),
+            reverse('blog:post-by-slug', kwargs={'slug': post.slug}),
+        ]:
+            response = self.client.get(url, {'fields': 'id,content'})
+            self.assertEqual(response.data, {'id': post.pk, 'content': 'Sparse content'})
+
+        response = self.client.get(
+            reverse('blog:category-posts', kwargs={'pk': self.category.pk}), {'fields': 'id'}
+        )
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertEqual(set(response.data['results'][0]), {'id'})
+
+    def test_cursor_pages_with_sparse_fields(self):
+        """Test keyset pages work when the cursor column is not rendered"""
+        response = self.client.get(self.posts_url, {'pagination': 'cursor', 'page_size': 2, 'fields': 'id'})
+        self.assertEqual(len(response.data['results']), 2)
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_unknown_fields_rejected(self):
+        """Test unknown field and expansion names return 400"""
+        response = self.client.get(self.posts_url, {'fields': 'id,password'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+
+        response = self.client.get(self.posts_url, {'expand': 'comments'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('expand', response.data)
+
+
+@override_settings(BLOG_RESPONSE_CACHE_TIMEOUT=0)
+class CompiledSerializerTestCase(APITestCase):
+    def setUp(self):
+        """Set up posts covering nulls, media, tags and drafts"""
+        self.user = User.objects.create_user(
+            username='compileduser',
+            email='compiled@example.com',
+            password='testpass123',
+            first_name='Compiled',
+            is_email_verified=True
+        )
+        self.category = Category.objects.create(name='Compiled Category', description='Described')
+        self.tags = [Tag.objects.create(name=name) for name in ('zeta', 'alpha', 'Mid')]
+
+        for i in range(5):
+            post = Post.objects.create(
+                title=f'Compiled Post {i}',
+                content=f'Compiled content number {i} ' * (i * 60 + 1),
+                author=self.user,
+                category=self.category if i % 2 else None,
+                status='draft' if i == 4 else 'published'
+            )
+            post.tags.add(*self.tags[:i])
+        self.post = Post.objects.filter(status='published').first()
+        Post.objects.filter(pk=self.post.pk).update(
+            featured_image='blog_images/cover photo ü.jpg',
+            featured_image_variants={
+                'thumbnail': {'width': 320, 'height': 240, 'webp': 'blog_images/variants/cover photo ü/thumbnail.webp',
+                              'jpeg': 'blog_images/variants/cover photo ü/thumbnail.jpg'},
+                'full': {'width': 640, 'height': 480, 'webp': 'blog_images/variants/cover photo ü/full.webp'},
+            },
+        )
+
+    def assertSameOutput(self, url, params=None):
+        """Assert the compiled and regular serializers render identical bytes"""
+        with override_settings(BLOG_COMPILED_SERIALIZERS=False):
+            expected = self.client.get(url, params or {})
+        with override_settings(BLOG_COMPILED_SERIALIZERS=True):
+            actual = self.client.get(url, params or {})
+
+        self.assertEqual(actual.status_code, expected.status_code, url)
+        self.assertEqual(actual.content, expected.content, f'{url} {params}')
+        return actual
+
+    def test_post_list_equivalence(self):
+        """Test post list pages render identically"""
+        url = reverse('blog:post-list')
+        for params in [
+            None,
+            {'ordering': 'title'},
+            {'ordering': '-reading_time'},
+            {'search': 'compiled'},
+            {'category': self.category.pk},
+            {'page': 2, 'page_size': 2},
+            {'fields': 'id,title,slug,published_at'},
+            {'expand': 'author'},
+            {'fields': 'id,tags,category,featured_image', 'expand': 'tags'},
+            {'fields': 'id,featured_image_srcset'},
+        ]:
+            self.assertSameOutput(url, params)
+
+    def test_cursor_pages_equivalence(self):
+        """Test keyset pages and their links render identically"""
+        response = self.assertSameOutput(reverse('blog:post-list'), {'pagination': 'cursor', 'page_size': 2})
+        self.assertSameOutput(response.data['next'])
+
+    def test_post_detail_equivalence(self):
+        """Test post details render identically"""
+        url = reverse('blog:post-detail', kwargs={'pk': self.post.pk})
+        self.assertSameOutput(url)
+        self.assertSameOutput(url, {'fields': 'id,content,tags'})
+        self.assertSameOutput(reverse('blog:post-detail', kwargs={'pk': 999999}))
+
+    def test_feeds_equivalence(self):
+        """Test category and tag feeds render identically"""
+        self.assertSameOutput(reverse('blog:category-posts', kwargs={'pk': self.category.pk}))
+        self.assertSameOutput(reverse('blog:tag-posts', kwargs={'pk': self.tags[0].pk}), {'expand': 'tags'})
+
+    def test_compiled_list_bypasses_serializer(self):
+        """Test the compiled list skips the serializer and needs one query for rows and one for tags (plus the validators)"""
+        with override_settings(BLOG_COMPILED_SERIALIZERS=True), \
+                patch.object(PostListSerializer, 'to_representation', side_effect=AssertionError):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(reverse('blog:post-list'), {'pagination': 'cursor'})
+
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual(len(context.captured_queries), 3)
+
+
+class PostExportTestCase(APITestCase):
+    def setUp(self):
+        """Set up published posts with staggered update times and a draft"""
+        from datetime import timedelta
+        from django.utils import timezone
+
+        self.user = User.objects.create_user(
+            username='exportuser',
+            email='export@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+        self.tag = Tag.objects.create(name='Export Tag')
+        now = timezone.now()
+        self.posts = []
+        for i in range(5):
+            post = Post.objects.create(
+                title=f'Export Post {i}',
+                content=f'Export content {i}\nwith a second line',
+                author=self.user,
+                status='published'
+            )
+            post.tags.add(self.tag)
+            Post.objects.filter(pk=post.pk).update(updated_at=now - timedelta(hours=5 - i))
+            self.posts.append(post)
+        Post.objects.create(title='Export Draft', content='Draft', author=self.user)
+        self.cutoff = (now - timedelta(hours=2, minutes=30)).isoformat()
+        self.export_url = reverse('blog:post-export')
+
+    def read_export(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        body = b''.join(response.streaming_content)
+        return [json.loads(line) for line in body.decode('utf-8').splitlines()]
+
+    def test_export_requires_authentication(self):
+        """Test anonymous clients cannot export"""
+        response = self.client.get(self.export_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_streams_published_posts_as_detail_rows(self):
+        """Test every published post is streamed once, oldest change first, as rendered by the detail view"""
+        self.client.force_authenticate(user=self.user)
+
+        rows = self.read_export(self.client.get(self.export_url))
+
+        self.assertEqual([row['id'] for row in rows], [post.pk for post in self.posts])
+        detail = self.client.get(reverse('blog:post-detail', kwargs={'pk': self.posts[0].pk})).json()
+        self.assertEqual(rows[0], detail)
+
+    def test_export_updated_since(self):
+        """Test ?updated_since= only returns posts changed at or after the bound"""
+        self.client.force_authenticate(user=self.user)
+
+        rows = self.read_export(self.client.get(self.export_url, {'updated_since': self.cutoff}))
+        self.assertEqual([row['id'] for row in rows], [post.pk for post in self.posts[3:]])
+
+        response = self.client.get(self.export_url, {'updated_since': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('updated_since', response.json())
+
+    async def test_export_streams_asynchronously_under_asgi(self):
+        """Test ASGI requests get an async body produced chunk by chunk rather than collected first"""
+        from apps.blog import export
+
+        chunks = []
+        iter_ndjson = export.iter_ndjson
+
+        def tracked_iter_ndjson(*args, **kwargs):
+            for chunk in iter_ndjson(*args, chunk_size=2, request=kwargs.get('request')):
+                chunks.append(chunk)
+                yield chunk
+
+        with patch('apps.blog.views.iter_ndjson', tracked_iter_ndjson):
+            response = await self.async_client.get(
+                self.export_url, headers={'Authorization': f'Bearer {generate_token(self.user)}'}
+            )
+            self.assertTrue(response.is_async)
+            stream = response.streaming_content
+            first = await stream.__anext__()
+            self.assertEqual(chunks, [first])
+            body = first + b''.join([chunk async for chunk in stream])
+
+        rows = [json.loads(line) for line in body.decode('utf-8').splitlines()]
+        self.assertEqual([row['id'] for row in rows], [post.pk for post in self.posts])
+        self.assertEqual(len(chunks), 3)
+
+    def test_export_command(self):
+        """Test the management command writes the same rows in small chunks"""
+        import os
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command, CommandError
+
+        out = StringIO()
+        call_command('export_posts', '--chunk-size', '2', stdout=out, stderr=StringIO())
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([row['id'] for row in rows], [post.pk for post in self.posts])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'posts.ndjson')
+            call_command('export_posts', '--updated-since', self.cutoff, '--output', path, stdout=StringIO())
+            with open(path, 'rb') as handle:
+                self.assertEqual(len(handle.read().splitlines()), 2)
+
+        with self.assertRaises(CommandError):
+            call_command('export_posts', '--updated-since', 'yesterday', stdout=StringIO())
+
+
+class BulkCreateTestCase(APITestCase):
+    def setUp(self):
+        """Set up an author, a category, tags and a post holding a slug"""
+        self.user = User.objects.create_user(
+            username='bulkuser',
+            email='bulk@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+        self.category = Category.objects.create(name='Bulk Category')
+        self.tags = [Tag.objects.create(name=name) for name in ('bulk-one', 'bulk-two')]
+        Post.objects.create(title='Imported Post', content='Existing', author=self.user)
+        self.bulk_url = reverse('blog:post-bulk-create')
+        self.client.force_authenticate(user=self.user)
+
+    def build_items(self, count):
+        return [
+            {
+                'title': 'Imported Post',
+                'content': 'searchable marmalade ' * (100 * i + 1),
+                'category_id': self.category.pk,
+                'tag_ids': [tag.pk for tag in self.tags],
+                'status': 'published',
+            }
+            for i in range(count)
+        ]
+
+    def test_bulk_create_matches_single_create(self):
+        """Test bulk created posts get the slugs, stats, tags, counters and index of a regular save"""
+        response = self.client.post(self.bulk_url, self.build_items(3), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        slugs = [item['slug'] for item in response.data['created']]
+        self.assertEqual(slugs, ['imported-post-1', 'imported-post-2', 'imported-post-3'])
+
+        post = Post.objects.get(slug='imported-post-2')
+        self.assertEqual(post.author, self.user)
+        self.assertEqual(post.word_count, 202)
+        self.assertEqual(post.reading_time, 1)
+        self.assertTrue(post.excerpt.endswith('...'))
+        self.assertIsNotNone(post.published_at)
+        self.assertEqual(set(post.tags.all()), set(self.tags))
+
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.post_count, 3)
+        self.assertEqual(Tag.objects.get(pk=self.tags[0].pk).post_count, 3)
+
+        found = self.client.get(reverse('blog:post-list'), {'search': 'marmalade'})
+        self.assertEqual(found.data['count'], 3)
+
+    def test_bulk_create_queries_do_not_grow_with_batch_size(self):
+        """Test validation and inserts use a fixed number of queries"""
+        counts = []
+        for size in (2, 20):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(self.bulk_url, self.build_items(size), format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            counts.append(len(context.captured_queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_invalid_items_are_reported_per_index(self):
+        """Test errors are reported per item and nothing is created"""
+        items = self.build_items(3)
+        items[0]['category_id'] = 9999
+        items[2]['content'] = '   '
+        items[2]['tag_ids'] = [self.tags[0].pk, 9999]
+
+        response = self.client.post(self.bulk_url, items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = {error['index']: error['errors'] for error in response.data['errors']}
+        self.assertEqual(set(errors), {0, 2})
+        self.assertIn('category_id', errors[0])
+        self.assertEqual(set(errors[2]), {'content', 'tag_ids'})
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_bulk_create_rejects_bad_payloads(self):
+        """Test authentication, payload shape and the batch limit are enforced"""
+        for payload in ({'title': 'Not a list'}, []):
+            response = self.client.post(self.bulk_url, payload, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with override_settings(BLOG_BULK_CREATE_LIMIT=2):
+            response = self.client.post(self.bulk_url, self.build_items(3), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.bulk_url, self.build_items(1), format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_long_duplicate_titles_fit_the_slug_column(self):
+        """Test suffixed slugs are truncated to the column length"""
+        items = self.build_items(2)
+        for item in items:
+            item['title'] = 'x' * 200
+
+        response = self.client.post(self.bulk_url, items, format='json')
+
+        slugs = [item['slug'] for item in response.data['created']]
+        self.assertEqual(slugs, ['x' * 200, 'x' * 198 + '-1'])
+
+
+class SlugAllocationTestCase(APITestCase):
+    def setUp(self):
+        """Set up an author"""
+        self.user = User.objects.create_user(
+            username='sluguser',
+            email='slug@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+
+    def create_post(self, title='Hello World'):
+        return Post.objects.create(title=title, content='Slug content', author=self.user)
+
+    def test_duplicate_titles_cost_one_slug_query(self):
+        """Test the next free suffix is found with one query however many collisions exist"""
+        self.create_post()
+        with CaptureQueriesContext(connection) as first:
+            self.create_post()
+        for _ in range(8):
+            self.create_post()
+        with CaptureQueriesContext(connection) as last:
+            post = self.create_post()
+
+        self.assertEqual(post.slug, 'hello-world-10')
+        self.assertEqual(len(last.captured_queries), len(first.captured_queries))
+
+    def test_slug_taken_concurrently_is_reallocated(self):
+        """Test an allocated slug taken before the insert is retried in a savepoint"""
+        from django.db import transaction
+        from apps.blog import slugs
+
+        self.create_post()
+        real_allocate = slugs.allocate_slugs
+        calls = []
+
+        def stale_allocate(*args, **kwargs):
+            calls.append(args)
+            # The first allocation misses a row another writer just inserted
+            return ['hello-world'] if len(calls) == 1 else real_allocate(*args, **kwargs)
+
+        with transaction.atomic(), patch.object(slugs, 'allocate_slugs', side_effect=stale_allocate):
+            post = self.create_post()
+
+        self.assertEqual(post.slug, 'hello-world-1')
+        self.assertEqual(len(calls), 2)
+
+    def test_other_integrity_errors_are_not_retried(self):
+        """Test violations unrelated to the slug are raised after one attempt"""
+        from django.db import IntegrityError
+
+        Category.objects.create(name='Python')
+        with self.assertRaises(IntegrityError):
+            Category.objects.create(name='Python')
+
+    def test_categories_and_tags_get_unique_slugs(self):
+        """Test names that slugify alike get suffixed slugs"""
+        self.assertEqual(Category.objects.create(name='C').slug, 'c')
+        self.assertEqual(Category.objects.create(name='C++').slug, 'c-1')
+        self.assertEqual(Tag.objects.create(name='C#').slug, 'c')
+        self.assertEqual(Tag.objects.create(name='C++').slug, 'c-1')
+        self.assertEqual(Tag.objects.create(name='c!').slug, 'c-2')
+
+
+@override_settings(BLOG_IMAGES={'ASYNC': False, 'VARIANTS': {'thumbnail': 32, 'card': 64, 'full': 1600}})
+class ImageVariantsTestCase(APITestCase):
+    def setUp(self):
+        """Set up an author and a temporary media root"""
+        import shutil
+        import tempfile
+
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.user = User.objects.create_user(
+            username='imageuser',
+            email='image@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+
+    def make_image(self, name='cover.png', size=(200, 100), mode='RGBA'):
+        from io import BytesIO
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.new(mode, size, (200, 40, 40, 128) if mode == 'RGBA' else (200, 40, 40)).save(buffer, 'PNG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+    def create_post(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Post.objects.create(
+                title='Image Post', content='Image content', author=self.user, status='published', **kwargs
+            )
+
+    def test_upload_generates_variants(self):
+        """Test every variant is stored in each format without upscaling"""
+        import os
+        from PIL import Image
+
+        post = self.create_post(featured_image=self.make_image())
+        post.refresh_from_db()
+
+        variants = post.featured_image_variants
+        self.assertEqual(set(variants), {'thumbnail', 'card', 'full'})
+        self.assertEqual((variants['thumbnail']['width'], variants['thumbnail']['height']), (32, 16))
+        self.assertEqual(variants['full']['width'], 200)
+        self.assertRegex(variants['card']['webp'], r'^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.webp$')
+        with Image.open(os.path.join(self.media_root, variants['card']['jpeg'])) as image:
+            self.assertEqual((image.format, image.size, image.mode), ('JPEG', (64, 32), 'RGB'))
+        with Image.open(os.path.join(self.media_root, variants['card']['webp'])) as image:
+            self.assertEqual((image.format, image.mode), ('WEBP', 'RGBA'))
+
+    def test_serializers_expose_srcset(self):
+        """Test list and detail responses carry a srcset per format"""
+        post = self.create_post(featured_image=self.make_image())
+        variants = Post.objects.get(pk=post.pk).featured_image_variants
+
+        response = self.client.get(reverse('blog:post-detail', kwargs={'pk': post.pk}))
+        srcset = response.data['featured_image_srcset']
+        self.assertEqual(
+            srcset['webp'],
+            f"http://testserver/media/{variants['thumbnail']['webp']} 32w, "
+            f"http://testserver/media/{variants['card']['webp']} 64w, "
+            f"http://testserver/media/{variants['full']['webp']} 200w",
+        )
+        self.assertIn(f"{variants['card']['jpeg']} 64w", srcset['jpeg'])
+
+        results = self.client.get(reverse('blog:post-list')).data['results']
+        self.assertEqual(results[0]['featured_image_srcset'], srcset)
+
+    def test_post_without_image_has_no_srcset(self):
+        """Test posts without a featured image render a null srcset"""
+        post = self.create_post()
+
+        response = self.client.get(reverse('blog:post-detail', kwargs={'pk': post.pk}))
+        self.assertIsNone(response.data['featured_image_srcset'])
+        self.assertEqual(Post.objects.get(pk=post.pk).featured_image_variants, {})
+
+    def test_replacing_image_replaces_variants(self):
+        """Test the variants of a replaced image are deleted and regenerated"""
+        import os
+
+        post = self.create_post(featured_image=self.make_image())
+        post.refresh_from_db()
+        old_file = os.path.join(self.media_root, post.featured_image_variants['card']['webp'])
+        self.assertTrue(os.path.exists(old_file))
+
+        post.featured_image = self.make_image('other.png', mode='RGB')
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        post.refresh_from_db()
+
+        self.assertFalse(os.path.exists(old_file))
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, post.featured_image_variants['card']['webp'])))
+
+    def test_stale_instance_keeps_stored_variants(self):
+        """Test saving an instance loaded before the variants were stored keeps them"""
+        post = self.create_post()
+        stale = Post.objects.get(pk=post.pk)
+        post.featured_image = self.make_image()
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+
+        stale.refresh_from_db(fields=['featured_image'])
+        stale.title = 'Renamed'
+        stale.save()
+        self.assertEqual(set(Post.objects.get(pk=post.pk).featured_image_variants), {'thumbnail', 'card', 'full'})
+
+    def test_backfill_command(self):
+        """Test the management command renders missing variants in the worker pool"""
+        from io import StringIO
+        from django.core.management import call_command
+
+        post = self.create_post(featured_image=self.make_image())
+        Post.objects.filter(pk=post.pk).update(featured_image_variants={})
+
+        with override_settings(BLOG_IMAGES={'WORKERS': 1, 'VARIANTS': {'thumbnail': 32}}):
+            out = StringIO()
+            call_command('generate_image_variants', '--missing-only', stdout=out, stderr=StringIO())
+
+        self.assertIn('Generated variants for 1 post(s).', out.getvalue())
+        self.assertEqual(Post.objects.get(pk=post.pk).featured_image_variants['thumbnail']['width'], 32)
+
+
+class AsyncViewsTestCase(APITestCase):
+    def setUp(self):
+        """Set up published posts, a draft, a category and a tag"""
+        self.user = User.objects.create_user(
+            username='asyncuser',
+            email='async@example.com',
+            password='testpass123',
+            first_name='Async',
+            is_email_verified=True
+        )
+        self.category = Category.objects.create(name='Async Category')
+        self.tag = Tag.objects.create(name='async')
+        for i in range(4):
+            post = Post.objects.create(
+                title=f'Async Post {i}',
+                content=f'Async content {i} ' * 40,
+                author=self.user,
+                category=self.category,
+                status='draft' if i == 3 else 'published'
+            )
+            post.tags.add(self.tag)
+        self.post = Post.objects.filter(status='published').first()
+        self.draft = Post.objects.get(status='draft')
+        self.token = generate_token(self.user)
+
+    def async_get(self, url, params=None, **headers):
+        """GET ``url`` through the async variant of its view"""
+        from urllib.parse import urlsplit
+        from asgiref.sync import async_to_sync, iscoroutinefunction
+        from django.test import AsyncRequestFactory
+        from django.urls import resolve
+
+        match = resolve(urlsplit(url).path)
+        actions = (match.func.actions,) if hasattr(match.func, 'actions') else ()
+        view = match.func.cls.as_view(*actions, asynchronous=True, **match.func.initkwargs)
+        self.assertTrue(iscoroutinefunction(view))
+
+        request = AsyncRequestFactory().get(url, params or {}, headers=headers)
+        response = async_to_sync(view)(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    def assertSameOutput(self, url, params=None, **headers):
+        """Assert the sync and async views answer with identical bytes"""
+        expected = self.client.get(url, params or {}, headers=headers)
+        actual = self.async_get(url, params, **headers)
+
+        self.assertEqual(actual.status_code, expected.status_code, url)
+        self.assertEqual(actual.content, expected.content, f'{url} {params}')
+        return actual
+
+    @override_settings(BLOG_RESPONSE_CACHE_TIMEOUT=0)
+    def test_read_endpoints_equivalence(self):
+        """Test the async reads answer like the sync ones, with and without compiled serializers"""
+        authorization = {'Authorization': f'Bearer {self.token}'}
+        for compiled in (False, True):
+            with override_settings(BLOG_COMPILED_SERIALIZERS=compiled):
+                list_url = reverse('blog:post-list')
+                for params in [None, {'page': 2, 'page_size': 2}, {'page': 9}, {'search': 'async'},
+                               {'fields': 'id,title', 'expand': 'author'}]:
+                    self.assertSameOutput(list_url, params)
+                response = self.assertSameOutput(list_url, {'pagination': 'cursor', 'page_size': 2})
+                self.assertSameOutput(response.data['next'])
+
+                self.assertSameOutput(reverse('blog:post-detail', kwargs={'pk': self.post.pk}))
+                self.assertSameOutput(reverse('blog:post-detail', kwargs={'pk': 999999}))
+                self.assertSameOutput(reverse('blog:post-featured'))
+                self.assertSameOutput(reverse('blog:category-posts', kwargs={'pk': self.category.pk}))
+                self.assertSameOutput(reverse('blog:tag-posts', kwargs={'pk': self.tag.pk}), {'page_size': 1})
+                self.assertSameOutput(reverse('blog:tag-posts', kwargs={'pk': 999999}))
+
+        draft_url = reverse('blog:post-by-slug', kwargs={'slug': self.draft.slug})
+        self.assertEqual(self.assertSameOutput(draft_url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.assertSameOutput(draft_url, **authorization).status_code, status.HTTP_200_OK)
+        self.assertSameOutput(reverse('blog:post-by-slug', kwargs={'slug': self.post.slug}))
+
+        check_auth_url = reverse('auth:check_auth')
+        self.assertEqual(self.assertSameOutput(check_auth_url).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.assertSameOutput(check_auth_url, **authorization).data['user']['id'], self.user.pk)
+
+    def test_async_views_share_cache_and_validators(self):
+        """Test async responses are cached for the sync views and answer conditional requests"""
+        url = reverse('blog:post-list')
+        response = self.async_get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+        cached = self.client.get(url)
+        self.assertEqual(cached['X-Cache'], 'HIT')
+        self.assertEqual(cached.content, response.content)
+
+        not_modified = self.async_get(url, **{'If-None-Match': response['ETag']})
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_methods_without_async_handler_use_sync_view(self):
+        """Test writes through an async view run the sync handlers"""
+        from asgiref.sync import async_to_sync
+        from django.test import AsyncRequestFactory
+        from apps.blog.views import PostViewSet
+
+        view = PostViewSet.as_view({'get': 'list', 'post': 'create'}, asynchronous=True, basename='post')
+        request = AsyncRequestFactory().post(
+            reverse('blog:post-list'),
+            {'title': 'Written Async', 'content': 'Body', 'status': 'published'},
+            content_type='application/json',
+            headers={'Authorization': f'Bearer {self.token}'},
+        )
+        response = async_to_sync(view)(request)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Post.objects.filter(title='Written Async').exists())
+
+    def test_as_view_follows_setting(self):
+        """Test views are only async when ASYNC_VIEWS is on and an async handler exists"""
+        from asgiref.sync import iscoroutinefunction
+        from apps.blog.views import PostViewSet
+
+        with override_settings(ASYNC_VIEWS=True):
+            self.assertTrue(iscoroutinefunction(PostViewSet.as_view({'get': 'list'}, basename='post')))
+            self.assertFalse(iscoroutinefunction(PostViewSet.as_view({'get': 'my_posts'}, basename='post')))
+        with override_settings(ASYNC_VIEWS=False):
+            self.assertFalse(iscoroutinefunction(PostViewSet.as_view({'get': 'list'}, basename='post')))
+
+
+@override_settings(
+    DATABASE_REPLICAS={'ALIASES': ['replica'], 'CHECK_INTERVAL': 0},
+    BLOG_RESPONSE_CACHE_TIMEOUT=0,
+)
+class ReplicaRoutingTestCase(APITestCase):
+    """Reads routed to a second SQLite file standing in for a replica"""
+
+    @classmethod
+    def setUpClass(cls):
+        # Added after the test databases are set up, outside test transactions
+        super().setUpClass()
+        cls.replica_dir = tempfile.mkdtemp()
+        # Always SQLite, whatever database the suite runs on
+        connections.settings['replica'] = dict(
+            connections.settings['default'],
+            ENGINE='django.db.backends.sqlite3',
+            NAME=os.path.join(cls.replica_dir, 'replica.sqlite3'),
+            USER='', PASSWORD='', HOST='', PORT='', OPTIONS={},
+        )
+        call_command('migrate', database='replica', verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        shutil.rmtree(cls.replica_dir)
+        super().tearDownClass()
+
+    def setUp(self):
+        """Set up a published post on the primary only and a caught up replica"""
+        cache.clear()
+        replicas._status.clear()
+        self.user = User.objects.create_user(
+            username='replicauser',
+            email='replica@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+        self.category = Category.objects.create(name='Replica Category')
+        Post.objects.create(
+            title='Primary Post',
+            content='Only on the primary.',
+            author=self.user,
+            category=self.category,
+            status='published'
+        )
+        self.set_replica_heartbeat(timezone.now())
+        self.posts_url = reverse('blog:post-list')
+
+    def set_replica_heartbeat(self, beat_at):
+        ReplicationHeartbeat.objects.using('replica').update_or_create(pk=1, defaults={'beat_at': beat_at})
+
+    def test_safe_requests_read_from_replica(self):
+        """Test anonymous GETs are served by a fresh replica"""
+        response = self.client.get(self.posts_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 0)
+        self.assertEqual(self.client.get(reverse('blog:category-list')).data['count'], 0)
+
+    def test_stale_replica_is_skipped(self):
+        """Test a replica lagging beyond MAX_LAG or missing its heartbeat is not used"""
+        self.set_replica_heartbeat(timezone.now() - timedelta(minutes=1))
+        self.assertEqual(self.client.get(self.posts_url).data['count'], 1)
+
+        ReplicationHeartbeat.objects.using('replica').all().delete()
+        replicas._status.clear()
+        self.assertEqual(self.client.get(self.posts_url).data['count'], 1)
+
+    def test_writer_is_pinned_to_primary(self):
+        """Test a user reads their own write right after creating a post"""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_token(self.user)}')
+        response = self.client.post(self.posts_url, {
+            'title': 'Fresh Post',
+            'content': 'Written to the primary.',
+            'category': self.category.id,
+            'status': 'draft'
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # The replica replays the write
+        self.set_replica_heartbeat(timezone.now())
+
+        response = self.client.get(reverse('blog:post-my-posts'))
+        self.assertEqual(
+            {post['title'] for post in response.data['results']}, {'Primary Post', 'Fresh Post'}
+        )
+
+        self.client.credentials()
+        self.assertEqual(self.client.get(self.posts_url).data['count'], 0)
+
+    @override_settings(BLOG_RESPONSE_CACHE_TIMEOUT=300)
+    def test_other_users_keep_reading_from_replica_after_a_write(self):
+        """Test a write pins only its author, and replica reads older than it are not cached"""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_token(self.user)}')
+        self.client.post(self.posts_url, {
+            'title': 'Fresh Post',
+            'content': 'Written to the primary.',
+            'category': self.category.id,
+            'status': 'published'
+        })
+        self.client.credentials()
+
+        response = self.client.get(self.posts_url)
+        self.assertEqual(response.data['count'], 0)
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+        # The replica replays the write
+        self.set_replica_heartbeat(timezone.now())
+        self.assertEqual(self.client.get(self.posts_url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(self.posts_url)['X-Cache'], 'HIT')
+
+    async def test_async_requests_read_from_replica(self):
+        """Test routing applies to requests handled by the async middleware chain"""
+        response = await self.async_client.get(self.posts_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['count'], 0)
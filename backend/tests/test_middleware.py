@@ -1,12 +1,34 @@
+import datetime
 import json
+import os
+import tempfile
+import threading
+import uuid
+from decimal import Decimal
+from io import BytesIO, StringIO
 from django.test import TestCase, RequestFactory
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from apps.authentication.models import User
-from apps.authentication.jwt_utils import generate_token, get_user_from_token
+from unittest.mock import patch
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from apps.authentication.jwt_utils import decode_jwt_token, generate_token, get_user_from_token
+from apps.core import dbpool, metrics
+from apps.core.dbpool import PooledDatabaseWrapperMixin
+from apps.core.dburl import parse_database_url
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
 from apps.core.middleware import JWTAuthenticationMiddleware
 from django.http import HttpResponse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+from apps.core.parsers import ORJSONParser
+from apps.core.renderers import ORJSONRenderer
 
 User = get_user_model()
 
@@ -159,6 +181,370 @@ class MiddlewareTestCase(TestCase):
 
         self.assertIsNone(user_from_token)
 
+class JWTAuthenticationPassTestCase(APITestCase):
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='passuser',
+            email='pass@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+        self.url = reverse('auth:check_auth')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_token(self.user)}')
+
+    def user_queries(self, context):
+        table = User._meta.db_table
+        return [query for query in context.captured_queries if f'FROM "{table}"' in query['sql']]
+
+    def test_token_decoded_and_user_loaded_once(self):
+        """Test middleware and DRF authentication share one pass per request"""
+        with patch('apps.authentication.authentication.decode_jwt_token', wraps=decode_jwt_token) as decode:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(len(self.user_queries(context)), 1)
+
+    @override_settings(JWT_USER_CACHE_TIMEOUT=60)
+    def test_user_cache_skips_user_query(self):
+        """Test cached users need no query on later requests"""
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.user_queries(context), [])
+
+    @override_settings(JWT_USER_CACHE_TIMEOUT=60)
+    def test_user_cache_invalidated_on_save(self):
+        """Test saving a user invalidates its cached copy"""
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+class AsyncMiddlewareTestCase(APITestCase):
+    def setUp(self):
+        """Start with an empty metrics registry and a user with a token"""
+        cache.clear()
+        metrics._registry = None
+        self.user = User.objects.create_user(
+            username='asyncmiddleware',
+            email='asyncmiddleware@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+        self.token = generate_token(self.user)
+
+    async def test_middleware_runs_async(self):
+        """Test the JWT and metrics middleware run without a sync adapter under ASGI"""
+        from asgiref.sync import iscoroutinefunction
+        from apps.core.middleware import MetricsMiddleware
+
+        async def get_response(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(JWTAuthenticationMiddleware(get_response)))
+        self.assertTrue(iscoroutinefunction(MetricsMiddleware(get_response)))
+        self.assertFalse(iscoroutinefunction(MetricsMiddleware(lambda request: HttpResponse())))
+
+        response = await self.async_client.get(
+            reverse('auth:check_auth'), headers={'Authorization': f'Bearer {self.token}'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)['user']['id'], self.user.pk)
+
+    @override_settings(METRICS={'TOKEN': 'scrape-secret'})
+    async def test_async_metrics_count_queries(self):
+        """Test database queries of ASGI requests are counted"""
+        await self.async_client.get(reverse('blog:post-list'))
+
+        body = (await self.async_client.get(
+            reverse('core:metrics'), headers={'X-Metrics-Token': 'scrape-secret'}
+        )).content.decode()
+        self.assertIn('http_requests_total{method="GET",status="200",view="blog:post-list"} 1', body)
+        self.assertRegex(body, r'db_queries_total\{view="blog:post-list"\} [1-9]')
+
+class MetricsTestCase(APITestCase):
+    def setUp(self):
+        """Start every test with an empty metrics registry and a staff reader"""
+        metrics._registry = None
+        self.url = reverse('core:metrics')
+        self.staff = User.objects.create_user(
+            username='metricsstaff',
+            email='metricsstaff@example.com',
+            password='testpass123',
+            is_staff=True
+        )
+        self.client.force_login(self.staff)
+
+    def test_metrics_endpoint_reports_requests(self):
+        """Test request counts and latency histograms are exposed per view"""
+        self.client.get(reverse('core:health_check'))
+        self.client.get(reverse('core:health_check'))
+
+        response = self.client.get(self.url)
+        body = response.content.decode()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn('http_requests_total{method="GET",status="200",view="core:health_check"} 2', body)
+        self.assertIn('http_request_duration_seconds_count{method="GET",view="core:health_check"} 2', body)
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",view="core:health_check",le="+Inf"} 2', body)
+
+    def test_metrics_record_database_queries(self):
+        """Test database queries are counted per view"""
+        self.client.get(reverse('blog:post-list'))
+
+        body = self.client.get(self.url).content.decode()
+
+        self.assertIn('db_queries_total{view="blog:post-list"}', body)
+        self.assertIn('cache_requests_total{cache="blog_response",result="miss"} 1', body)
+
+    def test_metrics_sum_worker_snapshots(self):
+        """Test snapshots written by other worker processes are merged"""
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'other-worker.json'), 'w') as handle:
+                json.dump({
+                    'counters': [['http_requests_total', [['method', 'GET'], ['status', '200'], ['view', 'core:health_check']], 3]],
+                    'histograms': [],
+                }, handle)
+
+            with override_settings(METRICS={'DIR': directory}):
+                self.client.get(reverse('core:health_check'))
+                body = self.client.get(self.url).content.decode()
+
+        self.assertIn('http_requests_total{method="GET",status="200",view="core:health_check"} 4', body)
+
+    def test_metrics_drop_gauges_of_exited_workers(self):
+        """Test gauges are summed over running workers only while counters are kept"""
+        import subprocess
+        import sys
+
+        exited = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'], capture_output=True, text=True)
+        exited_pid = int(exited.stdout)
+        labels = [['alias', 'default'], ['state', 'idle']]
+        with tempfile.TemporaryDirectory() as directory:
+            for name, pid in (('running-worker', os.getpid()), ('exited-worker', exited_pid)):
+                with open(os.path.join(directory, f'{name}.json'), 'w') as handle:
+                    json.dump({
+                        'pid': pid,
+                        'counters': [['db_pool_connections_opened_total', [['alias', 'default']], 2]],
+                        'gauges': [['db_pool_connections', labels, 3]],
+                        'histograms': [],
+                    }, handle)
+
+            with override_settings(METRICS={'DIR': directory}):
+                body = self.client.get(self.url).content.decode()
+
+        self.assertIn('db_pool_connections{alias="default",state="idle"} 3\n', body)
+        self.assertIn('db_pool_connections_opened_total{alias="default"} 4\n', body)
+
+    def test_metrics_restricted_to_staff(self):
+        """Test anonymous and non-staff users cannot read metrics unless they are public"""
+        reader = User.objects.create_user(
+            username='metricsreader',
+            email='metricsreader@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Bearer {generate_token(reader)}')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Bearer {generate_token(self.staff)}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with override_settings(METRICS={'PUBLIC': True}):
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS={'TOKEN': 'scrape-secret'})
+    def test_metrics_token_required(self):
+        """Test the metrics token is enforced when configured"""
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.client.get(self.url, HTTP_X_METRICS_TOKEN='scrape-secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+class PooledSQLiteWrapper(PooledDatabaseWrapperMixin, SQLiteDatabaseWrapper):
+    pass
+
+class DatabasePoolTestCase(APITestCase):
+    def setUp(self):
+        """Start every test with no pools and an empty metrics registry"""
+        metrics._registry = None
+        self.addCleanup(dbpool.close_pools)
+
+    def test_parse_database_url(self):
+        """Test DATABASE_URL values are turned into DATABASES entries"""
+        database = parse_database_url(
+            'postgresql://blog:s%40cret@db:5432/blog?sslmode=require', conn_max_age=60, conn_health_checks=True
+        )
+        self.assertEqual(database['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual(
+            (database['NAME'], database['USER'], database['PASSWORD'], database['HOST'], database['PORT']),
+            ('blog', 'blog', 's@cret', 'db', '5432'),
+        )
+        self.assertEqual(database['OPTIONS'], {'sslmode': 'require'})
+        self.assertEqual(database['CONN_MAX_AGE'], 60)
+
+        pooled = parse_database_url('postgres://db/blog', conn_max_age=60, pool={'max_size': 5})
+        self.assertEqual(pooled['ENGINE'], 'apps.core.backends.postgresql')
+        self.assertEqual(pooled['OPTIONS']['pool'], {'max_size': 5})
+        self.assertEqual(pooled['CONN_MAX_AGE'], 0)
+
+        self.assertEqual(parse_database_url('sqlite:////tmp/blog.sqlite3')['NAME'], '/tmp/blog.sqlite3')
+        self.assertEqual(parse_database_url('sqlite://')['NAME'], ':memory:')
+        with self.assertRaises(ValueError):
+            parse_database_url('mysql://db/blog')
+
+    def test_pool_reuses_connections_up_to_its_size(self):
+        """Test released connections are reused and the size limit is enforced"""
+        pool = dbpool.ConnectionPool('default', max_size=2, timeout=0.05)
+
+        first = pool.acquire(FakeConnection)
+        second = pool.acquire(FakeConnection)
+        with self.assertRaises(dbpool.PoolTimeout):
+            pool.acquire(FakeConnection)
+
+        pool.release(first)
+        self.assertIs(pool.acquire(FakeConnection), first)
+        pool.release(second, reusable=False)
+        self.assertTrue(second.closed)
+        self.assertIsNot(pool.acquire(FakeConnection), second)
+        self.assertEqual(pool.stats(), {'idle': 0, 'in_use': 2, 'max_size': 2})
+
+    def test_pool_waits_for_a_released_connection(self):
+        """Test a request for a connection waits until another thread releases one"""
+        pool = dbpool.ConnectionPool('default', max_size=1, timeout=5)
+        connection = pool.acquire(FakeConnection)
+
+        timer = threading.Timer(0.05, pool.release, [connection])
+        timer.start()
+        self.assertIs(pool.acquire(FakeConnection), connection)
+        timer.join()
+
+    def test_pool_replaces_stale_connections(self):
+        """Test expired and broken idle connections are closed and replaced"""
+        pool = dbpool.ConnectionPool('default', max_size=1, max_idle=0)
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+        replacement = pool.acquire(FakeConnection)
+        self.assertTrue(connection.closed)
+        self.assertIsNot(replacement, connection)
+
+        pool = dbpool.ConnectionPool('default', max_size=1, check=lambda connection: False)
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+        self.assertIsNot(pool.acquire(FakeConnection), connection)
+        self.assertTrue(connection.closed)
+
+    def test_database_wrapper_checks_connections_in_and_out(self):
+        """Test a pooled database wrapper hands its connection back on close and reuses it"""
+        with tempfile.TemporaryDirectory() as directory:
+            settings_dict = dict(
+                connection.settings_dict,
+                NAME=os.path.join(directory, 'pooled.sqlite3'),
+                CONN_MAX_AGE=0,
+                OPTIONS={'pool': {'max_size': 1}},
+            )
+            wrapper = PooledSQLiteWrapper(settings_dict, alias='pooled')
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            database_connection = wrapper.connection
+            wrapper.close()
+
+            pool = dbpool.get_pool('pooled', {})
+            self.assertEqual(pool.stats(), {'idle': 1, 'in_use': 0, 'max_size': 1})
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            self.assertIs(wrapper.connection, database_connection)
+
+            with override_settings(METRICS={'PUBLIC': True}):
+                body = self.client.get(reverse('core:metrics')).content.decode()
+            self.assertIn('db_pool_connections{alias="pooled",state="in_use"} 1', body)
+            self.assertIn('db_pool_max_connections{alias="pooled"} 1', body)
+            self.assertIn('db_pool_connections_opened_total{alias="pooled"} 1', body)
+
+            dbpool.close_pools()
+            wrapper.close()
+            self.assertEqual(pool.stats()['in_use'], 0)
+
+class ORJSONRendererTestCase(APITestCase):
+    def setUp(self):
+        """Build a payload covering the types DRF's encoder special-cases"""
+        self.data = ReturnDict({
+            'created_at': datetime.datetime(2024, 5, 1, 12, 30, 15, 120000, tzinfo=datetime.timezone.utc),
+            'naive': datetime.datetime(2024, 5, 1, 12, 30),
+            'day': datetime.date(2024, 5, 1),
+            'at': datetime.time(8, 15),
+            'elapsed': datetime.timedelta(minutes=3),
+            'price': Decimal('12.50'),
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'label': gettext_lazy('Published'),
+            'text': 'Zoë \u2014 \u2028line\u2029 "quoted" \\ \x01',
+            'counts': {1: 2, 'three': [True, False, None]},
+            'items': ReturnList([{'n': 1}, {'n': -2}], serializer=None),
+            'blob': b'bytes',
+        }, serializer=None)
+
+    def test_output_matches_json_renderer(self):
+        """Test the orjson renderer produces the same bytes as JSONRenderer"""
+        self.assertEqual(ORJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_indented_output_falls_back(self):
+        """Test indented output is still rendered by the standard encoder"""
+        media_type = 'application/json; indent=4'
+        self.assertEqual(
+            ORJSONRenderer().render(self.data, media_type),
+            JSONRenderer().render(self.data, media_type),
+        )
+
+    def test_api_response_matches_json_renderer(self):
+        """Test API responses are rendered by the orjson renderer"""
+        response = self.client.get(reverse('blog:post-list'))
+
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_parser_round_trip(self):
+        """Test the orjson parser reads UTF-8 and other declared charsets"""
+        body = JSONRenderer().render({'title': 'Zoë', 'tags': [1, 2]})
+
+        self.assertEqual(ORJSONParser().parse(BytesIO(body)), {'title': 'Zoë', 'tags': [1, 2]})
+        latin = ORJSONParser().parse(BytesIO('{"title": "Zoë"}'.encode('latin-1')), parser_context={'encoding': 'latin-1'})
+        self.assertEqual(latin, {'title': 'Zoë'})
+
+    def test_parser_rejects_invalid_json(self):
+        """Test malformed and non-strict JSON raise a parse error"""
+        for body in (b'{"title": ', b'{"score": NaN}', b'\xff'):
+            with self.assertRaises(ParseError):
+                ORJSONParser().parse(BytesIO(body))
+
+    def test_invalid_request_body_returns_400(self):
+        """Test a malformed JSON body is reported as a bad request"""
+        response = self.client.post(
+            reverse('authentication:login'), data=b'{"email": ', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 class CORSMiddlewareTestCase(APITestCase):
     def setUp(self):
         """Set up test data"""
@@ -216,3 +602,291 @@ class CORSMiddlewareTestCase(APITestCase):
 
         # Should still work but may not include CORS headers for disallowed origins
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ContentAddressedStorageTestCase(APITestCase):
+    def setUp(self):
+        """Set up a temporary media root and an author"""
+        import shutil
+
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root, BLOG_IMAGES={'ASYNC': False, 'VARIANTS': {}})
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.user = User.objects.create_user(
+            username='storageuser',
+            email='storage@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+
+    def upload(self, content=b'same picture bytes', name='image.jpg'):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        return SimpleUploadedFile(name, content, content_type='image/jpeg')
+
+    def create_post(self, upload):
+        from apps.blog.models import Post
+
+        with patch('apps.blog.signals.generate_variants'), self.captureOnCommitCallbacks(execute=True):
+            return Post.objects.create(title='Stored', content='Body', author=self.user, featured_image=upload)
+
+    def stored_files(self):
+        from apps.core.models import StoredFile
+
+        return dict(StoredFile.objects.values_list('name', 'ref_count'))
+
+    def test_identical_uploads_are_stored_once(self):
+        """Test the same content gets one sharded, hash-named file whatever it was called"""
+        import hashlib
+
+        first = self.create_post(self.upload())
+        second = self.create_post(self.upload(name='image.JPG'))
+
+        digest = hashlib.sha256(b'same picture bytes').hexdigest()
+        expected = f'{digest[:2]}/{digest[2:4]}/{digest}.jpg'
+        self.assertEqual(first.featured_image.name, expected)
+        self.assertEqual(second.featured_image.name, expected)
+        self.assertEqual(os.listdir(os.path.join(self.media_root, digest[:2], digest[2:4])), [f'{digest}.jpg'])
+        self.assertEqual(self.stored_files(), {expected: 2})
+
+    def test_file_is_removed_with_its_last_reference(self):
+        """Test deleting one of two referencing rows keeps the file and deleting both removes it"""
+        first = self.create_post(self.upload())
+        self.user.profile_picture = self.upload(name='avatar.jpg')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        name = first.featured_image.name
+        path = os.path.join(self.media_root, name)
+        self.assertEqual(self.user.profile_picture.name, name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(self.stored_files(), {name: 1})
+
+        self.user.profile_picture = self.upload(b'another picture', name='avatar.jpg')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(self.stored_files(), {self.user.profile_picture.name: 1})
+
+    def test_garbage_collection(self):
+        """Test unreferenced files past the minimum age are deleted and counts corrected"""
+        from django.core.management import call_command
+        from apps.blog.models import Post
+        from apps.core.storage import get_media_storage
+
+        kept = self.create_post(self.upload())
+        storage = get_media_storage()
+        orphan = storage.save('orphan.png', self.upload(b'orphaned'))
+        recent = storage.save('recent.png', self.upload(b'just uploaded'))
+        Post.objects.filter(pk=kept.pk).update(featured_image=storage.save('x.jpg', self.upload()))
+        old = datetime.datetime.now().timestamp() - 7200
+        for name in (orphan, kept.featured_image.name):
+            os.utime(os.path.join(self.media_root, name), (old, old))
+
+        out = StringIO()
+        call_command('collect_media_garbage', '--min-age', '1', stdout=out)
+
+        self.assertIn('Deleted 1 unreferenced file(s) (8 bytes); 1 reference count(s) out of date.', out.getvalue())
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, orphan)))
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, recent)))
+        self.assertEqual(self.stored_files(), {kept.featured_image.name: 1, recent: 1})
+
+
+    def test_save_racing_removal_keeps_the_file(self):
+        """Test a save of the same content while its last reference is being removed still has a file"""
+        from apps.core.storage import ContentAddressedStorage, get_media_storage
+
+        storage = get_media_storage()
+        name = storage.save('image.jpg', self.upload())
+        with self.captureOnCommitCallbacks() as callbacks:
+            storage.delete(name)
+        add_reference = ContentAddressedStorage._add_reference
+
+        def remove_then_add_reference(storage, *args):
+            # The removal commits while the save is in progress
+            callbacks.pop()()
+            return add_reference(storage, *args)
+
+        with patch.object(ContentAddressedStorage, '_add_reference', remove_then_add_reference):
+            again = self.create_post(self.upload())
+
+        self.assertEqual(again.featured_image.name, name)
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, name)))
+        self.assertEqual(self.stored_files(), {name: 1})
+
+    def test_garbage_collection_keeps_counts_changed_during_the_run(self):
+        """Test counts are not reset when a save lands while references are collected"""
+        from apps.core import storage as storage_module
+        from apps.core.models import StoredFile
+
+        post = self.create_post(self.upload())
+        name = post.featured_image.name
+        StoredFile.objects.filter(name=name).update(ref_count=5)
+        get_references = storage_module.get_references
+
+        def get_references_then_save():
+            references = get_references()
+            storage_module.get_media_storage().save('again.jpg', self.upload())
+            return references
+
+        with patch.object(storage_module, 'get_references', get_references_then_save):
+            storage_module.collect_garbage(min_age=0)
+
+        self.assertEqual(self.stored_files(), {name: 6})
+        storage_module.collect_garbage(min_age=0)
+        self.assertEqual(self.stored_files(), {name: 1})
+
+
+class MediaDeliveryTestCase(APITestCase):
+    def setUp(self):
+        """Set up a temporary media root, an author and a draft with an image"""
+        import shutil
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from apps.blog.models import Post
+
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root, BLOG_IMAGES={'ASYNC': False, 'VARIANTS': {}})
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.author = User.objects.create_user(
+            username='mediaauthor',
+            email='mediaauthor@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+        self.reader = User.objects.create_user(
+            username='mediareader',
+            email='mediareader@example.com',
+            password='testpass123',
+            is_email_verified=True
+        )
+        with patch('apps.blog.signals.generate_variants'):
+            self.post = Post.objects.create(
+                title='Media Post',
+                content='Body',
+                author=self.author,
+                featured_image=SimpleUploadedFile('draft.jpg', b'0123456789', content_type='image/jpeg'),
+            )
+        self.url = f'/media/{self.post.featured_image.name}'
+
+    def get(self, url=None, user=None, **headers):
+        if user is not None:
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {generate_token(user)}'
+        return self.client.get(url or self.url, **headers)
+
+    def test_draft_image_is_visible_only_to_author(self):
+        """Test draft post images are hidden from anonymous users and other readers"""
+        self.assertEqual(self.get().status_code, 404)
+        self.assertEqual(self.get(user=self.reader).status_code, 404)
+
+        response = self.get(user=self.author)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+    def test_published_image_is_public(self):
+        """Test images of published posts are served to anyone and cached publicly"""
+        self.post.status = 'published'
+        self.post.save()
+
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Cache-Control'].startswith('public'))
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+    def test_variants_follow_their_post(self):
+        """Test resized variants are served under the same rule as the original"""
+        from apps.blog.images import store_variants
+
+        variants = store_variants(
+            self.post.pk, self.post.featured_image.name, {'card': {'width': 1, 'height': 1, 'webp': b'variant'}}
+        )
+        url = f"/media/{variants['card']['webp']}"
+        self.assertEqual(self.get(url).status_code, 404)
+        self.assertEqual(self.get(url, user=self.author).status_code, 200)
+
+        self.post.status = 'published'
+        self.post.save()
+        response = self.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+
+    def test_access_decisions_are_cached(self):
+        """Test repeated media requests skip the owner lookup until a published post changes"""
+        cache.clear()
+        self.post.status = 'published'
+        self.post.save()
+        self.assertEqual(self.get().status_code, 200)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get().status_code, 200)
+        self.assertFalse([query for query in queries if 'blog_post' in query['sql']])
+
+        self.post.status = 'draft'
+        self.post.save()
+        self.assertEqual(self.get().status_code, 404)
+
+    async def test_asgi_requests_stream_asynchronously(self):
+        """Test files served over ASGI are read chunk by chunk rather than collected first"""
+        headers = {'Authorization': f'Bearer {generate_token(self.author)}'}
+
+        response = await self.async_client.get(self.url, headers=headers)
+        self.assertTrue(response.is_async)
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), b'0123456789')
+
+        response = await self.async_client.get(self.url, headers=dict(headers, Range='bytes=2-5'))
+        self.assertTrue(response.is_async)
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), b'2345')
+
+    def test_range_requests(self):
+        """Test the Django backend answers single byte ranges"""
+        response = self.get(user=self.author, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+
+        response = self.get(user=self.author, HTTP_RANGE='bytes=-3')
+        self.assertEqual(b''.join(response.streaming_content), b'789')
+
+        response = self.get(user=self.author, HTTP_RANGE='bytes=10-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+
+        response = self.get(user=self.author, HTTP_RANGE='bytes=0-1,4-5')
+        self.assertEqual(response.status_code, 200)
+
+    def test_proxy_backends_hand_over_the_transfer(self):
+        """Test the nginx and sendfile backends send headers instead of the file"""
+        name = self.post.featured_image.name
+        with override_settings(MEDIA_DELIVERY={'BACKEND': 'nginx'}):
+            response = self.get(user=self.author, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{name}')
+        self.assertEqual(response.content, b'')
+
+        with override_settings(MEDIA_DELIVERY={'BACKEND': 'sendfile'}):
+            response = self.get(user=self.author)
+        self.assertEqual(response['X-Sendfile'], os.path.join(self.media_root, name))
+
+    def test_unreferenced_files_are_not_served(self):
+        """Test files no row refers to and temporary uploads are reported missing"""
+        from apps.core.storage import get_media_storage
+        from django.core.files.base import ContentFile
+
+        name = get_media_storage().save('loose.jpg', ContentFile(b'loose'))
+        self.assertEqual(self.get(f'/media/{name}', user=self.author).status_code, 404)
+        self.assertEqual(self.get('/media/.incoming/tmp123', user=self.author).status_code, 404)
+
+    def test_profile_pictures_are_public(self):
+        """Test profile pictures are served to anonymous users"""
+        User.objects.filter(pk=self.reader.pk).update(profile_picture=self.post.featured_image.name)
+        self.assertEqual(self.get().status_code, 200)